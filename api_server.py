@@ -0,0 +1,287 @@
+"""Headless HTTP API for the agent.
+
+    uvicorn api_server:app --port 8000                   # one process, models warm in the background
+    gunicorn api_server:app -c gunicorn.conf.py          # several workers sharing preloaded models
+
+Blocking model inference runs on a small per-process pool sized to the cores a worker
+owns; calls that mostly wait on other services (Ollama, OpenWeatherMap, Vision, Gmail,
+Flipkart, Moneycontrol) run on a larger I/O pool, so a slow upstream never queues behind
+the models. Handlers that both fetch and classify do the fetching on the I/O pool and
+hand only the inference to the model pool. Chat
+sessions live in the worker process that created them; put the service behind a sticky
+load balancer (or send no session_id) when running several workers.
+"""
+import asyncio
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import iterate_in_threadpool
+
+from intent_classifier.main import classify_intent
+from modules.common import resources
+from modules.flipkart_reviews_sentiment.sentiment_pipeline import BATCH_SIZE, analyze_product_reviews, classify_batch
+from modules.general_chatting.chat import ChatBot, return_chat, stream_chat
+from modules.gmail.gmail_main import gmail_operation
+from modules.notes_maker.notes_maker import make_notes_from_image
+from modules.stock_market_sentiment.name_extractor import extract_company_name
+from modules.stock_market_sentiment.stock_sentiment import fetch_headlines, score_headlines
+from modules.text_to_audio.text_to_audio import convert_text_to_audio
+from modules.voice_summary.jobs import JobRejected, get_job_manager
+from modules.weather.location_extractor import extract_city
+from modules.weather.weather_service import WeatherError, get_weather_service
+
+# Loaded before gunicorn forks (see gunicorn.conf.py) or warmed at start-up otherwise
+PRELOAD = [name for name in os.environ.get(
+    "API_PRELOAD", "intent-ml,gmail-sub-intent,spacy-ner,finbert"
+).split(",") if name]
+MODEL_WORKERS = int(os.environ.get("API_MODEL_WORKERS", 1))
+IO_WORKERS = int(os.environ.get("API_IO_WORKERS", 32))
+MAX_SESSIONS = 1000
+MAX_UPLOAD_BYTES = 50 * 1024 ** 2
+
+_FLIPKART_URL = re.compile(r"https?://\S*flipkart\.com\S*")
+
+
+def preload(names=None):
+    """Load models in this process, e.g. in the gunicorn master so forked workers share them."""
+    for name in PRELOAD if names is None else names:
+        try:
+            resources.get_resource(name)
+        except KeyError:
+            logging.warning(f"Unknown resource {name!r}; not preloaded")
+        except Exception as e:
+            logging.warning(f"Preloading {name} failed: {e}")
+
+
+# ------------------------ Pools and sessions -----------------------
+_pools = {}
+
+
+async def run_model(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(_pools["model"], partial(fn, *args, **kwargs))
+
+
+async def run_io(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(_pools["io"], partial(fn, *args, **kwargs))
+
+
+class ChatSessions:
+    """ChatBot per session id, least recently used dropped beyond `max_sessions`."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._bots = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        if not session_id:
+            return None  # stateless: a fresh ChatBot per request
+        with self._lock:
+            bot = self._bots.pop(session_id, None) or ChatBot()
+            self._bots[session_id] = bot
+            while len(self._bots) > self.max_sessions:
+                self._bots.popitem(last=False)
+            return bot
+
+
+sessions = ChatSessions()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Created per worker process, after the fork: threads do not survive fork()
+    _pools["model"] = ThreadPoolExecutor(max_workers=MODEL_WORKERS, thread_name_prefix="api-model")
+    _pools["io"] = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="api-io")
+    resources.warm_up(PRELOAD)  # no-op for whatever the master already loaded
+    yield
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="Multi-Purpose AI Agent", lifespan=lifespan)
+
+
+# ------------------------ Handlers ---------------------------------
+class TextRequest(BaseModel):
+    text: str
+    method: str = "ml"
+
+
+class ChatRequest(BaseModel):
+    prompt: str
+    session_id: str | None = None
+    stream: bool = False
+
+
+class ReviewsRequest(BaseModel):
+    url: str
+    max_pages: int = 5
+
+
+async def stock_sentiment(text):
+    company, url = extract_company_name(text)
+    if not url:
+        raise HTTPException(404, "Company not recognized. Please try a valid Indian stock name.")
+    articles = await run_io(fetch_headlines, url)
+    scored = await run_model(score_headlines, articles)
+    return {"company": company, "headlines": scored.to_dict(orient="records")}
+
+
+def weather(text):
+    city = extract_city(text)
+    try:
+        return {"city": city, "weather": get_weather_service().current(city)}
+    except WeatherError as e:
+        raise HTTPException(404, str(e))
+
+
+def classify_on_model_pool(texts, batch_size=BATCH_SIZE):
+    # Called from the I/O thread running the crawl: only the inference waits for a model worker
+    return _pools["model"].submit(classify_batch, texts, batch_size=batch_size).result()
+
+
+def product_reviews(url, max_pages=5):
+    summary = None
+    for summary in analyze_product_reviews(url, max_pages=max_pages, classify=classify_on_model_pool):
+        pass
+    return summary
+
+
+def gmail(text):
+    return {"result": gmail_operation(text)}
+
+
+def chat_reply(prompt, session_id=None):
+    return {"reply": return_chat(prompt, sessions.get(session_id))}
+
+
+# intent -> coroutine function taking the prompt text
+ROUTES = {
+    "stock_sentiment": stock_sentiment,
+    "get_weather": partial(run_io, weather),
+    "gmail_operations": partial(run_io, gmail),
+    "general_chat": partial(run_io, chat_reply),
+}
+# Intents that need more than the prompt: the endpoint to call instead
+NEEDS_INPUT = {"make_notes": "/notes", "summarize_audio": "/audio-summary", "voice_summary": "/audio-summary",
+               "convert_to_audio": "/tts"}
+
+
+# ------------------------ Endpoints --------------------------------
+@app.get("/health")
+def health():
+    return {"status": "ok", "pid": os.getpid(), "resources": resources.resource_status()}
+
+
+@app.post("/classify")
+async def classify(req: TextRequest):
+    try:
+        return {"intent": await run_model(classify_intent, req.text, method=req.method)}
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+
+
+@app.post("/route")
+async def route(req: TextRequest):
+    """Classify the prompt and run the matching module, as main.py's prompt loop does."""
+    intent = (await classify(req))["intent"]
+    if intent == "flipkart_product_sentiment":
+        match = _FLIPKART_URL.search(req.text)
+        if not match:
+            raise HTTPException(422, "Include the Flipkart product URL in the prompt.")
+        return {"intent": intent, "result": await run_io(product_reviews, match.group(0))}
+    if intent in NEEDS_INPUT:
+        return {"intent": intent, "result": None, "detail": f"POST the input to {NEEDS_INPUT[intent]}"}
+    handler = ROUTES.get(intent, ROUTES["general_chat"])
+    return {"intent": intent, "result": await handler(req.text)}
+
+
+@app.post("/chat")
+async def chat(req: ChatRequest):
+    if req.stream:
+        tokens = stream_chat(req.prompt, sessions.get(req.session_id))
+        return StreamingResponse(iterate_in_threadpool(tokens), media_type="text/plain; charset=utf-8")
+    return await run_io(chat_reply, req.prompt, req.session_id)
+
+
+@app.post("/weather")
+async def weather_endpoint(req: TextRequest):
+    return await run_io(weather, req.text)
+
+
+@app.post("/stock-sentiment")
+async def stock_sentiment_endpoint(req: TextRequest):
+    return await stock_sentiment(req.text)
+
+
+@app.post("/product-reviews")
+async def product_reviews_endpoint(req: ReviewsRequest):
+    return await run_io(product_reviews, req.url, req.max_pages)
+
+
+@app.post("/gmail")
+async def gmail_endpoint(req: TextRequest):
+    return await run_io(gmail, req.text)
+
+
+async def _save_upload(request, default_suffix):
+    # Raw request bodies rather than multipart forms: simpler for other services to send
+    body = await request.body()
+    if not body:
+        raise HTTPException(422, "Send the file as the request body.")
+    if len(body) > MAX_UPLOAD_BYTES:
+        raise HTTPException(413, f"Files are limited to {MAX_UPLOAD_BYTES // 1024 ** 2} MB.")
+    suffix = os.path.splitext(request.query_params.get("filename", ""))[1] or default_suffix
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(body)
+    return tmp.name
+
+
+@app.post("/notes")
+async def notes(request: Request, backend: str | None = None):
+    """Notes from an image or PDF sent as the body (`?filename=page.pdf` sets the type)."""
+    path = await _save_upload(request, ".jpg")
+    try:
+        return {"notes": await run_io(make_notes_from_image, path, backend)}
+    finally:
+        os.remove(path)
+
+
+@app.post("/tts")
+async def tts(req: TextRequest):
+    if not req.text.strip():
+        raise HTTPException(422, "Nothing to speak.")
+    path = await run_io(convert_text_to_audio, req.text)
+    if path is None:
+        raise HTTPException(422, "Nothing to speak.")
+    return FileResponse(path, media_type="audio/wav")
+
+
+@app.post("/audio-summary", status_code=202)
+async def audio_summary(request: Request):
+    path = await _save_upload(request, ".wav")
+    try:
+        # The job's worker process deletes the upload once it is done with it
+        return {"job_id": get_job_manager().submit(path, owner=request.client.host if request.client else None,
+                                                   cleanup=True)}
+    except JobRejected as e:
+        os.remove(path)
+        raise HTTPException(429, str(e))
+
+
+@app.get("/audio-summary/{job_id}")
+def audio_summary_status(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown job.")
+    return job.snapshot()
@@ -0,0 +1,86 @@
+"""Latency of audio summarization: transcribe-then-summarize vs. the streaming map-reduce pipeline.
+
+    python -m benchmarks.bench_audio_summary [minutes]
+
+Transcription is simulated (segments arrive at a fixed real-time factor) and the LLM is a
+local fake Ollama, so the numbers show the overlap the pipeline buys rather than model speed.
+"""
+import random
+import sys
+import time
+from collections import namedtuple
+
+from modules.common import llm_client
+from modules.voice_summary.summarize_transcribe import summarize_transcribe
+from modules.voice_summary.summary_pipeline import approx_tokens, summary_events
+from benchmarks.servers import fake_ollama_server
+
+TRANSCRIBE_RTF = 0.01        # simulated seconds of transcription per second of audio
+SEGMENT_SECONDS = 6.0
+PROMPT_LATENCY = 0.05        # per 1000 prompt characters
+TOKEN_LATENCY = 0.004
+NUM_CTX = 8192               # a typical Ollama context for llama3.1 on a laptop
+
+# Same fields as voice_transcribe.TranscriptSegment, without importing faster-whisper
+Segment = namedtuple("Segment", ["start", "end", "text"])
+
+WORDS = ("model data training results lecture students example question revenue quarter team "
+         "design system users feedback release schedule budget risk plan research evidence").split()
+
+
+def fake_segments(minutes, seed=0):
+    rng = random.Random(seed)
+    position = 0.0
+    while position < minutes * 60:
+        time.sleep(SEGMENT_SECONDS * TRANSCRIBE_RTF)
+        text = " ".join(rng.choice(WORDS) for _ in range(int(SEGMENT_SECONDS * 2.5))) + "."
+        yield Segment(position, position + SEGMENT_SECONDS, text)
+        position += SEGMENT_SECONDS
+
+
+def respond(payload):
+    return " ".join(["- key point about the recording"] * 25)
+
+
+def sequential(minutes):
+    start = time.perf_counter()
+    transcript = " ".join(s.text for s in fake_segments(minutes))
+    transcribed = time.perf_counter() - start
+    summarize_transcribe(transcript)
+    total = time.perf_counter() - start
+    tokens = approx_tokens(transcript)
+    note = f"  (~{tokens} prompt tokens{', over num_ctx ' + str(NUM_CTX) if tokens > NUM_CTX else ''})"
+    print(f"{'transcribe, then one prompt':<30} first output {total:6.1f} s   done {total:6.1f} s   "
+          f"after transcription {total - transcribed:5.1f} s{note}")
+
+
+def pipelined(minutes):
+    start = time.perf_counter()
+    first_partial = transcribed = None
+    last_position = 0
+    for event in summary_events(fake_segments(minutes), duration=minutes * 60):
+        kind = event["event"]
+        if kind == "transcribing":
+            last_position = event["position"]
+        elif kind == "partial" and first_partial is None:
+            first_partial = time.perf_counter() - start
+        elif kind == "reducing" and transcribed is None:
+            transcribed = time.perf_counter() - start
+        elif kind == "done":
+            total = time.perf_counter() - start
+            print(f"{'streaming map-reduce':<30} first output {first_partial or total:6.1f} s   done {total:6.1f} s   "
+                  f"after transcription {total - (transcribed or total):5.1f} s  ({event['chunks']} chunks)")
+    assert last_position >= minutes * 60 - SEGMENT_SECONDS
+
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    print(f"{minutes} min recording, simulated transcription RTF {TRANSCRIBE_RTF}\n")
+    with fake_ollama_server(respond, token_latency=TOKEN_LATENCY, prompt_latency=PROMPT_LATENCY, max_parallel=2) as server:
+        llm_client.configure(base_url=server.url)
+        sequential(minutes)
+        pipelined(minutes)
+
+
+if __name__ == "__main__":
+    main()
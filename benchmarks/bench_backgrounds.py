@@ -0,0 +1,73 @@
+"""Per-rerun cost of the background image: inline base64 JPEG vs cached variants.
+
+    python -m benchmarks.bench_backgrounds
+
+Streamlit reruns the whole script on every interaction, and everything passed to
+st.markdown is sent to the browser again. For each image in backgrounds/ this measures
+the script time and the bytes sent per rerun for the original approach (read and
+base64-encode the full JPEG each time), the memoized inline WebP fallback, and the
+static-file URL. It also reports the one-time cost of encoding each variant.
+"""
+import base64
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from functools import lru_cache
+
+from modules.common import backgrounds
+
+RERUNS = 20
+
+
+def original(path):
+    # What set_bg_from_local used to do on every rerun
+    with open(path, "rb") as image_file:
+        encoded = base64.b64encode(image_file.read()).decode()
+    return backgrounds.background_css(f"data:image/jpeg;base64,{encoded}")
+
+
+def per_rerun(render):
+    times = []
+    for _ in range(RERUNS):
+        start = time.perf_counter()
+        css = render()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, len(css.encode("utf-8"))
+
+
+def main():
+    names = backgrounds.list_backgrounds()
+    static_dir = tempfile.mkdtemp(prefix="bg_static_")
+    # lru_cache stands in for st.cache_data: the first call encodes, later reruns look up
+    inline = lru_cache()(lambda path: backgrounds.data_uri(path))
+    published = lru_cache()(lambda name: backgrounds.publish(name, static_dir=static_dir))
+
+    print(f"{'image':<20}{'source':>9}  {'original/rerun':>20}  {'inline webp/rerun':>20}  "
+          f"{'static url/rerun':>18}  {'first encode':>13}  {'served file':>11}")
+    totals = {"original": 0, "inline": 0, "static": 0}
+    for name in names:
+        path = os.path.join(backgrounds.BG_DIR, name)
+        orig_ms, orig_bytes = per_rerun(lambda: original(path))
+        start = time.perf_counter()
+        inline(path)
+        published(name)
+        first_ms = (time.perf_counter() - start) * 1000
+        inline_ms, inline_bytes = per_rerun(lambda: backgrounds.background_css(inline(path)))
+        static_ms, static_bytes = per_rerun(lambda: backgrounds.background_css(published(name)))
+        served = os.path.getsize(os.path.join(static_dir, published(name).rsplit("/", 1)[1]))
+        totals["original"] += orig_bytes
+        totals["inline"] += inline_bytes
+        totals["static"] += static_bytes
+        print(f"{name[:19]:<20}{os.path.getsize(path) / 1024:>7.0f}KB  "
+              f"{orig_ms:>7.2f} ms {orig_bytes / 1024:>8.0f}KB  {inline_ms:>7.3f} ms {inline_bytes / 1024:>8.0f}KB  "
+              f"{static_ms:>7.3f} ms {static_bytes:>6d} B  {first_ms:>10.0f} ms  {served / 1024:>9.0f}KB")
+    shutil.rmtree(static_dir, ignore_errors=True)
+    count = len(names) or 1
+    print(f"\nmean payload per rerun: original {totals['original'] / count / 1024:.0f} KB, "
+          f"inline WebP {totals['inline'] / count / 1024:.0f} KB, static URL {totals['static'] / count:.0f} B")
+
+
+if __name__ == "__main__":
+    main()
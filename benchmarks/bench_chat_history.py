@@ -0,0 +1,121 @@
+"""Rerun cost of the chat history as a session grows to 500 turns: full re-render vs windowed.
+
+    python -m benchmarks.bench_chat_history
+
+Streamlit re-executes the display loop on every rerun. This replays that loop with the
+work each element costs the server: HTML for messages, an Arrow IPC serialization for
+st.dataframe, a matplotlib PNG for st.pyplot, and hashing the bytes for st.image. The
+original loop renders every entry and re-plots each stock answer's pie. The windowed loop
+renders the last HISTORY_WINDOW turns with the PNG made once when the answer arrived.
+Every fifth turn is a stock answer with 20 headlines.
+"""
+import hashlib
+import io
+import random
+import statistics
+import time
+
+import pandas as pd
+import pyarrow as pa
+from matplotlib.figure import Figure
+
+from modules.common.chat_history import HISTORY_WINDOW, finalize_answer, window_start
+
+SIZES = (10, 50, 100, 250, 500)
+RERUNS = 3
+
+
+def stock_frame(rng, rows=20):
+    return pd.DataFrame({
+        "headline": [f"Headline {rng.random():.6f} about quarterly results and guidance" for _ in range(rows)],
+        "link": [f"https://www.moneycontrol.com/news/business/{rng.randrange(10 ** 8)}.html" for _ in range(rows)],
+        "sentiment": [rng.choice(["Positive", "Neutral", "Negative"]) for _ in range(rows)],
+        "confidence": [round(rng.random(), 3) for _ in range(rows)],
+    })
+
+
+def build_history(turns, seed=0):
+    rng = random.Random(seed)
+    history = []
+    for n in range(turns):
+        history.append({"role": "user", "message": f"prompt {n}", "intent": "general_chat"})
+        chat = {"role": "ai", "message": "Some answer text. " * 20, "df_stock": None}
+        if n % 5 == 4:
+            chat.update(message="📊 Stock sentiment", df_stock=stock_frame(rng))
+        history.append(chat)
+    return history
+
+
+def st_markdown(text):
+    return f"<div class='ai-msg-full'>{text}</div>".encode("utf-8")
+
+
+def st_dataframe(df):
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def st_pyplot_pie(df):
+    # What plot_sentiment_pie + st.pyplot did for every stock answer on every rerun
+    counts = df["sentiment"].value_counts()
+    fig = Figure()
+    ax = fig.subplots()
+    ax.pie(counts, labels=counts.index, autopct="%1.1f%%", startangle=90)
+    ax.axis("equal")
+    out = io.BytesIO()
+    fig.savefig(out, format="png")
+    return len(out.getvalue())
+
+
+def st_image(data):
+    return hashlib.md5(data).hexdigest()
+
+
+def render_all(history):
+    for chat in history:
+        st_markdown(chat["message"])
+        if chat.get("df_stock") is not None:
+            st_dataframe(chat["df_stock"])
+            st_pyplot_pie(chat["df_stock"])
+
+
+def render_window(history, turns=HISTORY_WINDOW):
+    for chat in history[window_start(history, turns):]:
+        st_markdown(chat["message"])
+        if chat.get("df_stock") is not None:
+            st_dataframe(chat["df_stock"])
+            if chat.get("pie_png"):
+                st_image(chat["pie_png"])
+
+
+def timed(render, history):
+    times = []
+    for _ in range(RERUNS):
+        start = time.perf_counter()
+        render(history)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    print(f"{'turns':>6}  {'render all':>11}  {'windowed':>9}  {'stock frames':>20}  {'pie PNGs':>9}")
+    for turns in SIZES:
+        history = build_history(turns)
+        full_ms = timed(render_all, history)
+        raw_bytes = sum(c["df_stock"].memory_usage(deep=True).sum() for c in history if c.get("df_stock") is not None)
+        for chat in history:
+            if chat.get("df_stock") is not None:
+                finalize_answer(chat)
+        stocks = [c for c in history if c.get("df_stock") is not None]
+        compact_bytes = sum(c["df_stock"].memory_usage(deep=True).sum() for c in stocks)
+        png_bytes = sum(len(c["pie_png"]) for c in stocks)
+        window_ms = timed(render_window, history)
+        print(f"{turns:>6}  {full_ms:>8.0f} ms  {window_ms:>6.1f} ms  "
+              f"{raw_bytes / 1024:>7.0f} KB -> {compact_bytes / 1024:>4.0f} KB  {png_bytes / 1024:>6.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
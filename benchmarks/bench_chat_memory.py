@@ -0,0 +1,80 @@
+"""Per-turn latency of general chat as a conversation grows to 200 turns.
+
+    python -m benchmarks.bench_chat_memory [turns]
+
+The model is a local fake Ollama that, like a loaded model, only pays prompt processing
+for the part of the prompt after the prefix it saw last time (KV cache reuse). Compares:
+
+  full history     every turn re-sends the whole conversation (ChatBot with no budget);
+                   cheap here only because the fake model has no context limit
+  naive window     the budget is enforced by dropping just enough old turns each time,
+                   so once full the prompt prefix changes every turn
+  summary window   ChatBot: compaction in batches down to half the budget, older turns
+                   folded into a rolling summary in the background
+"""
+import random
+import statistics
+import sys
+import time
+
+from modules.common import llm_client
+from modules.general_chatting.chat import ChatBot
+from benchmarks.servers import fake_ollama_server
+
+PROMPT_LATENCY = 0.02       # per 1000 evaluated prompt characters
+TOKEN_LATENCY = 0.001
+NUM_CTX = 8192              # a typical Ollama context for llama3.1 on a laptop
+WORDS = ("plan trip budget hotel train weather museum food recipe python code bug test exam "
+         "study notes schedule meeting project deadline movie book music gym diet").split()
+
+
+def respond(payload):
+    prompt = payload["messages"][-1]["content"]
+    if "updated summary" in prompt:
+        return " ".join(["summary"] * 120)
+    return " ".join(["reply"] * 60)
+
+
+class NaiveWindowBot(ChatBot):
+    """Drops the oldest pair as soon as the history is over budget, no summary."""
+
+    def _maybe_compact(self):
+        while self.history_size() > self.history_tokens and len(self.chat_history) > 2:
+            del self.chat_history[:2]
+
+
+def run(label, bot, prompts, server):
+    latencies = []
+    over_ctx = None
+    before = server.stats["prompt_eval_chars"]
+    for turn, prompt in enumerate(prompts, start=1):
+        start = time.perf_counter()
+        bot.chat(prompt)
+        latencies.append(time.perf_counter() - start)
+        if over_ctx is None and bot.history_size() > NUM_CTX:
+            over_ctx = turn
+    bot.wait()
+    marks = [m for m in (10, 50, 100, 200) if m <= len(prompts)]
+    at = "  ".join(f"t{m} {statistics.mean(latencies[max(0, m - 10):m]) * 1000:5.0f}" for m in marks)
+    print(f"{label:<16} ms/turn: {at}   total {sum(latencies):5.1f} s   "
+          f"prompt chars evaluated {(server.stats['prompt_eval_chars'] - before) / 1e6:5.2f} M   "
+          f"history {bot.history_size()} tokens")
+    if over_ctx:
+        # A real server would truncate or shift the context here, losing the cache and the start
+        print(f"{'':<16} prompt exceeds num_ctx {NUM_CTX} from turn {over_ctx}")
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(0)
+    prompts = [" ".join(rng.choice(WORDS) for _ in range(40)) + "?" for _ in range(turns)]
+    print(f"{turns} turns; averages over the 10 turns before each mark\n")
+    with fake_ollama_server(respond, token_latency=TOKEN_LATENCY, prompt_latency=PROMPT_LATENCY, kv_cache=True) as server:
+        llm_client.configure(base_url=server.url)
+        run("full history", ChatBot(history_tokens=10 ** 9), prompts, server)
+        run("naive window", NaiveWindowBot(), prompts, server)
+        run("summary window", ChatBot(), prompts, server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Content cache behaviour under repeated uploads: hit rate, saved time, LRU eviction, cross-process sharing.
+
+    python -m benchmarks.bench_content_cache
+
+"OCR" is a 200 ms sleep standing in for a Vision call. Uploads follow a skewed
+distribution (a few files are re-uploaded often), and every upload is written to a fresh
+temp file the way streamlit_app.py does, so hits come from the content hash alone.
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.common.content_cache import ContentCache, format_stats
+
+COMPUTE_SECONDS = 0.2
+UPLOADS = 60
+DISTINCT_FILES = 15
+
+
+def fake_ocr(path):
+    time.sleep(COMPUTE_SECONDS)
+    with open(path, "rb") as f:
+        data = f.read()
+    return {"text": f"{len(data)} bytes of text", "pages": [{"blocks": [{"text": "x" * 2000}]}]}
+
+
+def make_files(rng):
+    return [rng.randbytes(200_000 + i) for i in range(DISTINCT_FILES)]
+
+
+def upload(cache, data, root):
+    fd, path = tempfile.mkstemp(dir=root, suffix=".jpg")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    try:
+        return cache.cached_json("ocr", "fake-ocr/1", path, lambda: fake_ocr(path))
+    finally:
+        os.remove(path)
+
+
+def run_uploads(cache_dir, root, seed, max_bytes):
+    rng = random.Random(seed)
+    files = make_files(random.Random(0))
+    cache = ContentCache(cache_dir, max_bytes=max_bytes)
+    weights = [1 / (i + 1) for i in range(len(files))]
+    start = time.perf_counter()
+    for _ in range(UPLOADS // 2):
+        upload(cache, rng.choices(files, weights)[0], root)
+    return time.perf_counter() - start
+
+
+def main():
+    root = tempfile.mkdtemp(prefix="content_cache_bench_")
+    try:
+        for label, max_bytes in (("unbounded", 1 << 40), ("bounded to ~6 results", 6 * 2200)):
+            cache_dir = os.path.join(root, label.replace(" ", "_"))
+            # Two processes (think main.py and streamlit_app.py) share one cache directory
+            with ProcessPoolExecutor(2) as pool:
+                elapsed = list(pool.map(run_uploads, [cache_dir] * 2, [root] * 2, [1, 2], [max_bytes] * 2))
+            stats = ContentCache(cache_dir, max_bytes=max_bytes).stats()["ocr"]
+            uncached = UPLOADS * COMPUTE_SECONDS
+            print(f"{label}:")
+            print(f"  {format_stats({'ocr': stats})}")
+            print(f"  wall time per process {max(elapsed):.1f} s vs {uncached / 2:.1f} s uncached\n")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
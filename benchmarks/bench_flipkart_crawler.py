@@ -0,0 +1,52 @@
+import asyncio
+import shutil
+import tempfile
+import time
+
+from modules.flipkart_reviews_sentiment.crawler import AdaptiveRateLimiter, crawl_reviews_async, iter_saved_reviews
+from benchmarks.fixtures import flipkart_review_page
+from benchmarks.servers import throttled_review_server
+
+TOTAL_PAGES = 30
+
+
+def run(workers, max_rps):
+    out_dir = tempfile.mkdtemp(prefix="crawl_")
+    with throttled_review_server(flipkart_review_page, TOTAL_PAGES, max_rps=max_rps) as server:
+        url = f"{server.url}/product-reviews/demo?pid=DEMO{workers}"
+        start = time.perf_counter()
+        summary = asyncio.run(crawl_reviews_async(url, max_pages=TOTAL_PAGES + 5, out_dir=out_dir, workers=workers,
+                                                  limiter=AdaptiveRateLimiter(rate=4.0, max_rate=20.0, increase=0.5, burst=workers)))
+        elapsed = time.perf_counter() - start
+        rows = list(iter_saved_reviews(summary["reviews_path"]))
+        print(f"workers={workers:<3} pages={len(summary['pages_done']):<4} reviews={len(rows):<5} "
+              f"429s={server.stats['throttled']:<4} failed={len(summary['pages_failed'])} {elapsed:6.2f}s")
+    shutil.rmtree(out_dir)
+
+
+def run_resume(max_rps):
+    # Kill the crawl part-way through, then resume from the checkpoint
+    out_dir = tempfile.mkdtemp(prefix="crawl_")
+    with throttled_review_server(flipkart_review_page, TOTAL_PAGES, max_rps=max_rps) as server:
+        url = f"{server.url}/product-reviews/demo?pid=RESUME"
+
+        async def interrupted():
+            try:
+                await asyncio.wait_for(crawl_reviews_async(url, max_pages=TOTAL_PAGES, out_dir=out_dir, workers=4), timeout=2)
+            except asyncio.TimeoutError:
+                pass
+
+        asyncio.run(interrupted())
+        served_first = server.stats["served"]
+        summary = asyncio.run(crawl_reviews_async(url, max_pages=TOTAL_PAGES, out_dir=out_dir, workers=4))
+        rows = list(iter_saved_reviews(summary["reviews_path"]))
+        pages = {r["page"] for r in rows}
+        print(f"resume: first run served {served_first} pages, total served {server.stats['served']}, "
+              f"reviews={len(rows)} (expected {TOTAL_PAGES * 10}), pages={len(pages)}")
+    shutil.rmtree(out_dir)
+
+
+if __name__ == "__main__":
+    for workers in (1, 4, 8):
+        run(workers, max_rps=6.0)
+    run_resume(max_rps=6.0)
@@ -0,0 +1,36 @@
+import time
+
+from modules.common.html_extractor import FLIPKART_REVIEW_SPEC, extract_records
+from modules.flipkart_reviews_sentiment.sentiment_pipeline import get_classifier, score_review_stream
+from benchmarks.fixtures import fixture_path, flipkart_review_page
+
+PAGES = 20
+
+
+def load_pages():
+    pages = []
+    for page in range(1, PAGES + 1):
+        path = fixture_path(f"flipkart_review_page_{page}.html", flipkart_review_page, page=page)
+        with open(path, "rb") as f:
+            pages.append((page, extract_records(f.read(), FLIPKART_REVIEW_SPEC)))
+    return pages
+
+
+def run(pages, batch_size):
+    start = time.perf_counter()
+    first = None
+    for summary in score_review_stream(pages, batch_size=batch_size):
+        if first is None:
+            first = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    print(f"batch={batch_size:<4} reviews={summary['reviews']:<5} {summary['reviews'] / elapsed:8.1f} reviews/s "
+          f"first partial after {first * 1000:7.1f} ms, total {elapsed:6.2f}s")
+
+
+if __name__ == "__main__":
+    pages = load_pages()
+    start = time.perf_counter()
+    get_classifier()
+    print(f"model load: {time.perf_counter() - start:.2f}s")
+    for batch_size in (1, 8, 32, 64):
+        run(pages, batch_size)
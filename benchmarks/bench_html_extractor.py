@@ -0,0 +1,40 @@
+import time
+import tracemalloc
+
+from modules.common.html_extractor import BACKENDS, CHUNK_SIZE, FLIPKART_REVIEW_SPEC, MONEYCONTROL_NEWS_SPEC, extract_records
+from benchmarks.fixtures import fixture_path, flipkart_review_page, moneycontrol_tag_page
+
+REPEATS = 20
+
+
+def _chunks(data):
+    # Mimics response.iter_content(): the parser only sees what has arrived so far
+    for i in range(0, len(data), CHUNK_SIZE):
+        yield data[i:i + CHUNK_SIZE]
+
+
+def run(path, spec):
+    with open(path, "rb") as f:
+        data = f.read()
+    print(f"\n{spec.name}: {path} ({len(data) / 1024:.0f} KiB)")
+    print(f"{'backend':<12}{'records':>8}{'ms/page':>10}{'peak KiB':>10}")
+
+    for backend in BACKENDS:
+        records = extract_records(_chunks(data), spec, backend=backend)
+
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            extract_records(_chunks(data), spec, backend=backend)
+        ms = (time.perf_counter() - start) * 1000 / REPEATS
+
+        tracemalloc.start()
+        extract_records(_chunks(data), spec, backend=backend)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{backend:<12}{len(records):>8}{ms:>10.2f}{peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    run(fixture_path("moneycontrol_tag_page.html", moneycontrol_tag_page), MONEYCONTROL_NEWS_SPEC)
+    run(fixture_path("flipkart_review_page.html", flipkart_review_page), FLIPKART_REVIEW_SPEC)
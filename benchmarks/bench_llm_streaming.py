@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from modules.common import llm_client
+from modules.NL2SQL.query_generator import get_sql_from_ollama
+from benchmarks.servers import fake_ollama_server
+
+SQL_ANSWER = (
+    "SELECT title, likes FROM youtube_data1.trending_videos WHERE region = 'US' "
+    "AND published_date >= '2023-01-01' ORDER BY likes DESC LIMIT 10;\n\n"
+    "Explanation: this query selects the title and likes columns from the trending videos table, "
+    "filters on the US partition and videos published after 2023, sorts by likes and keeps ten rows. "
+    * 3
+)
+NOTES_ANSWER = " ".join(f"- point {i} about the lecture" for i in range(40))
+
+
+def respond(payload):
+    return SQL_ANSWER if "SQL:" in payload.get("prompt", "") else NOTES_ANSWER
+
+
+def main():
+    with fake_ollama_server(respond, token_latency=0.01) as server:
+        client = llm_client.configure(base_url=server.url)
+        messages = [{"role": "user", "content": "make notes"}]
+
+        start = time.perf_counter()
+        client.session.post(f"{server.url}/api/chat", json={"model": "llama3.1", "messages": messages, "stream": False}).json()
+        blocking = time.perf_counter() - start
+        print(f"non-streaming chat:   first output after {blocking * 1000:7.0f} ms")
+
+        stream = client.stream_chat(messages)
+        for _ in stream:
+            pass
+        print(f"streaming chat:       first token after {stream.ttft * 1000:7.0f} ms, done after {stream.elapsed * 1000:7.0f} ms")
+
+        async def consume():
+            start = time.perf_counter()
+            first = None
+            async for _ in client.astream_chat(messages):
+                first = first or time.perf_counter() - start
+            return first, time.perf_counter() - start
+
+        first, total = asyncio.run(consume())
+        print(f"async streaming chat: first token after {first * 1000:7.0f} ms, done after {total * 1000:7.0f} ms")
+
+        full = len(SQL_ANSWER.split()) * 0.01
+        start = time.perf_counter()
+        sql = get_sql_from_ollama("top 10 liked US videos after 2023")
+        print(f"SQL with early stop:  {(time.perf_counter() - start) * 1000:7.0f} ms (full generation ~{full * 1000:.0f} ms)")
+        print(f"  -> {sql}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Startup and per-prompt cost of finding the city in a weather prompt.
+
+    python -m benchmarks.bench_location_extractor [prompts]
+
+Startup is measured in fresh interpreters: the full en_core_web_sm pipeline (what
+weather_fetcher and streamlit_app each loaded at import) vs. the NER-only pipeline, and
+the gazetteer alone. Per prompt: the full pipeline, the NER-only pipeline one call at a
+time and through nlp.pipe, and the gazetteer with the model as fallback. spaCy sections
+are skipped when spaCy or the model is not installed.
+"""
+import random
+import subprocess
+import sys
+import time
+
+from modules.weather import location_extractor as le
+
+KNOWN = ["Pune", "new delhi", "MUMBAI", "Bangalore", "london", "New York", "kochi", "Tokyo", "hyderabad"]
+UNKNOWN = ["Shirdi", "Lonavala", "Mahabaleshwar", "Hampi", "Coorg"]
+TEMPLATES = [
+    "what's the weather in {}",
+    "will it rain in {} tomorrow?",
+    "how hot is it in {} right now",
+    "{} weather please",
+    "temperature at {} today",
+]
+
+
+def make_prompts(count, seed=0):
+    rng = random.Random(seed)
+    prompts = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.1:
+            prompts.append("what's the weather like today?")
+        else:
+            city = rng.choice(KNOWN if roll < 0.8 else UNKNOWN)
+            prompts.append(rng.choice(TEMPLATES).format(city))
+    return prompts
+
+
+def startup(label, code):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(f"{label:<34} skipped: {result.stderr.strip().splitlines()[-1]}")
+        return
+    print(f"{label:<34} {elapsed * 1000:7.0f} ms  (fresh interpreter, import + load)")
+
+
+def per_prompt(label, fn, prompts):
+    start = time.perf_counter()
+    fn(prompts)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed / len(prompts) * 1000:7.3f} ms/prompt")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    prompts = make_prompts(count)
+
+    print("Startup")
+    startup("python baseline", "pass")
+    startup("gazetteer only", "from modules.weather.location_extractor import match_known_city")
+    startup("spaCy full pipeline", f"import spacy; spacy.load({le.SPACY_MODEL!r})")
+    startup("spaCy NER only", "from modules.weather.location_extractor import get_nlp; get_nlp()")
+
+    print(f"\nPer prompt ({count} prompts)")
+    hits = sum(le.match_known_city(p) is not None for p in prompts)
+    per_prompt("gazetteer", lambda ps: [le.match_known_city(p) for p in ps], prompts)
+    print(f"{'':<34} {hits / count:.0%} answered without a model")
+    try:
+        import spacy
+        full = spacy.load(le.SPACY_MODEL)
+        ner = le.get_nlp()
+    except (ImportError, OSError) as e:
+        print(f"spaCy sections skipped: {e}")
+        return
+    print(f"{'':<34} full: {', '.join(full.pipe_names)}; trimmed: {', '.join(ner.pipe_names)}")
+    per_prompt("full pipeline, one by one", lambda ps: [le._first_gpe(full(p.title())) for p in ps], prompts)
+    per_prompt("NER only, one by one", lambda ps: [le._first_gpe(ner(p.title())) for p in ps], prompts)
+    per_prompt("NER only, nlp.pipe", lambda ps: [le._first_gpe(d) for d in ner.pipe(p.title() for p in ps)], prompts)
+    per_prompt("gazetteer + NER fallback (batch)", le.extract_cities, prompts)
+    le.extract_city.cache_clear()
+    per_prompt("extract_city, one by one", lambda ps: [le.extract_city(p) for p in ps], prompts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import re
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from modules.common import llm_client
+from modules.NL2SQL import query_generator
+from modules.NL2SQL.query_cache import NL2SQLCache
+from benchmarks.servers import fake_ollama_server
+
+QUESTIONS = [
+    "List top 10 most liked videos published after 2023 from the US.",
+    "Show me the top 10 most liked videos published after 2023 from the US",
+    "How many videos per category in IN?",
+    "how many videos per category in IN",
+    "Top 5 channels by views in GB",
+    "List top 10 most liked videos published after 2023 from the US.",
+    "Top 5 channels by views in US",
+    "give me top 5 channels by views in GB",
+    "How many videos per category?",  # differs from the IN question only by the region code
+]
+
+
+def fake_sql(payload):
+    question = re.search(r"User Question: (.*)", payload["prompt"]).group(1)
+    regions = re.findall(r"\b(US|IN|GB)\b", question)
+    where = f" WHERE region = '{regions[-1]}'" if regions else ""
+    return f"SELECT * FROM youtube_data1.trending_videos{where} LIMIT 10;"
+
+
+def fake_spark(sql):
+    time.sleep(0.5)  # stands in for a Spark job
+    return pd.DataFrame({"video_id": [f"v{i}" for i in range(10)], "views": range(10)})
+
+
+def run():
+    cache_dir = tempfile.mkdtemp(prefix="nl2sql_cache_")
+    version = {"n": 1}
+    cache = NL2SQLCache(cache_dir=cache_dir, version_fn=lambda table: f"v{version['n']}")
+
+    wrong = 0
+    with fake_ollama_server(fake_sql, prompt_latency=1.0) as server:
+        llm_client.configure(base_url=server.url)
+        for i, question in enumerate(QUESTIONS):
+            if i == 5:
+                # Table was rewritten: results for the old snapshot must not be served
+                version["n"] += 1
+                cache.invalidate_table("youtube_data1.trending_videos")
+            start = time.perf_counter()
+            sql = cache.get_sql(question, query_generator.get_sql_from_ollama)
+            cache.get_result(sql, fake_spark)
+            regions = re.findall(r"\b(US|IN|GB)\b", question)
+            wrong += f"region = '{regions[-1]}'" not in sql if regions else "WHERE" in sql
+            print(f"{(time.perf_counter() - start) * 1000:8.1f} ms  {question}")
+        print(f"LLM calls: {server.stats['requests']} for {len(QUESTIONS)} questions, "
+              f"SQL for the wrong region: {wrong}")
+
+    print(cache.stats.as_dict())
+    shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    run()
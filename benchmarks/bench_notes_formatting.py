@@ -0,0 +1,78 @@
+"""Notes formatting on multi-page OCR output: one prompt vs. chunked, concurrent formatting.
+
+    python -m benchmarks.bench_notes_formatting [pages]
+
+The OCR document is synthetic (a few layout blocks per page) and the model is a local fake
+Ollama that writes roughly as many words as it is given, charging prompt and per-token time
+and processing at most MAX_PARALLEL requests at once (like OLLAMA_NUM_PARALLEL). The fake
+model's requests do not slow each other down, so the speedup is an upper bound for what a
+real server with parallel slots gives.
+"""
+import random
+import sys
+import time
+
+from modules.common import llm_client, semantic_cache
+from modules.notes_maker.gpt_formatter import CHUNK_TOKENS, approx_tokens, split_document, stream_notes
+from benchmarks.servers import fake_ollama_server
+
+PROMPT_LATENCY = 0.02        # per 1000 prompt characters
+TOKEN_LATENCY = 0.002
+MAX_PARALLEL = 4
+NUM_CTX = 8192
+
+WORDS = ("gradient descent learning rate momentum loss function convergence batch epoch "
+         "regularization overfitting validation accuracy model parameter update step").split()
+
+
+def make_document(pages, seed=0):
+    rng = random.Random(seed)
+    document = []
+    for _ in range(pages):
+        blocks = []
+        for _ in range(rng.randint(4, 7)):
+            lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14))) for _ in range(rng.randint(3, 8))]
+            blocks.append({"text": "\n".join(lines), "confidence": 0.95, "box": []})
+        document.append({"text": "\n\n".join(b["text"] for b in blocks), "blocks": blocks})
+    return {"text": "\n\n".join(p["text"] for p in document), "pages": document}
+
+
+def respond(payload):
+    prompt = payload["messages"][-1]["content"]
+    words = prompt.split("\n\n", 1)[-1].split()
+    return "\n".join("- " + " ".join(words[i:i + 10]) for i in range(0, len(words), 12))
+
+
+def run(label, tokens):
+    start = time.perf_counter()
+    first = None
+    text = ""
+    for token in tokens:
+        if first is None:
+            first = time.perf_counter() - start
+        text += token
+    total = time.perf_counter() - start
+    print(f"{label:<28} first token {first:6.2f} s   done {total:6.2f} s   ({len(text.split())} words)")
+    return total
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    document = make_document(pages)
+    tokens = approx_tokens(document["text"])
+    chunks = split_document(document)
+    print(f"{pages} pages, ~{tokens} tokens of OCR text, {len(chunks)} chunks of <= ~{CHUNK_TOKENS} tokens"
+          f"{'  (one prompt would exceed num_ctx ' + str(NUM_CTX) + ')' if tokens > NUM_CTX else ''}\n")
+    with fake_ollama_server(respond, token_latency=TOKEN_LATENCY, prompt_latency=PROMPT_LATENCY,
+                            max_parallel=MAX_PARALLEL) as server:
+        llm_client.configure(base_url=server.url)
+        # Every run formats the same document; each must reach the model
+        semantic_cache._cache = semantic_cache._Disabled()
+        baseline = run("one prompt", stream_notes(document["text"], budget=10 ** 9))
+        for workers in (1, 2, MAX_PARALLEL):
+            total = run(f"chunked, {workers} workers", stream_notes(document, workers=workers))
+            print(f"{'':<28} speedup x{baseline / total:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Pages/sec for each OCR backend, sequential vs. parallel, plus the upload size saved by prepare_image.
+
+    python -m benchmarks.bench_ocr [pages]
+
+Pages are synthetic A4 scans (2480x3508 PNG) with typed lines of text. Backends that are
+not installed or configured (Google credentials, the tesseract binary, easyocr) are
+skipped. A CPU-bound "stub" backend always runs, to show the process-pool scaling
+independent of the engine.
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from modules.notes_maker import ocr_engine
+
+LINES = [
+    "Lecture 4: Gradient descent and learning rates",
+    "- Step size too large: the loss oscillates or diverges",
+    "- Step size too small: slow convergence, stuck on plateaus",
+    "Momentum keeps a running average of past gradients.",
+    "Adam combines momentum with per-parameter scaling.",
+]
+
+
+class StubOCR:
+    """Spends ~150 ms of CPU per page, like a small local model."""
+
+    name = "stub"
+    version = "stub/1"
+    parallel = "processes"
+
+    @classmethod
+    def engine_version(cls):
+        return cls.version
+
+    def ocr(self, image_bytes):
+        deadline = time.process_time() + 0.15
+        while time.process_time() < deadline:
+            pass
+        image = Image.open(io.BytesIO(image_bytes))
+        return {"text": LINES[0], "width": image.width, "height": image.height, "blocks": []}
+
+
+ocr_engine.BACKENDS["stub"] = "benchmarks.bench_ocr:StubOCR"
+
+
+def make_pages(root, count):
+    try:
+        font = ImageFont.load_default(size=48)
+    except TypeError:
+        font = ImageFont.load_default()
+    paths = []
+    for n in range(count):
+        image = Image.new("RGB", (2480, 3508), "white")
+        draw = ImageDraw.Draw(image)
+        for i in range(40):
+            draw.text((200, 200 + i * 80), f"{n + 1}.{i + 1}  {LINES[i % len(LINES)]}", fill="black", font=font)
+        path = os.path.join(root, f"page_{n + 1}.png")
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+def bench_backend(name, paths):
+    try:
+        ocr_engine.backend_class(name).engine_version()  # fails when the engine is not installed
+    except Exception as e:
+        print(f"{name:<10} skipped: {e}")
+        return
+    for workers in sorted({1, max(2, ocr_engine.WORKERS)}):
+        # Warm the pool (process start-up and engine load) so only OCR is timed
+        ocr_engine.ocr_document(paths[:workers], backend=name, workers=workers, use_cache=False)
+        start = time.perf_counter()
+        document = ocr_engine.ocr_document(paths, backend=name, workers=workers, use_cache=False)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<10} workers={workers}  {len(paths) / elapsed:6.2f} pages/s  "
+              f"({len(document['text'])} chars)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    root = tempfile.mkdtemp(prefix="ocr_bench_")
+    try:
+        paths = make_pages(root, count)
+        original = sum(os.path.getsize(p) for p in paths)
+        start = time.perf_counter()
+        prepared = [ocr_engine.prepare_image(p) for p in paths]
+        prep_ms = (time.perf_counter() - start) * 1000 / count
+        print(f"{count} pages: {original / count / 1024:.0f} KiB/page as scanned, "
+              f"{sum(map(len, prepared)) / count / 1024:.0f} KiB/page after prepare_image "
+              f"({prep_ms:.0f} ms/page)\n")
+        for name in ("stub", "tesseract", "easyocr", "google"):
+            bench_backend(name, paths)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
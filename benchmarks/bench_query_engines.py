@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.NL2SQL.query_engine import DuckDBEngine, SparkEngine, SparkSessionManager
+
+QUERIES = [
+    "SELECT title, likes FROM youtube_data1.trending_videos WHERE region = 'US' ORDER BY likes DESC LIMIT 10",
+    "SELECT category, COUNT(*) AS n FROM youtube_data1.trending_videos WHERE region = 'IN' GROUP BY category",
+    "SELECT * FROM youtube_data1.trending_videos",
+]
+
+
+def make_table(root, rows=200_000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "video_id": [f"v{i}" for i in range(rows)],
+        "title": [f"title {i}" for i in range(rows)],
+        "channel": rng.choice([f"ch{i}" for i in range(500)], rows),
+        "category": rng.choice(["Music", "Gaming", "News", "Sports", "Education"], rows),
+        "region": rng.choice(["US", "IN", "GB", "CA"], rows),
+        "views": rng.integers(0, 10_000_000, rows),
+        "likes": rng.integers(0, 500_000, rows),
+        "comments": rng.integers(0, 50_000, rows),
+    })
+    path = os.path.join(root, "youtube_data1", "trending_videos")
+    df.to_parquet(path, partition_cols=["region"], index=False)
+    return path
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def bench_duckdb(root):
+    cold_ms, engine = timed(lambda: DuckDBEngine(root))
+    for sql in QUERIES:
+        first_ms, df = timed(lambda: engine.query(sql, max_rows=10_000))
+        warm_ms, _ = timed(lambda: engine.query(sql, max_rows=10_000))
+        print(f"duckdb  start {cold_ms:8.1f} ms | first {first_ms:8.1f} ms | warm {warm_ms:8.1f} ms | rows {len(df):>6}")
+
+
+def bench_spark(table_path):
+    try:
+        import pyspark  # noqa: F401
+    except ImportError:
+        print("spark   skipped (pyspark not installed)")
+        return
+    sessions = SparkSessionManager(app_name="NL2SQLBenchmark")
+    cold_ms, spark = timed(sessions.get)
+    spark.sql("CREATE DATABASE IF NOT EXISTS youtube_data1")
+    spark.sql(f"CREATE TABLE IF NOT EXISTS youtube_data1.trending_videos USING parquet LOCATION '{table_path}'")
+    spark.sql("MSCK REPAIR TABLE youtube_data1.trending_videos")
+    engine = SparkEngine(sessions)
+    for sql in QUERIES:
+        first_ms, df = timed(lambda: engine.query(sql, max_rows=10_000))
+        warm_ms, _ = timed(lambda: engine.query(sql, max_rows=10_000))
+        print(f"spark   start {cold_ms:8.1f} ms | first {first_ms:8.1f} ms | warm {warm_ms:8.1f} ms | rows {len(df):>6}")
+    spark.sql("DROP TABLE youtube_data1.trending_videos")
+    sessions.stop()
+
+
+if __name__ == "__main__":
+    root = tempfile.mkdtemp(prefix="nl2sql_parquet_")
+    table_path = make_table(root)
+    bench_duckdb(root)
+    bench_spark(table_path)
+    shutil.rmtree(root)
@@ -0,0 +1,127 @@
+"""Prompt size and NL2SQL latency: whole-catalog prompts vs. retrieved schema with a stable prefix.
+
+    python -m benchmarks.bench_schema_prompting
+
+Builds a 12-table catalog as local Parquet, introspects it through DuckDB, then sends the
+same questions to a fake Ollama that charges prompt processing only for the part of the
+prompt after the prefix shared with the previous request (how a loaded model reuses its KV
+cache).
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from modules.common import llm_client
+from modules.NL2SQL import query_generator
+from modules.NL2SQL.query_engine import DuckDBEngine
+from modules.NL2SQL.schema_registry import SchemaRegistry, duckdb_catalog_tables
+from benchmarks.servers import fake_ollama_server
+
+PROMPT_LATENCY = 0.5  # seconds per 1000 prompt characters evaluated
+
+CATALOG = {
+    "trending_videos": ["video_id", "title", "channel", "category", "region", "views", "likes", "comments",
+                        "tags", "published_date", "fetched_on"],
+    "channels": ["channel_id", "channel", "country", "subscribers", "total_views", "video_count", "created_date"],
+    "video_comments": ["comment_id", "video_id", "author", "text", "like_count", "reply_count", "published_at"],
+    "categories": ["category_id", "category", "assignable"],
+    "playlists": ["playlist_id", "channel_id", "title", "item_count", "published_at"],
+    "playlist_items": ["playlist_id", "video_id", "position", "added_at"],
+    "video_stats_daily": ["video_id", "day", "views", "likes", "dislikes", "comments", "shares", "watch_minutes",
+                          "avg_view_duration", "subscribers_gained", "subscribers_lost", "impressions",
+                          "click_through_rate", "region"],
+    "ads": ["ad_id", "video_id", "advertiser", "impressions", "clicks", "spend", "start_date", "end_date"],
+    "creators": ["creator_id", "channel_id", "name", "email", "joined_on", "tier"],
+    "live_streams": ["stream_id", "channel_id", "title", "peak_viewers", "duration_minutes", "started_at"],
+    "search_terms": ["term", "region", "searches", "day"],
+    "music_tracks": ["track_id", "video_id", "artist", "track_title", "license", "duration_seconds"],
+}
+
+QUESTIONS = [
+    "List top 10 most liked videos published after 2023 from the US.",
+    "Which channels have the most subscribers?",
+    "Show the most liked comments on trending videos in IN",
+    "Top 5 advertisers by ad spend",
+    "How many trending videos per category in GB?",
+    "Average watch minutes per day for video stats in US",
+    "Top search terms in IN yesterday",
+    "Longest live streams by peak viewers",
+]
+
+
+def build_catalog(root):
+    for table, columns in CATALOG.items():
+        frame = pd.DataFrame({c: ["US" if c == "region" else "x"] for c in columns})
+        path = os.path.join(root, "youtube_data1", table)
+        if "region" in columns:
+            path = os.path.join(path, "region=US")
+            frame = frame.drop(columns=["region"])
+        os.makedirs(path, exist_ok=True)
+        frame.to_parquet(os.path.join(path, "part-0.parquet"), index=False)
+
+
+def full_catalog_prompt(registry, question):
+    # The old style: every table and column spelled out, one per line, on every request
+    lines = []
+    for table in registry.tables():
+        lines.append(f"\nTable: {table['name']}\nColumns:")
+        for name, dtype, _ in table["columns"]:
+            lines.append(f"- {name} ({dtype})" + ("          -- Partition column" if name in table["partitions"] else ""))
+    return f"{query_generator.PROMPT_PREFIX}\n{''.join(l + chr(10) for l in lines)}\nUser Question: {question}\nSQL:\n"
+
+
+def schema_first_prompt(registry, question):
+    # Retrieved schema, but placed before the instructions: the shared prefix is lost
+    return f"Tables:\n{registry.render(question)}\n\n{query_generator.PROMPT_PREFIX}\nUser Question: {question}\nSQL:\n"
+
+
+def respond(payload):
+    return "SELECT * FROM youtube_data1.trending_videos WHERE region = 'US' LIMIT 10;"
+
+
+def run_variant(name, build, registry):
+    with fake_ollama_server(respond, prompt_latency=PROMPT_LATENCY, kv_cache=True) as server:
+        client = llm_client.configure(base_url=server.url)
+        start = time.perf_counter()
+        for question in QUESTIONS:
+            client.generate(build(registry, question), stop_when=query_generator.sql_statement_complete)
+        elapsed = time.perf_counter() - start
+        stats = server.stats
+    n = len(QUESTIONS)
+    print(f"{name:<28} {stats['prompt_chars'] / n / 4:8.0f} {stats['prompt_eval_chars'] / n / 4:10.0f} "
+          f"{elapsed / n * 1000:10.0f}")
+
+
+def main():
+    root = tempfile.mkdtemp(prefix="schema_catalog_")
+    try:
+        build_catalog(os.path.join(root, "parquet"))
+        engine = DuckDBEngine(os.path.join(root, "parquet"))
+        cache_path = os.path.join(root, "schema.json")
+
+        start = time.perf_counter()
+        registry = SchemaRegistry(introspect=lambda: duckdb_catalog_tables(engine=engine), cache_path=cache_path)
+        registry.tables()
+        introspect_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        SchemaRegistry(introspect=None, cache_path=cache_path).tables()
+        cached_ms = (time.perf_counter() - start) * 1000
+        print(f"{len(registry.tables())} tables: introspection {introspect_ms:.1f} ms, from schema cache {cached_ms:.1f} ms\n")
+
+        for question in QUESTIONS:
+            picked = [t["name"].split(".")[1] for t, _ in registry.relevant_tables(question)]
+            print(f"  {question:<66} -> {', '.join(picked)}")
+
+        print(f"\n{'variant':<28} {'~tokens':>8} {'~evaluated':>10} {'ms/query':>10}")
+        run_variant("full catalog", full_catalog_prompt, registry)
+        run_variant("retrieved, schema first", schema_first_prompt, registry)
+        run_variant("retrieved, stable prefix", lambda r, q: query_generator.build_prompt(q, r), registry)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Hit rate and latency saved by the semantic response cache.
+
+    python -m benchmarks.bench_semantic_cache [prompts]
+
+Simulated users ask general-chat questions drawn from a pool of topics, each phrased in
+several ways, mixed with personal / time-sensitive prompts (which must never be served
+from the cache) and one-off questions. The model is a local fake Ollama. Also checks that
+long notes inputs only hit when they are the same document, and times index lookups.
+Uses sentence-transformers when installed, hashed n-grams otherwise.
+"""
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from modules.common import llm_client, semantic_cache
+from modules.common.semantic_cache import NumpyIndex, SemanticCache, format_stats, make_index
+from modules.general_chatting.chat import ChatBot
+from benchmarks.servers import fake_ollama_server
+
+TOKEN_LATENCY = 0.004
+PROMPT_LATENCY = 0.02
+
+TOPICS = {
+    "photosynthesis": ["What is photosynthesis?", "what is photosynthesis", "Explain photosynthesis.",
+                       "Can you explain photosynthesis?", "What is photosynthesis in plants?"],
+    "capital-france": ["What is the capital of France?", "what's the capital of france", "Capital of France?",
+                       "Which city is the capital of France?"],
+    "python-list": ["How do I reverse a list in Python?", "how to reverse a list in python",
+                    "Reverse a list in Python", "How can you reverse a Python list?"],
+    "black-hole": ["What is a black hole?", "Explain what a black hole is.", "what is a black hole",
+                   "Can you explain black holes?"],
+    "inflation": ["What causes inflation?", "what causes inflation in an economy", "Why does inflation happen?",
+                  "What are the causes of inflation?"],
+    "tcp-udp": ["What is the difference between TCP and UDP?", "difference between tcp and udp",
+                "TCP vs UDP: what is the difference?", "How is TCP different from UDP?"],
+    "gradient-descent": ["How does gradient descent work?", "Explain gradient descent.",
+                         "how does gradient descent work", "What is gradient descent?"],
+    "healthy-breakfast": ["Suggest a healthy breakfast.", "What is a healthy breakfast?",
+                          "Healthy breakfast ideas?", "Give some healthy breakfast ideas."],
+}
+PERSONAL = ["What should I eat today?", "Remind me what my meeting is about", "Is it going to rain now?",
+            "Explain that again", "Email me at someone@example.com"]
+
+
+def respond(payload):
+    prompt = payload["messages"][-1]["content"]
+    return f"Answer to: {prompt} " + " ".join(["detail"] * 80)
+
+
+def workload(count, seed=0):
+    rng = random.Random(seed)
+    items = []
+    for n in range(count):
+        roll = rng.random()
+        if roll < 0.15:
+            items.append((None, rng.choice(PERSONAL)))
+        elif roll < 0.25:
+            items.append((f"unique-{n}", f"Tell a short fact about the number {n * 7919}."))
+        else:
+            topic = rng.choice(list(TOPICS))
+            items.append((topic, rng.choice(TOPICS[topic])))
+    return items
+
+
+def run_chat(items, cache):
+    semantic_cache._cache = cache
+    answered = {}   # prompt -> topic that produced the answer, to catch wrong hits
+    latencies, wrong = [], 0
+    for topic, prompt in items:
+        start = time.perf_counter()
+        reply = ChatBot().chat(prompt)
+        latencies.append(time.perf_counter() - start)
+        source = reply.split("Answer to: ", 1)[-1].split(" detail", 1)[0]
+        answered.setdefault(source, topic)
+        if topic is not None and answered[source] != topic:
+            wrong += 1
+    return latencies, wrong
+
+
+def notes_guard(cache):
+    base = " ".join(f"Lecture line {i} about optimization and learning rates." for i in range(200))
+    cache.store("notes", base, "NOTES-A", 5.0, model="llama3.1")
+    ocr_noise = base.replace("rates.", "rates,", 3)
+    other = base[:3000] + " ".join(f"A different second half, topic {i}." for i in range(200))
+    short = "Exam on chapters 4 and 5, Monday 9 am, room 101."
+    cache.store("notes", short, "NOTES-B", 5.0, model="llama3.1")
+    return (cache.lookup("notes", ocr_noise, "llama3.1") == "NOTES-A",
+            cache.lookup("notes", other, "llama3.1") is None
+            and cache.lookup("notes", short.replace("101", "214"), "llama3.1") is None)
+
+
+def session_guard(cache, prompt):
+    # Once a conversation has history, its answers depend on it: no lookups, nothing stored
+    bot = ChatBot()
+    bot.chat("Let's talk about my exam schedule.")
+    seen = lambda: sum(c["hits"] + c["misses"] + c["excluded"] for c in cache.stats().values())
+    before = seen()
+    bot.chat(prompt)
+    return seen() == before
+
+
+def index_lookup_ms(factory, dim, entries=5000, queries=200):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((entries, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = factory(dim)
+    for i, v in enumerate(vectors):
+        index.add(i, v)
+    start = time.perf_counter()
+    for v in vectors[:queries]:
+        index.search(v, 5)
+    return (time.perf_counter() - start) / queries * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    items = workload(count)
+    with fake_ollama_server(respond, token_latency=TOKEN_LATENCY, prompt_latency=PROMPT_LATENCY) as server:
+        llm_client.configure(base_url=server.url)
+        uncached, _ = run_chat(items, semantic_cache._Disabled())
+        cache = SemanticCache()
+        cached, wrong = run_chat(items, cache)
+        isolated = session_guard(cache, items[0][1])
+
+    print(f"{count} chat prompts, embedder: {cache.embedder.name}, index: {type(next(iter(cache.indexes.values()))).__name__}\n")
+    print(f"no cache    mean {statistics.mean(uncached) * 1000:6.0f} ms   total {sum(uncached):6.1f} s")
+    print(f"semantic    mean {statistics.mean(cached) * 1000:6.0f} ms   total {sum(cached):6.1f} s   "
+          f"(x{sum(uncached) / sum(cached):.1f}, {sum(uncached) - sum(cached):.1f} s saved)")
+    print(format_stats(cache.stats()))
+    personal_hits = cache.stats()["chat"]["excluded"]
+    print(f"personal/time/follow-up prompts bypassed: {personal_hits}, answers from the wrong topic: {wrong}")
+    print(f"later turns of a conversation bypass the cache: {'yes' if isolated else 'NO'}")
+
+    same, different = notes_guard(cache)
+    print(f"\nnotes: OCR-noise variant hits {'yes' if same else 'NO'}, "
+          f"different documents (sharing their first part, or short and one detail apart) miss "
+          f"{'yes' if different else 'NO'}")
+
+    dim = 384
+    print(f"\nlookup over 5000 entries (dim {dim}): numpy {index_lookup_ms(NumpyIndex, dim):.2f} ms", end="")
+    index = make_index(dim)
+    if not isinstance(index, NumpyIndex):
+        print(f", {type(index).__name__} {index_lookup_ms(make_index, dim):.2f} ms", end="")
+    print()
+    return 0 if (same and different and isolated and wrong == 0) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
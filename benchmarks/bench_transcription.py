@@ -0,0 +1,112 @@
+"""Real-time factor (processing time / audio duration) of the Whisper transcription paths.
+
+    python -m benchmarks.bench_transcription [minutes] [model_size]
+
+Sample audio is generated locally: pyttsx3 speech when a TTS voice is available, otherwise
+speech-like harmonic bursts. Either way a third of the recording is silence, which is
+what VAD filtering skips.
+"""
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from benchmarks.fixtures import FIXTURE_DIR
+from modules.voice_summary import voice_transcribe as vt
+
+SENTENCES = [
+    "The quarterly report shows revenue growing faster than expected in every region.",
+    "Please remember to submit your assignments before the end of the week.",
+    "Machine learning models need careful evaluation on data they have not seen before.",
+    "The meeting has been moved to Thursday afternoon because of the holiday.",
+]
+
+
+def _write_wav(path, audio):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(vt.SAMPLE_RATE)
+        f.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+
+
+def _tts_clip(text):
+    import pyttsx3
+    path = tempfile.mktemp(suffix=".wav")
+    engine = pyttsx3.init()
+    engine.save_to_file(text, path)
+    engine.runAndWait()
+    audio = vt.decode_audio(path, sampling_rate=vt.SAMPLE_RATE)
+    os.remove(path)
+    return audio
+
+
+def _tone_clip(seconds, rng):
+    t = np.arange(int(seconds * vt.SAMPLE_RATE)) / vt.SAMPLE_RATE
+    pitch = rng.uniform(110, 220)
+    voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)  # ~4 syllables per second
+    return (0.2 * voiced * envelope).astype(np.float32)
+
+
+def sample_audio(minutes):
+    path = os.path.join(FIXTURE_DIR, f"speech_{minutes}min.wav")
+    if os.path.exists(path):
+        return path
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    rng = np.random.default_rng(0)
+    try:
+        clips = [_tts_clip(s) for s in SENTENCES]
+    except Exception:
+        clips = [_tone_clip(4.0, rng) for _ in SENTENCES]
+    pieces, total = [], 0
+    while total < minutes * 60 * vt.SAMPLE_RATE:
+        clip = clips[len(pieces) % len(clips)]
+        silence = np.zeros(int(len(clip) / 2), dtype=np.float32)
+        pieces += [clip, silence]
+        total += len(clip) + len(silence)
+    _write_wav(path, np.concatenate(pieces))
+    return path
+
+
+def measure(label, fn, duration):
+    start = time.perf_counter()
+    text = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<42} {elapsed:8.1f} s   RTF {elapsed / duration:.3f}   {len(text.split())} words")
+
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    model_size = sys.argv[2] if len(sys.argv) > 2 else "base"
+    path = sample_audio(minutes)
+    audio = vt.decode_audio(path, sampling_rate=vt.SAMPLE_RATE)
+    duration = len(audio) / vt.SAMPLE_RATE
+    print(f"{duration:.0f} s of audio, model {model_size}, {os.cpu_count()} CPUs\n")
+
+    def old_path():
+        segments, _ = vt.WhisperModel(model_size).transcribe(path)
+        return " ".join(s.text for s in segments)
+
+    def joined(segments):
+        return " ".join(s.text for s in segments)
+
+    measure("new model per call, default settings", old_path, duration)
+    start = time.perf_counter()
+    vt.get_model(model_size)
+    print(f"{'(one-off int8 model load)':<42} {time.perf_counter() - start:8.1f} s")
+    measure("cached int8 model, no VAD", lambda: joined(vt.iter_segments(audio, model_size, batch_size=1, vad_filter=False)), duration)
+    measure("cached int8 model, VAD", lambda: joined(vt.iter_segments(audio, model_size, batch_size=1)), duration)
+    if vt.get_batched_pipeline(model_size) is not None:
+        measure(f"cached int8, VAD, batched x{vt.BATCH_SIZE}", lambda: joined(vt.iter_segments(audio, model_size)), duration)
+    for workers in sorted({2, vt.PARALLEL_WORKERS}):
+        if workers > 1:
+            measure(f"{workers} worker processes (incl. model loads)",
+                    lambda: joined(vt.iter_segments_parallel(audio, model_size, workers)), duration)
+
+
+if __name__ == "__main__":
+    main()
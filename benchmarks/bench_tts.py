@@ -0,0 +1,134 @@
+"""Time-to-first-audio and total synthesis time for long notes.
+
+    python -m benchmarks.bench_tts [chars] [--real]
+
+Compares the old path (a new pyttsx3 engine per request, the whole text in one
+runAndWait) with TTSService (warm engines in worker processes, sentence chunks streamed
+in order), then shows the audio cache: the same notes again, and the notes with a few
+sentences edited (only those are synthesized again). By default the engine is simulated: creating it costs ENGINE_INIT seconds and
+speaking burns CPU per character while writing a WAV of the right length, so the numbers
+show the pipelining rather than a particular voice. `--real` uses pyttsx3.
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import wave
+
+from modules.common.content_cache import ContentCache, format_stats
+from modules.text_to_audio.tts_service import TTSService, pyttsx3_synthesize, split_for_speech
+
+ENGINE_INIT = 0.5           # seconds to create a pyttsx3 engine (SAPI5/espeak load)
+SYNTH_SECONDS_PER_CHAR = 0.0008
+SPOKEN_CHARS_PER_SECOND = 15  # ~150 words per minute
+SAMPLE_RATE = 8000
+
+SENTENCES = [
+    "Gradient descent updates every parameter in the direction that lowers the loss.",
+    "A learning rate that is too large makes the loss oscillate or diverge.",
+    "Momentum keeps a running average of past gradients, which smooths the updates.",
+    "Adam combines momentum with a per-parameter scale, so it needs less tuning.",
+    "Always check the validation loss, because the training loss alone hides overfitting.",
+]
+
+
+def simulated_synthesize(items, rate=150, volume=1.0, voice=None):
+    for text, path in items:
+        deadline = time.process_time() + SYNTH_SECONDS_PER_CHAR * len(text)
+        while time.process_time() < deadline:
+            pass  # CPU-bound, like espeak / SAPI5 rendering
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(SAMPLE_RATE)
+            f.writeframes(b"\0\0" * int(SAMPLE_RATE * len(text) / SPOKEN_CHARS_PER_SECOND))
+
+
+def make_notes(chars, seed=0):
+    # Every sentence is different (a numbered variant), as in real notes
+    rng = random.Random(seed)
+    text, i = "", 0
+    while len(text) < chars:
+        sentence = SENTENCES[i % len(SENTENCES)].replace(".", f", see example {rng.randint(1, 10 ** 6)}.")
+        text += sentence + (" " if i % 6 else "\n")
+        i += 1
+    return text[:text.rfind(".", 0, chars) + 1]
+
+
+def edit_notes(text, sentences=3, seed=1):
+    rng = random.Random(seed)
+    lines = text.split(". ")
+    for i in rng.sample(range(len(lines)), sentences):
+        lines[i] = lines[i] + " (revised)"
+    return ". ".join(lines)
+
+
+def old_path(text, path, real):
+    start = time.perf_counter()
+    if real:
+        import pyttsx3
+        engine = pyttsx3.init()
+        engine.setProperty("rate", 150)
+        engine.save_to_file(text, path)
+        engine.runAndWait()
+    else:
+        time.sleep(ENGINE_INIT)
+        simulated_synthesize([(text, path)])
+    total = time.perf_counter() - start
+    print(f"{'new engine, one call':<26} first audio {total:6.2f} s   total {total:6.2f} s")
+
+
+def timed(service, text, label, **kwargs):
+    first = None
+    start = time.perf_counter()
+
+    def on_chunk(index, total, path):
+        nonlocal first
+        if first is None:
+            first = time.perf_counter() - start
+
+    path = service.synthesize(text, on_chunk=on_chunk, **kwargs)
+    total = time.perf_counter() - start
+    with wave.open(path, "rb") as f:
+        seconds = f.getnframes() / f.getframerate()
+    print(f"{label:<26} first audio {first:6.2f} s   total {total:6.2f} s   ({seconds / 60:.1f} min of speech)")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    chars = int(args[0]) if args else 10000
+    real = "--real" in sys.argv
+    text = make_notes(chars)
+    print(f"{len(text)} characters, {len(split_for_speech(text))} chunks, "
+          f"{'pyttsx3' if real else 'simulated engine'}\n")
+    root = tempfile.mkdtemp(prefix="tts_bench_")
+    synthesize = pyttsx3_synthesize if real else simulated_synthesize
+    try:
+        old_path(text, f"{root}/old.wav", real)
+        for workers in (1, 2):
+            service = TTSService(workers=workers, audio_dir=root, synthesize=synthesize)
+            try:
+                service.warm_up()  # done once at app start-up, not per request
+                timed(service, text, f"service, {workers} workers", use_cache=False)
+            finally:
+                service.shutdown(wait=True)
+
+        print()
+        cache = ContentCache(os.path.join(root, "cache"))
+        service = TTSService(workers=2, audio_dir=root, synthesize=synthesize, cache=cache)
+        try:
+            service.warm_up()
+            timed(service, text, "cache cold")
+            timed(service, text, "same notes again")
+            timed(service, edit_notes(text), "3 sentences edited")
+            print("\n" + format_stats(cache.stats()))
+        finally:
+            service.shutdown(wait=True)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
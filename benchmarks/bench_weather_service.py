@@ -0,0 +1,166 @@
+"""Checks and timings for the weather data layer against a local fake OpenWeatherMap.
+
+    python -m benchmarks.bench_weather_service
+
+Every upstream call costs LATENCY seconds. Covers repeated prompts (old direct requests
+vs. the TTL cache), coalescing of concurrent requests for one city, including when the
+upstream call fails, batch fetches, TTL expiry and unknown cities. Exits non-zero if a
+check fails.
+"""
+import sys
+import threading
+import time
+
+import requests
+
+from modules.weather.weather_service import WeatherError, WeatherService
+from benchmarks.servers import fake_weather_server
+
+LATENCY = 0.2
+CITIES = {
+    "pune": (18.52, 73.86), "mumbai": (19.08, 72.88), "bombay": (19.08, 72.88), "delhi": (28.61, 77.21),
+    "bengaluru": (12.97, 77.59), "chennai": (13.08, 80.27), "kolkata": (22.57, 88.36),
+    "london": (51.51, -0.13), "tokyo": (35.68, 139.69),
+}
+BROKEN = {
+    "gotham": (500, {"cod": "500", "message": "internal error"}),
+    "nowhere": (200, {"name": "Nowhere", "weather": []}),  # a 200 without "coord"
+}
+
+failures = 0
+
+
+def check(label, ok, detail=""):
+    global failures
+    failures += not ok
+    print(f"{'ok  ' if ok else 'FAIL'} {label:<52} {detail}")
+
+
+def repeated_prompts(server):
+    asks = [c for _ in range(10) for c in ("Pune", "Mumbai", "Delhi", "Pune", "Chennai", "London")]
+    before = server.stats["requests"]
+    start = time.perf_counter()
+    for city in asks:
+        requests.get(f"{server.url}/data/2.5/weather", params={"q": city, "appid": "x", "units": "metric"}).json()
+    direct = time.perf_counter() - start
+    direct_calls = server.stats["requests"] - before
+
+    service = WeatherService(api_key="x", base_url=server.url)
+    before = server.stats["requests"]
+    start = time.perf_counter()
+    for city in asks:
+        service.current(city)
+    cached = time.perf_counter() - start
+    calls = server.stats["requests"] - before
+    print(f"{len(asks)} prompts over 5 cities: direct {direct / len(asks) * 1000:.0f} ms/prompt, "
+          f"{direct_calls} upstream calls; cached {cached / len(asks) * 1000:.1f} ms/prompt, {calls} upstream calls")
+    check("repeated prompts hit the cache", calls == 5, f"{calls} upstream calls")
+    service.current("pune  ")
+    check("city names are normalized", server.stats["requests"] - before == 5)
+
+
+def coalescing(server):
+    service = WeatherService(api_key="x", base_url=server.url)
+    before = server.stats["requests"]
+    barrier = threading.Barrier(20)
+    results = []
+
+    def ask():
+        barrier.wait()
+        results.append(service.current("Kolkata")["name"])
+
+    threads = [threading.Thread(target=ask) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    calls = server.stats["requests"] - before
+    check("20 concurrent asks for one city -> 1 upstream call", calls == 1 and len(results) == 20,
+          f"{calls} calls, {service.stats['coalesced']} coalesced")
+
+
+def failed_coalescing(server):
+    for city, failure in (("Gotham", "upstream error"), ("Nowhere", "malformed response")):
+        service = WeatherService(api_key="x", base_url=server.url)
+        before = server.stats["requests"]
+        barrier = threading.Barrier(10)
+        errors = []
+
+        def ask():
+            barrier.wait()
+            try:
+                service.current(city)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=ask, daemon=True) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+        hung = sum(t.is_alive() for t in threads)
+        calls = server.stats["requests"] - before
+        check(f"{failure}: every waiter gets the error", not hung and len(errors) == 10,
+              f"{calls} calls, {len(errors)} errors, {hung} still waiting")
+        check(f"{failure}: no request is left in flight", not service._inflight)
+        retry = threading.Thread(target=ask, daemon=True)
+        barrier = threading.Barrier(1)
+        retry.start()
+        retry.join(timeout=5)
+        check(f"{failure}: the next ask retries upstream",
+              not retry.is_alive() and server.stats["requests"] - before == calls + 1)
+
+
+def batch(server):
+    cities = ["Pune", "Mumbai", "Delhi", "Bengaluru", "Chennai", "Kolkata", "London", "Tokyo"]
+    service = WeatherService(api_key="x", base_url=server.url)
+    start = time.perf_counter()
+    for city in cities:
+        service.current(city)
+    sequential = time.perf_counter() - start
+    service = WeatherService(api_key="x", base_url=server.url)
+    start = time.perf_counter()
+    result = service.current_many(cities + ["Atlantis"])
+    batched = time.perf_counter() - start
+    print(f"{len(cities)} cities: one by one {sequential:.2f} s, current_many {batched:.2f} s")
+    check("current_many returns every city", all(isinstance(result[c], dict) for c in cities))
+    check("current_many reports unknown cities", isinstance(result["Atlantis"], WeatherError))
+    check("current_many runs concurrently", batched < sequential / 2, f"x{sequential / batched:.1f}")
+
+
+def expiry_and_errors(server):
+    service = WeatherService(api_key="x", base_url=server.url, ttl=0.5)
+    before = server.stats["requests"]
+    service.current("Tokyo")
+    service.current("Tokyo")
+    time.sleep(0.6)
+    service.current("Tokyo")
+    calls = server.stats["requests"] - before
+    check("entries expire after the TTL", calls == 2, f"{calls} upstream calls")
+    check("after the first call the city is fetched by coordinates",
+          server.stats["by_query"].get("35.68,139.69", 0) >= 1)
+
+    before = server.stats["requests"]
+    for _ in range(3):
+        try:
+            service.current("Atlantis")
+            check("unknown city raises WeatherError", False)
+        except WeatherError:
+            pass
+    calls = server.stats["requests"] - before
+    check("unknown cities are cached briefly", calls == 1, f"{calls} upstream calls")
+
+
+def main():
+    with fake_weather_server(CITIES, latency=LATENCY, broken=BROKEN) as server:
+        repeated_prompts(server)
+        coalescing(server)
+        failed_coalescing(server)
+        batch(server)
+        expiry_and_errors(server)
+    print(f"\n{'all checks passed' if not failures else f'{failures} checks failed'}")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,115 @@
+"""Checks the Flipkart crawler's resume and throttling behaviour against a local review server.
+
+    python -m benchmarks.check_flipkart_crawler
+
+Covers resuming an interrupted crawl (no page saved twice, saved pages not fetched again,
+a torn last line tolerated, finished crawls reused), backing off on 429 + Retry-After, and
+Retry-After parsing. Exits non-zero if a check fails.
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from email.utils import formatdate
+
+from modules.flipkart_reviews_sentiment.crawler import (
+    AdaptiveRateLimiter, CrawlCheckpoint, crawl_reviews_async, iter_saved_reviews, parse_retry_after,
+)
+from benchmarks.fixtures import flipkart_review_page
+from benchmarks.servers import throttled_review_server
+
+TOTAL_PAGES = 20
+RETRY_AFTER = 1
+
+failures = 0
+
+
+def check(label, ok, detail=""):
+    global failures
+    failures += not ok
+    print(f"{'ok  ' if ok else 'FAIL'} {label:<58} {detail}")
+
+
+def resume(out_dir):
+    with throttled_review_server(flipkart_review_page, TOTAL_PAGES, max_rps=8.0) as server:
+        url = f"{server.url}/product-reviews/demo?pid=RESUME"
+
+        async def interrupted():
+            limiter = AdaptiveRateLimiter(rate=4.0, burst=4)
+            try:
+                await asyncio.wait_for(crawl_reviews_async(url, max_pages=TOTAL_PAGES + 5, out_dir=out_dir,
+                                                           limiter=limiter), timeout=1.5)
+            except asyncio.TimeoutError:
+                pass
+
+        asyncio.run(interrupted())
+        checkpoint = CrawlCheckpoint(out_dir, "RESUME")
+        saved_first = set(checkpoint.done)
+        check("the interrupted crawl saved some pages but not all", 0 < len(saved_first) < TOTAL_PAGES,
+              f"{len(saved_first)} pages")
+        with open(checkpoint.reviews_path, "a", encoding="utf-8") as f:
+            f.write('{"page": 1, "rating": "5", "rev')  # killed mid-write
+
+        resumed_at = time.monotonic()
+        summary = asyncio.run(crawl_reviews_async(url, max_pages=TOTAL_PAGES + 5, out_dir=out_dir))
+        refetched = {page for t, page, status in server.stats["log"] if t >= resumed_at and page in saved_first}
+        check("pages saved before the interruption are not fetched again", not refetched, f"{sorted(refetched)}")
+
+        per_page = Counter(row["page"] for row in iter_saved_reviews(summary["reviews_path"]))
+        check("every page is saved exactly once", per_page == Counter({p: 10 for p in range(1, TOTAL_PAGES + 1)}),
+              f"{sum(per_page.values())} reviews over {len(per_page)} pages")
+        check("the resumed crawl completes", summary["complete"] and not summary["pages_failed"])
+
+        before = len(server.stats["log"])
+        again = asyncio.run(crawl_reviews_async(url, max_pages=TOTAL_PAGES + 5, out_dir=out_dir))
+        check("a finished crawl is reused without requests", len(server.stats["log"]) == before and again["complete"])
+
+        asyncio.run(crawl_reviews_async(url, max_pages=TOTAL_PAGES + 5, out_dir=out_dir, fresh=True))
+        check("fresh=True crawls again", len(server.stats["log"]) > before)
+
+
+def throttling(out_dir):
+    pages = 8
+    with throttled_review_server(flipkart_review_page, pages, max_rps=2.0, retry_after=RETRY_AFTER) as server:
+        url = f"{server.url}/product-reviews/demo?pid=THROTTLED"
+        limiter = AdaptiveRateLimiter(rate=10.0, max_rate=20.0, burst=2)
+        summary = asyncio.run(crawl_reviews_async(url, max_pages=pages, out_dir=out_dir, workers=2, limiter=limiter))
+        log = server.stats["log"]
+        throttled = [t for t, _, status in log if status == 429]
+        check("the server throttled the crawl", bool(throttled), f"{len(throttled)} 429s")
+        check("throttled pages are retried until saved", summary["complete"] and not summary["pages_failed"],
+              f"{len(summary['pages_done'])} pages")
+        check("the limiter slowed down", limiter.rate < 10.0 and summary["throttled"] == len(throttled),
+              f"{limiter.rate:.2f} req/s")
+
+        # Requests already on the wire may land just after a 429; nothing new until Retry-After
+        early = [t - t429 for t429 in throttled for t, _, _ in log if t429 + 0.2 < t < t429 + RETRY_AFTER - 0.1]
+        check("no request is sent before Retry-After has passed", not early,
+              f"{len(early)} early requests" if early else "")
+
+
+def retry_after_parsing():
+    check("Retry-After in seconds", parse_retry_after("2") == 2.0)
+    in_three = parse_retry_after(formatdate(time.time() + 3, usegmt=True))
+    check("Retry-After as an HTTP date", in_three is not None and 1.5 < in_three <= 3, f"{in_three}")
+    check("a past or unreadable Retry-After is ignored",
+          parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0 and parse_retry_after("soon") is None)
+
+
+def main():
+    out_dir = tempfile.mkdtemp(prefix="crawl_")
+    try:
+        resume(os.path.join(out_dir, "resume"))
+        throttling(os.path.join(out_dir, "throttling"))
+        retry_after_parsing()
+    finally:
+        shutil.rmtree(out_dir)
+    print(f"\n{'all checks passed' if not failures else f'{failures} checks failed'}")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,98 @@
+"""Checks NL2SQL cache hits, misses and invalidation when the table version changes.
+
+    python -m benchmarks.check_nl2sql_cache
+
+No LLM or Spark is needed: SQL is stored directly and results come from a counting fake.
+Exits non-zero if any case does not behave as expected.
+"""
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+from modules.NL2SQL import query_cache
+from modules.NL2SQL.query_cache import NL2SQLCache
+
+SQL = "SELECT title FROM youtube_data1.trending_videos WHERE region = 'US' ORDER BY views DESC LIMIT 10"
+
+# (cached question, asked question, expected to be served the cached SQL)
+QUESTIONS = [
+    ("Top 5 channels by views in GB", "top 5 channels by views in GB?", True),
+    ("Top 5 channels by views in GB", "Give me the top 5 channels by views in GB", True),
+    ("List videos in the US region sorted by views descending",
+     "List vidoes in the US region sorted by views descending", True),
+    ("Top 5 channels by views in GB", "Top 5 channels by views in US", False),
+    ("Top 5 channels by views in GB", "Top 10 channels by views in GB", False),
+    ("How many videos per category in IN?", "How many videos per category?", False),
+    # Opposite intent, yet close enough in wording to score above the similarity threshold
+    ("Show the titles, channels and like counts of trending videos in the US region with the highest views",
+     "Show the titles, channels and like counts of trending videos in the US region with the lowest views", False),
+    ("List the titles, channels and like counts of trending videos in the US region sorted by views descending",
+     "List the titles, channels and like counts of trending videos in the US region sorted by views ascending", False),
+    ("List the titles, channels and view counts of trending videos in the US region with the most likes",
+     "List the titles, channels and view counts of trending videos in the US region with the least likes", False),
+    ("List the titles, channels, view and like counts of trending videos in the US region published before 2023",
+     "List the titles, channels, view and like counts of trending videos in the US region published after 2023",
+     False),
+]
+
+
+def check_questions(cache_dir):
+    failures = 0
+    for cached, asked, expect_hit in QUESTIONS:
+        cache = NL2SQLCache(cache_dir=tempfile.mkdtemp(dir=cache_dir), version_fn=lambda table: "v1")
+        cache.store_sql(cached, SQL)
+        ok = (cache.lookup_sql(asked) == SQL) == expect_hit
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {'hit ' if expect_hit else 'miss'} {asked!r} after {cached!r}")
+    return failures
+
+
+def check_results(cache_dir):
+    version = {"n": 1}
+    runs = []
+    cache = NL2SQLCache(cache_dir=cache_dir, version_fn=lambda table: f"v{version['n']}")
+
+    def run(sql):
+        runs.append(sql)
+        return pd.DataFrame({"title": [f"video {len(runs)}"]})
+
+    first = cache.get_result(SQL, run)
+    steps = [("first query runs", len(runs) == 1)]
+    second = cache.get_result(SQL.replace(" FROM ", "\n  from ").replace(" WHERE ", "\n where "), run)
+    steps.append(("same SQL, other formatting, is served from the cache",
+                  len(runs) == 1 and second.equals(first)))
+    cache.get_result(SQL.replace("'US'", "'IN'"), run)
+    steps.append(("different SQL runs", len(runs) == 2))
+
+    version["n"] += 1
+    interval, query_cache.VERSION_CHECK_INTERVAL = query_cache.VERSION_CHECK_INTERVAL, 0
+    try:
+        third = cache.get_result(SQL, run)
+    finally:
+        query_cache.VERSION_CHECK_INTERVAL = interval
+    steps.append(("a new table version runs again", len(runs) == 3 and third["title"][0] == "video 3"))
+    steps.append(("results of the old version are purged", len(cache._results) == 1))
+
+    error = pd.DataFrame({"error": ["boom"]})
+    cache.get_result("SELECT 1", lambda sql: error)
+    steps.append(("error frames are not cached", cache.lookup_result("SELECT 1") is None))
+
+    for name, ok in steps:
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    return sum(not ok for _, ok in steps)
+
+
+def run():
+    cache_dir = tempfile.mkdtemp(prefix="nl2sql_cache_")
+    try:
+        failures = check_questions(cache_dir) + check_results(tempfile.mkdtemp(dir=cache_dir))
+    finally:
+        shutil.rmtree(cache_dir)
+    print(f"\n{'all checks passed' if not failures else f'{failures} check(s) failed'}")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if run() else 0)
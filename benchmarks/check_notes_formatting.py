@@ -0,0 +1,78 @@
+"""Checks that chunked notes formatting streams its parts in document order.
+
+    python -m benchmarks.check_notes_formatting
+
+The fake Ollama model echoes each chunk back and answers later parts first, so any ordering
+bug shows up as shuffled text. Exits non-zero if a check fails.
+"""
+import re
+import sys
+import time
+
+from modules.common import llm_client, semantic_cache
+from modules.notes_maker.gpt_formatter import split_document, stream_notes
+from benchmarks.bench_notes_formatting import make_document
+from benchmarks.servers import fake_ollama_server
+
+BUDGET = 300
+
+failures = 0
+
+
+def check(label, ok, detail=""):
+    global failures
+    failures += not ok
+    print(f"{'ok  ' if ok else 'FAIL'} {label:<52} {detail}")
+
+
+def respond(payload):
+    prompt = payload["messages"][-1]["content"]
+    match = re.match(r"This is part (\d+) of (\d+)", prompt)
+    part, parts = (int(match.group(1)), int(match.group(2))) if match else (1, 1)
+    if "FAIL" in prompt:
+        raise RuntimeError("model crashed")
+    time.sleep(0.05 * (parts - part))  # the last part finishes first
+    return prompt.split("\n\n", 1)[-1]
+
+
+def main():
+    document = make_document(pages=6)
+    chunks = split_document(document, BUDGET)
+    with fake_ollama_server(respond, token_latency=0.0005) as server:
+        llm_client.configure(base_url=server.url)
+        # Every run formats the same document; each must reach the model
+        semantic_cache._cache = semantic_cache._Disabled()
+
+        for workers in (1, len(chunks)):
+            notes = "".join(stream_notes(document, budget=BUDGET, workers=workers))
+            check(f"{len(chunks)} chunks, {workers} worker(s): text comes out in order",
+                  notes.split() == document["text"].split(), f"{len(notes.split())} words")
+            parts = [p for p in notes.split("\n\n") if p.strip()]
+            check(f"{len(chunks)} chunks, {workers} worker(s): one part per chunk, joined",
+                  " ".join(" ".join(c.split()) for c in chunks) == " ".join(" ".join(p.split()) for p in parts))
+
+        short = "A single short paragraph of notes."
+        check("short text is formatted in one call", "".join(stream_notes(short, budget=BUDGET)) == short)
+
+        broken = {**document, "pages": [dict(page) for page in document["pages"]]}
+        broken["pages"][2]["blocks"] = [{"text": "FAIL " + b["text"]} for b in broken["pages"][2]["blocks"]]
+        broken_chunks = split_document(broken, BUDGET)
+        failed = next(i for i, chunk in enumerate(broken_chunks) if "FAIL" in chunk)
+        streamed = []
+        try:
+            for token in stream_notes(broken, budget=BUDGET, workers=len(broken_chunks)):
+                streamed.append(token)
+            raised = False
+        except llm_client.LLMError:
+            raised = True
+        check("a failed chunk raises when the stream reaches it", raised)
+        check("every part before the failed chunk is streamed first",
+              "".join(streamed).split() == "\n\n".join(broken_chunks[:failed]).split(),
+              f"{failed} of {len(broken_chunks)} parts")
+
+    print(f"\n{'all checks passed' if not failures else f'{failures} checks failed'}")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
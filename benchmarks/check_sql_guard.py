@@ -0,0 +1,129 @@
+"""Runs a corpus of realistic LLM outputs through extract_sql + guard_sql.
+
+    python -m benchmarks.check_sql_guard
+
+Table statistics are faked (8 GiB over four region partitions), so no Spark is needed.
+Exits non-zero if any case does not behave as expected.
+"""
+import sys
+
+from modules.NL2SQL.query_generator import extract_sql
+from modules.NL2SQL.sql_guard import SQLGuardError, guard_sql
+
+GiB = 1024 ** 3
+
+
+def fake_stats(table):
+    return {"bytes": 8 * GiB, "partitions": {"US": None, "IN": None, "GB": None, "CA": None}}
+
+
+# (name, raw LLM output, expected) where expected is "reject" or a dict of checks
+CASES = [
+    ("plain one-liner",
+     "SELECT title, likes FROM youtube_data1.trending_videos WHERE region = 'US' ORDER BY likes DESC LIMIT 10;",
+     {"contains": ["LIMIT 10"], "warnings": 0}),
+    ("multi-line statement",
+     "SELECT title,\n       likes\nFROM youtube_data1.trending_videos\nWHERE region = 'US'\n  AND published_date >= '2023-01-01'\nORDER BY likes DESC\nLIMIT 10;",
+     {"contains": ["published_date >= '2023-01-01'", "LIMIT 10"], "warnings": 0}),
+    ("markdown fence with explanation",
+     "Here is the query:\n```sql\nSELECT channel, SUM(views) AS total_views\nFROM youtube_data1.trending_videos\nWHERE region = 'IN'\nGROUP BY channel\n```\nThis groups videos by channel.",
+     {"contains": ["GROUP BY channel", "LIMIT 10000"], "warnings": 0}),
+    ("statement keyword in the prose before the fence",
+     "Here is the query with a region filter:\n```sql\nSELECT title FROM youtube_data1.trending_videos\nWHERE region = 'US'\nLIMIT 10;\n```",
+     {"contains": ["SELECT title", "LIMIT 10"], "warnings": 0}),
+    ("statement keyword in the prose before unfenced SQL",
+     "To select the top videos, use:\nSELECT title FROM youtube_data1.trending_videos WHERE region = 'US' ORDER BY views DESC LIMIT 10",
+     {"contains": ["SELECT title", "LIMIT 10"], "not_contains": ["To select", "use:"], "warnings": 0}),
+    ("semicolon inside a string literal",
+     "SELECT * FROM youtube_data1.trending_videos WHERE region = 'GB' AND title = 'a; b' LIMIT 5",
+     {"contains": ["'a; b'", "LIMIT 5"], "warnings": 0}),
+    ("missing LIMIT is injected",
+     "SELECT * FROM youtube_data1.trending_videos WHERE region = 'US'",
+     {"contains": ["LIMIT 10000"], "warnings": 0}),
+    ("oversized LIMIT is lowered",
+     "SELECT video_id FROM youtube_data1.trending_videos WHERE region = 'US' LIMIT 500000",
+     {"contains": ["LIMIT 10000"], "warnings": 1}),
+    ("IN list on partition column",
+     "SELECT video_id FROM youtube_data1.trending_videos WHERE region IN ('US', 'IN') LIMIT 20",
+     {"bytes": 4 * GiB, "warnings": 0}),
+    ("CTE",
+     "WITH top AS (SELECT channel, views FROM youtube_data1.trending_videos WHERE region = 'CA')\nSELECT channel, MAX(views) FROM top GROUP BY channel",
+     {"contains": ["LIMIT 10000"], "bytes": 2 * GiB}),
+    ("UNION of two regions",
+     "SELECT title FROM youtube_data1.trending_videos WHERE region = 'US'\nUNION ALL\nSELECT title FROM youtube_data1.trending_videos WHERE region = 'IN'",
+     {"contains": ["UNION ALL", "LIMIT 10000"], "bytes": 4 * GiB}),
+    ("self-join filtered on both sides",
+     "SELECT a.title FROM youtube_data1.trending_videos a JOIN youtube_data1.trending_videos b ON a.video_id = b.video_id WHERE a.region = 'US' AND b.region = 'IN'",
+     {"warnings": 0, "bytes": 4 * GiB}),
+    ("self-join with one side unfiltered",
+     "SELECT a.title FROM youtube_data1.trending_videos a JOIN youtube_data1.trending_videos b ON a.video_id = b.video_id WHERE a.region = 'US'",
+     "reject"),
+    ("qualified by table name",
+     "SELECT trending_videos.title FROM youtube_data1.trending_videos WHERE trending_videos.region = 'GB'",
+     {"warnings": 0, "bytes": 2 * GiB}),
+    ("unfiltered small aggregate over a non-partitioned table",
+     "SELECT COUNT(*) FROM youtube_data1.channels",
+     {"warnings": 0}),
+    ("DESCRIBE is not a query", "DESCRIBE youtube_data1.trending_videos;", "reject"),
+    ("DELETE", "DELETE FROM youtube_data1.trending_videos WHERE region = 'US';", "reject"),
+    ("UPDATE", "UPDATE youtube_data1.trending_videos SET likes = 0 WHERE region = 'US'", "reject"),
+    ("INSERT ... SELECT",
+     "INSERT INTO youtube_data1.trending_videos SELECT * FROM youtube_data1.trending_videos WHERE region = 'US'",
+     "reject"),
+    ("DROP hidden behind prose", "Sure! DROP TABLE youtube_data1.trending_videos", "reject"),
+    ("no partition filter scans everything",
+     "SELECT * FROM youtube_data1.trending_videos ORDER BY views DESC", "reject"),
+    ("OR defeats partition pruning",
+     "SELECT * FROM youtube_data1.trending_videos WHERE region = 'US' OR likes > 1000", "reject"),
+    ("garbage", "I'm sorry, I can't help with that.", "reject"),
+]
+
+
+def check(name, raw, expected):
+    sql = extract_sql(raw)
+    try:
+        guarded = guard_sql(sql, stats_fn=fake_stats)
+    except SQLGuardError as e:
+        return expected == "reject", f"rejected: {e}"
+    if expected == "reject":
+        return False, f"accepted: {guarded.sql}"
+    problems = [f"missing {c!r}" for c in expected.get("contains", []) if c not in guarded.sql]
+    problems += [f"unexpected {c!r}" for c in expected.get("not_contains", []) if c in guarded.sql]
+    if "warnings" in expected and len(guarded.warnings) != expected["warnings"]:
+        problems.append(f"{len(guarded.warnings)} warnings {guarded.warnings}")
+    if "bytes" in expected and guarded.estimated_bytes != expected["bytes"]:
+        problems.append(f"estimated {guarded.estimated_bytes} bytes")
+    return not problems, "; ".join(problems) or guarded.sql
+
+
+def run():
+    failures = 0
+    for name, raw, expected in CASES:
+        ok, detail = check(name, raw, expected)
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<55} {detail}")
+
+    # Unfiltered queries are only warned about when the scan is affordable
+    guarded = guard_sql("SELECT * FROM youtube_data1.trending_videos", stats_fn=lambda t: {"bytes": GiB, "partitions": {}})
+    ok = len(guarded.warnings) == 1
+    failures += not ok
+    print(f"{'ok  ' if ok else 'FAIL'} {'missing region on a small table warns':<55} {guarded.warnings}")
+    guarded = guard_sql("SELECT a.title FROM youtube_data1.trending_videos a JOIN youtube_data1.trending_videos b "
+                        "ON a.video_id = b.video_id WHERE a.region = 'US'", stats_fn=None)
+    ok = len(guarded.warnings) == 1
+    failures += not ok
+    print(f"{'ok  ' if ok else 'FAIL'} {'self-join with one side unfiltered warns':<55} {guarded.warnings}")
+    try:
+        guard_sql("SELECT * FROM youtube_data1.trending_videos", partition_policy="enforce", stats_fn=None)
+        ok = False
+    except SQLGuardError:
+        ok = True
+    failures += not ok
+    print(f"{'ok  ' if ok else 'FAIL'} {'missing region with enforce policy rejects':<55}")
+
+    print(f"\n{len(CASES) + 3 - failures}/{len(CASES) + 3} cases passed")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if run() else 0)
@@ -0,0 +1,60 @@
+"""Checks that SQL generation stops streaming once the statement is complete.
+
+    python -m benchmarks.check_sql_streaming
+
+Replies are streamed word by word from a local Ollama stand-in; each must be cancelled right
+after its terminating ';' or closing code fence (never on prose or an opening fence) and
+yield the expected SQL. Exits non-zero if any case does not behave as expected.
+"""
+import sys
+
+from modules.common import llm_client
+from modules.NL2SQL.query_generator import extract_sql, sql_statement_complete
+from benchmarks.servers import fake_ollama_server
+
+SQL = "SELECT title FROM youtube_data1.trending_videos WHERE region = 'US' LIMIT 10"
+EXPLANATION = "\n\nThis query selects the title column and keeps ten rows of the US partition. " * 5
+
+# (name, reply, the text streamed up to the point generation should stop, or None to run to the end)
+CASES = [
+    ("terminating semicolon", f"{SQL};{EXPLANATION}", f"{SQL};"),
+    ("closing fence", f"```sql\n{SQL}\n```{EXPLANATION}", f"```sql\n{SQL}\n```"),
+    ("statement keyword in the prose before the fence",
+     f"Here is the query with a region filter:\n```sql\n{SQL};\n```{EXPLANATION}",
+     f"Here is the query with a region filter:\n```sql\n{SQL};"),
+    ("select in the prose before unfenced SQL",
+     f"To select the top videos, use:\n{SQL};{EXPLANATION}", f"To select the top videos, use:\n{SQL};"),
+    ("semicolon inside a string literal",
+     f"SELECT title FROM youtube_data1.trending_videos WHERE title = 'a; b' LIMIT 10;{EXPLANATION}",
+     "SELECT title FROM youtube_data1.trending_videos WHERE title = 'a; b' LIMIT 10;"),
+    ("unterminated statement runs to the end", SQL, None),
+]
+
+
+def run():
+    replies = {}
+    failures = 0
+    with fake_ollama_server(lambda payload: replies[payload["prompt"]], token_latency=0.002) as server:
+        client = llm_client.configure(base_url=server.url)
+        for name, reply, expected in CASES:
+            replies[name] = reply
+            stream = client.stream_generate(name, stop_when=sql_statement_complete)
+            for _ in stream:
+                pass
+            problems = []
+            if expected is None and stream.cancelled:
+                problems.append(f"cancelled after {stream.text!r}")
+            if expected is not None and (not stream.cancelled or stream.text.rstrip() != expected):
+                problems.append(f"streamed {stream.text!r}")
+            sql = extract_sql(stream.text)
+            if sql.replace("'a; b'", "'US'").replace("title = ", "region = ") != SQL:
+                problems.append(f"extracted {sql!r}")
+            failures += bool(problems)
+            print(f"{'ok  ' if not problems else 'FAIL'} {name:<50} {'; '.join(problems)}")
+
+    print(f"\n{len(CASES) - failures}/{len(CASES)} cases passed")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if run() else 0)
@@ -0,0 +1,67 @@
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+_WORDS = (
+    "market shares quarterly profit revenue growth rally slump investors guidance order book "
+    "battery display strap accuracy sleep tracking value money delivery quality comfort"
+).split()
+
+
+def _sentence(rng, n_words):
+    return " ".join(rng.choice(_WORDS) for _ in range(n_words)).capitalize()
+
+
+def _page_tail(rng, n_blocks):
+    # Trailing sidebar/footer/script noise that a full parse has to walk through
+    blocks = []
+    for i in range(n_blocks):
+        blocks.append(
+            f"<div class='widget w{i}'><ul>"
+            + "".join(f"<li class='clearfix'><a href='/x/{i}/{j}'>{_sentence(rng, 4)}</a></li>" for j in range(8))
+            + f"</ul><script>var cfg_{i} = {{'k': '{'x' * 200}'}};</script></div>"
+        )
+    return "".join(blocks)
+
+
+def moneycontrol_tag_page(n_articles=25, tail_blocks=400, seed=7):
+    rng = random.Random(seed)
+    items = "".join(
+        f"<li class='clearfix' id='newslist-{i}'>"
+        f"<a href='https://www.moneycontrol.com/news/business/stocks/article-{i}.html'><img src='/i/{i}.jpg'></a>"
+        f"<h2><a href='https://www.moneycontrol.com/news/business/stocks/article-{i}.html'>{_sentence(rng, 12)}</a></h2>"
+        f"<span>{rng.randint(1, 28)} Jul 2025</span><p>{_sentence(rng, 40)}</p></li>"
+        for i in range(n_articles)
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Tag</title></head><body>"
+        "<nav><ul><li class='nav'><a href='/'>Home</a></li></ul></nav>"
+        f"<div class='fleft'><ul id='cagetory'>{items}</ul></div>"
+        f"{_page_tail(rng, tail_blocks)}</body></html>"
+    )
+
+
+def flipkart_review_page(page=1, n_reviews=10, tail_blocks=200, seed=11):
+    rng = random.Random(seed * 1000 + page)
+    items = "".join(
+        f"<div class='col _27M-vq'><div class='row'><div class='_3LWZlK _1BLPMq'>{rng.randint(1, 5)}"
+        f"<img src='/star.svg'></div><p class='_2-N8zT'>{_sentence(rng, 3)}</p></div>"
+        f"<div class='row'><div class='t-ZTKy'><div><div>{_sentence(rng, 30)}</div></div></div></div></div>"
+        for _ in range(n_reviews)
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Reviews</title></head><body>"
+        f"<div class='_1YokD2 _3Mn1Gg'>{items}</div>"
+        f"{_page_tail(rng, tail_blocks)}</body></html>"
+    )
+
+
+def fixture_path(name, builder, **kwargs):
+    """Write a generated fixture once and reuse it across benchmark runs."""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, name)
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(builder(**kwargs))
+    return path
@@ -0,0 +1,137 @@
+"""Load test for the HTTP API (api_server.py), in the style of wrk.
+
+    python -m benchmarks.load_api [--url URL] [--scenario mixed] [--concurrency 16] [--duration 15]
+    python -m benchmarks.load_api --serve 4 --scenario classify   # starts gunicorn with 4 workers first
+
+Each of `concurrency` connections sends requests back to back for `duration` seconds.
+Reports throughput, latency percentiles and errors per endpoint, plus time to first byte
+for streamed chat. Scenarios: health, classify, weather, chat (streamed), route, and
+mixed (route and classify traffic with some streamed chat).
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+PROMPTS = {
+    "classify": ["What's the weather in Mumbai?", "Show my last 5 emails", "How is Tata Motors stock doing?",
+                 "Make notes from this image", "Tell me a joke about cats", "Convert this text to audio"],
+    "weather": ["weather in pune", "Is it raining in Delhi?", "temperature in bengaluru today", "London weather"],
+    "chat": ["What is photosynthesis?", "Explain gradient descent briefly.", "Give me three tips for focus."],
+}
+SCENARIOS = {
+    "health": [("GET", "/health", None)],
+    "classify": [("POST", "/classify", "classify")],
+    "weather": [("POST", "/weather", "weather")],
+    "chat": [("CHAT", "/chat", "chat")],
+    "route": [("POST", "/route", "classify")],
+    "mixed": [("POST", "/route", "classify")] * 3 + [("POST", "/classify", "classify")] * 2 + [("CHAT", "/chat", "chat")],
+}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+
+
+async def connection(client, scenario, deadline, results, rng):
+    while time.perf_counter() < deadline:
+        method, path, prompts = rng.choice(SCENARIOS[scenario])
+        text = rng.choice(PROMPTS[prompts]) if prompts else None
+        start = time.perf_counter()
+        try:
+            if method == "GET":
+                response = await client.get(path)
+                status = response.status_code
+            elif method == "POST":
+                response = await client.post(path, json={"text": text})
+                status = response.status_code
+            else:
+                ttfb = None
+                async with client.stream("POST", path, json={"prompt": text, "stream": True}) as response:
+                    async for _ in response.aiter_bytes():
+                        if ttfb is None:
+                            ttfb = time.perf_counter() - start
+                    status = response.status_code
+                if ttfb is not None:
+                    results["ttfb"].append(ttfb)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        results[path].append((time.perf_counter() - start, status))
+
+
+async def run(url, scenario, concurrency, duration, seed=0):
+    results = defaultdict(list)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=300, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(connection(client, scenario, deadline, results, random.Random(seed + i))
+                               for i in range(concurrency)))
+    return results
+
+
+def report(results, duration):
+    ttfb = results.pop("ttfb", [])
+    print(f"{'endpoint':<14}{'requests':>9}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  errors")
+    for path, samples in sorted(results.items()):
+        ok = [t * 1000 for t, status in samples if status == 200]
+        errors = Counter(status for _, status in samples if status != 200)
+        print(f"{path:<14}{len(samples):>9}{len(samples) / duration:>8.1f}{percentile(ok, 0.5):>9.0f}"
+              f"{percentile(ok, 0.95):>9.0f}{percentile(ok, 0.99):>9.0f}{max(ok, default=float('nan')):>9.0f}  "
+              f"{dict(errors) or '-'}")
+    total = sum(len(s) for s in results.values())
+    print(f"\ntotal {total} requests, {total / duration:.1f} req/s")
+    if ttfb:
+        print(f"chat time to first byte: p50 {statistics.median(ttfb) * 1000:.0f} ms, "
+              f"p95 {percentile(ttfb, 0.95) * 1000:.0f} ms")
+
+
+def serve(workers, port):
+    env = {**os.environ, "API_WORKERS": str(workers), "API_BIND": f"127.0.0.1:{port}"}
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "api_server:app", "-c", "gunicorn.conf.py"], env=env)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(600):  # preloading models can take a while
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return server, url
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None:
+            raise SystemExit("gunicorn exited during start-up")
+        time.sleep(0.5)
+    server.terminate()
+    raise SystemExit("API did not become healthy")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--serve", type=int, metavar="WORKERS", help="start gunicorn with this many workers")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if args.serve:
+        server, url = serve(args.serve, args.port)
+    try:
+        print(f"{args.scenario} against {url}: {args.concurrency} connections for {args.duration:.0f}s\n")
+        report(asyncio.run(run(url, args.scenario, args.concurrency, args.duration)), args.duration)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
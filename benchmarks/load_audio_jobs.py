@@ -0,0 +1,127 @@
+"""Load test for background audio-summary jobs.
+
+    python -m benchmarks.load_audio_jobs [users] [files_per_user] [--real]
+
+Several simulated users upload synthetic WAV recordings (30 s to 6 min) at the same time.
+By default each job burns CPU in its worker process for a fixed fraction of the recording
+length (standing in for Whisper) and emits the same progress events as the real pipeline;
+`--real` runs the actual transcription + summary (needs faster-whisper and Ollama).
+
+Reports accepted/rejected submissions, queue wait, completion times, and how responsive
+the submitting process stays while the workers are busy (the Streamlit script thread must
+not stall).
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+import numpy as np
+
+from modules.voice_summary.jobs import AudioJobManager, JobRejected, summarize_job
+
+SAMPLE_RATE = 16000
+SIMULATED_RTF = 0.02
+DURATIONS = [30, 90, 180, 360]
+
+
+def write_wav(path, seconds, seed):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = 0.2 * np.sin(2 * np.pi * rng.uniform(110, 220) * t) * (np.sin(2 * np.pi * 0.5 * t) > 0)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((audio * 32767).astype(np.int16).tobytes())
+
+
+def simulated_job(file_path, emit, **options):
+    with wave.open(file_path, "rb") as f:
+        duration = f.getnframes() / f.getframerate()
+    position = 0.0
+    while position < duration:
+        deadline = time.perf_counter() + 6.0 * SIMULATED_RTF
+        while time.perf_counter() < deadline:
+            pass  # CPU-bound, like Whisper
+        position = min(duration, position + 6.0)
+        emit({"event": "transcribing", "position": position, "duration": duration})
+    for token in "A short summary of the recording.".split():
+        emit({"event": "token", "text": token + " "})
+    emit({"event": "done", "text": "A short summary of the recording.", "elapsed": 0.0, "chunks": 0})
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    users = int(args[0]) if args else 6
+    per_user = int(args[1]) if len(args) > 1 else 3
+    run = summarize_job if "--real" in sys.argv else simulated_job
+
+    root = tempfile.mkdtemp(prefix="audio_jobs_")
+    manager = AudioJobManager(run=run)
+    print(f"{users} users x {per_user} uploads, {manager.max_workers} workers, "
+          f"{manager.max_queued} queue slots, {manager.max_per_owner} jobs per user\n")
+    try:
+        stalls = []
+        stop = threading.Event()
+
+        def heartbeat():
+            # Stands in for the Streamlit script thread: it should wake up on time throughout
+            while not stop.is_set():
+                start = time.perf_counter()
+                time.sleep(0.05)
+                stalls.append(time.perf_counter() - start - 0.05)
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+
+        submitted, rejected, submit_ms = {}, 0, []
+        for i in range(users * per_user):
+            user = f"user{i % users}"
+            path = os.path.join(root, f"{user}_{i}.wav")
+            write_wav(path, DURATIONS[i % len(DURATIONS)], seed=i)
+            start = time.perf_counter()
+            try:
+                submitted[manager.submit(path, owner=user, cleanup=True)] = time.perf_counter()
+            except JobRejected as e:
+                rejected += 1
+                os.remove(path)
+                print(f"  rejected {user}: {e}")
+            submit_ms.append((time.perf_counter() - start) * 1000)
+
+        poll_ms = []
+        while manager.active_jobs():
+            for job_id in submitted:
+                start = time.perf_counter()
+                manager.get(job_id)
+                poll_ms.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.2)
+        stop.set()
+        beat.join()
+
+        jobs = [manager.get(job_id) for job_id in submitted]
+        waits = [j.started - j.created for j in jobs if j.started]
+        totals = [j.finished - j.created for j in jobs if j.finished]
+        print(f"\naccepted {len(jobs)}, rejected {rejected}, "
+              f"done {sum(j.status == 'done' for j in jobs)}, failed {sum(j.status == 'failed' for j in jobs)}")
+        print(f"queue wait   p50 {percentile(waits, 0.5):6.1f} s   p95 {percentile(waits, 0.95):6.1f} s")
+        print(f"completion   p50 {percentile(totals, 0.5):6.1f} s   p95 {percentile(totals, 0.95):6.1f} s")
+        print(f"submit       mean {statistics.mean(submit_ms):6.1f} ms   max {max(submit_ms):6.1f} ms")
+        print(f"poll         mean {statistics.mean(poll_ms):6.3f} ms   max {max(poll_ms):6.3f} ms")
+        print(f"script-thread stall   p95 {percentile(stalls, 0.95) * 1000:5.1f} ms   max {max(stalls) * 1000:5.1f} ms")
+    finally:
+        manager.shutdown()
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
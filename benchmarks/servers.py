@@ -0,0 +1,221 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class LocalServer:
+    """Runs a handler class on 127.0.0.1 in a background thread; use as a context manager."""
+
+    def __init__(self, handler_cls):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # a client dropped its keep-alive connection after a streamed response
+
+    def send_body(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away (e.g. a cancelled crawl)
+
+
+def throttled_review_server(page_builder, total_pages, max_rps=4.0, retry_after=1, latency=0.05):
+    """Serves `?page=N` review pages, answering 429 + Retry-After above `max_rps`.
+
+    Pages past `total_pages` come back without reviews, like Flipkart does. stats["log"]
+    records (arrival time, page, status) for every request.
+    """
+    state = {"lock": threading.Lock(), "tokens": max_rps, "updated": time.monotonic(), "served": 0, "throttled": 0,
+             "log": []}
+
+    class Handler(QuietHandler):
+        def do_GET(self):
+            page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+            with state["lock"]:
+                now = time.monotonic()
+                state["tokens"] = min(max_rps, state["tokens"] + (now - state["updated"]) * max_rps)
+                state["updated"] = now
+                allowed = state["tokens"] >= 1
+                if allowed:
+                    state["tokens"] -= 1
+                    state["served"] += 1
+                else:
+                    state["throttled"] += 1
+                state["log"].append((now, page, 200 if allowed else 429))
+            if not allowed:
+                self.send_body(429, "Too Many Requests", headers={"Retry-After": str(retry_after)})
+                return
+            time.sleep(latency)
+            self.send_body(200, page_builder(page=page, n_reviews=10 if page <= total_pages else 0))
+
+    server = LocalServer(Handler)
+    server.stats = state
+    return server
+
+
+def fake_ollama_server(respond, token_latency=0.0, prompt_latency=0.0, kv_cache=False, max_parallel=None):
+    """Minimal Ollama stand-in for /api/generate and /api/chat.
+
+    `respond(payload)` returns the full completion text; it is split into word tokens and
+    streamed as NDJSON when the request asks for `"stream": true` (Ollama's default).
+    `prompt_latency` is charged per 1000 prompt characters to mimic prompt processing.
+    With `kv_cache`, like a loaded Ollama model, only the characters after the prefix shared
+    with the previous prompt are charged (and counted in stats["prompt_eval_chars"]).
+    `max_parallel` caps concurrently processed requests like OLLAMA_NUM_PARALLEL; others queue.
+    If `respond` raises, the request gets a 500 with Ollama's {"error": ...} body.
+    """
+    slots = threading.BoundedSemaphore(max_parallel) if max_parallel else None
+    state = {"lock": threading.Lock(), "requests": 0, "prompt_chars": 0, "prompt_eval_chars": 0,
+             "payloads": [], "last_prompt": ""}
+
+    class Handler(QuietHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if slots is None:
+                return self.generate(payload)
+            with slots:
+                return self.generate(payload)
+
+        def generate(self, payload):
+            is_chat = self.path.endswith("/api/chat")
+            prompt = payload.get("prompt", "") if not is_chat else "".join(m.get("content", "") for m in payload.get("messages", []))
+            with state["lock"]:
+                reused = 0
+                if kv_cache:
+                    previous = state["last_prompt"]
+                    while reused < min(len(prompt), len(previous)) and prompt[reused] == previous[reused]:
+                        reused += 1
+                evaluated = len(prompt) - reused
+                state["requests"] += 1
+                state["prompt_chars"] += len(prompt)
+                state["prompt_eval_chars"] += evaluated
+                state["payloads"].append(payload)
+                state["last_prompt"] = prompt
+            time.sleep(prompt_latency * evaluated / 1000)
+            try:
+                text = respond(payload)
+            except Exception as e:
+                # Like Ollama when generation fails: an error status with a JSON message
+                self.send_body(500, json.dumps({"error": str(e)}), content_type="application/json")
+                return
+
+            def message(chunk, done):
+                body = {"model": payload.get("model", "llama3.1"), "done": done}
+                if done:
+                    body["prompt_eval_count"] = evaluated // 4  # roughly 4 characters per token
+                if is_chat:
+                    body["message"] = {"role": "assistant", "content": chunk}
+                else:
+                    body["response"] = chunk
+                return body
+
+            if not payload.get("stream", True):
+                time.sleep(token_latency * len(text.split()))
+                self.send_body(200, json.dumps(message(text, True)), content_type="application/json")
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                tokens = re.findall(r"\S+\s*|\s+", text)
+                for token in tokens + [None]:
+                    if token is not None:
+                        time.sleep(token_latency)
+                    line = (json.dumps(message(token or "", token is None)) + "\n").encode("utf-8")
+                    self.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client cancelled the generation
+
+    server = LocalServer(Handler)
+    server.stats = state
+    return server
+
+
+def fake_weather_server(cities, latency=0.2, broken=None):
+    """OpenWeatherMap stand-in for /data/2.5/weather by `q=` name or `lat=`/`lon=`.
+
+    `cities` maps lower-case names (aliases allowed) to (lat, lon); unknown names get the
+    provider's 404. `broken` maps lower-case names to a canned (status, JSON body) answer,
+    for upstream failures. stats counts upstream requests in total and per query.
+    """
+    broken = broken or {}
+    state = {"lock": threading.Lock(), "requests": 0, "by_query": {}}
+    places = {}
+    for name, coords in cities.items():
+        places.setdefault(coords, name)  # the first name listed is the display name
+
+    class Handler(QuietHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            label = query.get("q") or f"{query.get('lat')},{query.get('lon')}"
+            with state["lock"]:
+                state["requests"] += 1
+                state["by_query"][label] = state["by_query"].get(label, 0) + 1
+            time.sleep(latency)
+            if "q" in query and " ".join(query["q"].lower().split()) in broken:
+                status, body = broken[" ".join(query["q"].lower().split())]
+                self.send_body(status, json.dumps(body), "application/json")
+                return
+            if "q" in query:
+                coords = cities.get(" ".join(query["q"].lower().split()))
+            else:
+                coords = next((c for c in places if abs(c[0] - float(query["lat"])) < 0.01
+                               and abs(c[1] - float(query["lon"])) < 0.01), None)
+            if coords is None:
+                self.send_body(404, json.dumps({"cod": "404", "message": "city not found"}), "application/json")
+                return
+            seed = sum(map(ord, places[coords]))
+            body = {
+                "coord": {"lat": coords[0], "lon": coords[1]},
+                "name": places[coords].title(),
+                "weather": [{"main": "Clouds", "description": "scattered clouds"}],
+                "main": {"temp": 20 + seed % 15, "feels_like": 21 + seed % 15, "humidity": 40 + seed % 50},
+                "wind": {"speed": round(1 + seed % 70 / 10, 1)},
+                "dt": int(time.time()),
+            }
+            self.send_body(200, json.dumps(body), "application/json")
+
+    server = LocalServer(Handler)
+    server.stats = state
+    return server
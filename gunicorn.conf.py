@@ -0,0 +1,30 @@
+# gunicorn api_server:app -c gunicorn.conf.py
+import gc
+import multiprocessing
+import os
+import sys
+
+bind = os.environ.get("API_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("API_WORKERS", max(2, multiprocessing.cpu_count() // 2)))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Import the app (and load its models, below) once in the master; workers are forked from it
+preload_app = True
+# LLM and scraping calls can take minutes
+timeout = 300
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    import api_server
+
+    api_server.preload()
+    # Keep the collector from touching (and so copying) the preloaded objects in each worker
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Each worker gets its share of the cores for torch / BLAS inference
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(max(1, multiprocessing.cpu_count() // workers))
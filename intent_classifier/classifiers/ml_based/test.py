@@ -2,6 +2,8 @@ import pickle
 import logging
 import os
 
+from modules.common.resources import shared_resource
+
 log_file = "intent_predictions.log"
 logging.basicConfig(
     filename=log_file,
@@ -9,19 +11,22 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-model_path = "intent_classifier/classifiers/ml_based/model/intent_classifier_pipeline.pkl"
+model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model", "intent_classifier_pipeline.pkl")
 
-try:
-    with open(model_path, "rb") as f:
-        model = pickle.load(f)
+@shared_resource("intent-ml", "scikit-learn intent pipeline")
+def get_model():
+    try:
+        with open(model_path, "rb") as f:
+            model = pickle.load(f)
+    except Exception as e:
+        logging.error(f"Failed to load model from {model_path} | Error: {str(e)}")
+        raise
     logging.info(f"Model loaded successfully from: {model_path}")
-except Exception as e:
-    logging.error(f"Failed to load model from {model_path} | Error: {str(e)}")
-    print("Error: Could not load the trained intent model.")
-    exit()
+    return model
 
 def predict_intent(text):
     try:
+        model = get_model()
         if not isinstance(text, str):
             raise ValueError("Input must be a string.")
         if not text.strip():
@@ -3,19 +3,24 @@ from transformers import BertForSequenceClassification, BertTokenizer
 import joblib
 from pathlib import Path
 
-base_dir = Path(__file__).parent / "intent_model"
+from modules.common.resources import shared_resource
 
-model = BertForSequenceClassification.from_pretrained(str(base_dir.resolve()))
-tokenizer = BertTokenizer.from_pretrained(str(base_dir.resolve()))
-label_encoder = joblib.load(str(base_dir / "label_encoder.pkl"))
+base_dir = Path(__file__).parent / "intent_model"
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model.to(device)
-model.eval()
+@shared_resource("intent-bert", "Fine-tuned BERT intent classifier")
+def get_model():
+    model = BertForSequenceClassification.from_pretrained(str(base_dir.resolve()))
+    tokenizer = BertTokenizer.from_pretrained(str(base_dir.resolve()))
+    label_encoder = joblib.load(str(base_dir / "label_encoder.pkl"))
+    model.to(device)
+    model.eval()
+    return model, tokenizer, label_encoder
 
 
 def predict_intent(query):
+    model, tokenizer, label_encoder = get_model()
     inputs = tokenizer(query, return_tensors="pt", truncation=True, padding=True, max_length=64)
     inputs = {key: val.to(device) for key, val in inputs.items()}
 
@@ -6,13 +6,19 @@ from modules.stock_market_sentiment.stock_sentiment import analyze_stock_sentime
 from modules.stock_market_sentiment.name_extractor import extract_company_name
 from modules.gmail.sub_intent_classifier.gmail_sub_intent_classifier import predict_sub_intent
 from modules.gmail.gmail_main import gmail_operation
+from modules.flipkart_reviews_sentiment.sentiment_pipeline import analyze_product_reviews, format_summary
+from modules.common.content_cache import format_stats, get_content_cache
+from modules.common import resources, semantic_cache
+from modules.voice_summary.jobs import get_job_manager
+from modules.voice_summary.main import print_progress
+import re
 
 def handle_make_notes():
     image_path = input("Enter the path to the image: ")
     try:
         notes = make_notes_from_image(image_path)
         print("Final Notes:\n", notes)
-        convert_text_to_audio(notes, "notes_audio.mp3")
+        convert_text_to_audio(notes)
     except Exception as e:
         print(f"Error in making notes: {e}")
 
@@ -35,17 +41,40 @@ def handle_stock_sentiment(user_input):
     except Exception as e:
         print(f"Sentiment analysis failed: {e}")
 
+def handle_flipkart_sentiment(user_input):
+    url_match = re.search(r"https?://\S*flipkart\.com\S*", user_input)
+    product_url = url_match.group(0) if url_match else input("Enter the Flipkart product URL: ").strip()
+    try:
+        for summary in analyze_product_reviews(product_url, max_pages=5):
+            status = "Final" if summary["complete"] else "Partial"
+            print(f"\n{status} review sentiment:\n{format_summary(summary)}")
+    except Exception as e:
+        print(f"Flipkart sentiment analysis failed: {e}")
+
 def handle_convert_to_audio():
     text_to_convert = input("Enter the text to convert to audio: ")
     try:
-        convert_text_to_audio(text_to_convert, "converted_audio.mp3")
+        convert_text_to_audio(text_to_convert)
     except Exception as e:
         print(f"Text-to-audio conversion failed: {e}")
 
 def handle_audio_summary():
-    file_path = input("Enter the path to the audio file: ")
+    file_path = input("Enter the path to the audio file: ").strip().strip('"')
     try:
-        print("Audio summarization not yet implemented.")
+        # Runs in a worker process; this loop only relays its progress events
+        manager = get_job_manager()
+        job_id = manager.submit(file_path)
+        print("Audio summary queued.")
+        for event in manager.iter_events(job_id):
+            if event["event"] == "token":
+                print(event["text"], end="", flush=True)
+            elif event["event"] == "done":
+                print()
+            else:
+                print_progress(event)
+        job = manager.get(job_id)
+        if job.status != "done":
+            print(f"Audio summarization {job.status}: {job.error}")
     except Exception as e:
         print(f"Audio summarization failed: {e}")
 
@@ -66,12 +95,21 @@ def handle_gmail_operations(user_input):
         print(f"Gmail operation failed: {e}")
 
 def main():
-    print("AI Agent Initialized. Type 'exit' to quit.")
+    resources.warm_up()  # models load while the first prompt is being typed
+    print("AI Agent Initialized. Type 'exit' to quit, 'cache stats' for cache usage, 'models' for loaded models.")
     while True:
         user_input = input("\n>>> Enter your prompt: ").strip()
         if user_input.lower() in ['exit', 'quit']:
             print("Exiting AI Agent. Goodbye.")
             break
+        if user_input.lower() == "cache stats":
+            print(format_stats(get_content_cache().stats()))
+            print(semantic_cache.format_stats(semantic_cache.get_semantic_cache().stats()))
+            continue
+        if user_input.lower() == "models":
+            for s in resources.resource_status():
+                print(f"{s['resource']}: {s['state']}, {s['load_seconds']} s, {s['memory_mb']} MB {s['error']}".rstrip())
+            continue
         try:
             intent = predict_intent(user_input) 
             print("Intent Detected:", intent)
@@ -84,7 +122,7 @@ def main():
         # elif intent == "general_chat":
         #     handle_general_chat(user_input)
         elif intent == "flipkart_product_sentiment":
-            print("Flipkart sentiment analysis not yet implemented.")
+            handle_flipkart_sentiment(user_input)
         elif intent == "stock_sentiment":
             handle_stock_sentiment(user_input)
         elif intent == "convert_to_audio":
@@ -1,21 +1,19 @@
-from pyspark.sql import SparkSession
-from pyspark.sql import SparkSession
 import pandas as pd
+from .query_engine import MAX_ROWS, choose_engine
 
-def handle_youtube_query(sql_query: str) -> pd.DataFrame:
-    spark = SparkSession.builder \
-        .appName("MultiAgentNL2SQL") \
-        .enableHiveSupport() \
-        .getOrCreate()
-
+def handle_youtube_query(sql_query: str, max_rows: int = MAX_ROWS, page: int | None = None, engine: str = "auto") -> pd.DataFrame:
     try:
-        spark_df = spark.sql(sql_query)
-        pdf = spark_df.toPandas()
-        return pdf
+        runner = choose_engine(sql_query, engine)
+        return runner.query(sql_query, max_rows=max_rows, page=page)
     except Exception as e:
         return pd.DataFrame({"error": [str(e)]})  # So that .empty will still work
 
 
+def stream_youtube_query(sql_query: str, batch_size: int = 1000, max_rows: int = MAX_ROWS, engine: str = "auto"):
+    """Yield the (capped) result as a sequence of pandas DataFrames."""
+    yield from choose_engine(sql_query, engine).iter_batches(sql_query, batch_size=batch_size, max_rows=max_rows)
+
+
 if __name__ == '__main__':
     query = "describe youtube_data1.trending_videos;"
     print(handle_youtube_query(query))
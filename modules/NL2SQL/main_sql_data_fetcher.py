@@ -1,13 +1,31 @@
 from .fetch_youtube_data import handle_youtube_query
 from .query_generator import get_sql_from_ollama
+from .query_cache import get_cache
+from .schema_registry import get_registry
+from .sql_guard import SQLGuardError, guard_sql
+
+def generate_guarded_sql(question):
+    # Only SQL that passed the guard is ever cached
+    sql = get_sql_from_ollama(question)
+    if not sql:
+        return None
+    return guard_sql(sql, partition_columns=get_registry().partition_columns()).sql
+
 def get_data(prompt):
     question = prompt
-    sql = get_sql_from_ollama(question)
+    cache = get_cache()
+    try:
+        sql = cache.get_sql(question, generate_guarded_sql)
+    except SQLGuardError as e:
+        print("SQL rejected:", e)
+        return None
 
     if sql:
         print("SQL Generated by LLaMA:\n", sql)
-        output = handle_youtube_query(sql)
+        output = cache.get_result(sql, handle_youtube_query)
         print("Query Result:\n", output)
+        print("Cache stats:", cache.stats.as_dict())
+        return output
     else:
         print("Failed to generate SQL.")
 
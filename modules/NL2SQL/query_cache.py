@@ -0,0 +1,302 @@
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+from .query_engine import choose_engine, referenced_tables
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".nl2sql_cache")
+TRACKED_TABLES = ("youtube_data1.trending_videos",)
+SQL_TTL = 7 * 24 * 60 * 60
+RESULT_TTL = 60 * 60
+SIMILARITY_THRESHOLD = 0.9
+VERSION_CHECK_INTERVAL = 30
+
+# Words that can differ between two phrasings of the same question
+FILLER_WORDS = {
+    "a", "an", "the", "me", "my", "please", "show", "list", "give", "get", "find", "display",
+    "fetch", "what", "which", "are", "is", "of", "from", "in", "for", "all", "can", "you", "i", "want",
+}
+# Words that flip the ordering or comparison of an otherwise identical question
+DIRECTION_WORDS = {
+    "highest", "lowest", "high", "low", "ascending", "descending", "asc", "desc", "most", "least",
+    "top", "bottom", "before", "after", "more", "less", "fewer", "greater", "above", "below", "over",
+    "under", "max", "min", "maximum", "minimum", "first", "last", "best", "worst", "largest", "smallest",
+    "biggest", "oldest", "newest", "latest", "earliest", "increasing", "decreasing", "since", "until",
+}
+
+
+def normalize_question(question):
+    text = re.sub(r"[^\w\s]", " ", question.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _stem(word):
+    for suffix in ("ing", "es", "ed", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def canonical_question(question):
+    """Order-insensitive content words of a question, used for near-duplicate lookup.
+
+    Filler words are dropped before lower-casing, so an upper-case two-letter code such as
+    the region "IN" is kept while the word "in" is not.
+    """
+    words = set()
+    for word in re.sub(r"[^\w\s]", " ", question).split():
+        if len(word) == 2 and word.isupper():
+            words.add(word.lower())
+        elif word.lower() not in FILLER_WORDS:
+            words.add(_stem(word.lower()))
+    return " ".join(sorted(words))
+
+
+_DIRECTION_STEMS = {_stem(w) for w in DIRECTION_WORDS}
+
+
+def _is_spelling_variant(word, others):
+    return any(SequenceMatcher(None, word, other).ratio() >= 0.8 for other in others)
+
+
+def _is_near_duplicate(a, b, score, threshold):
+    # A differing word must be a typo or inflection of a word in the other question; a
+    # different number, short code such as a region ("us" vs "in") or ordering word
+    # ("highest" vs "lowest", "ascending" vs "descending") means a different question.
+    if score < threshold:
+        return False
+    a_words, b_words = set(a.split()), set(b.split())
+    for words, others in ((a_words - b_words, b_words - a_words), (b_words - a_words, a_words - b_words)):
+        for w in words:
+            if len(w) < 4 or any(c.isdigit() for c in w) or w in _DIRECTION_STEMS:
+                return False
+            if not _is_spelling_variant(w, others):
+                return False
+    return True
+
+
+def normalize_sql(sql):
+    # Collapse whitespace and case outside of string literals so formatting-only
+    # differences in the generated SQL share one cache entry.
+    parts = re.split(r"('(?:[^']|'')*')", sql.strip().rstrip(";"))
+    return "".join(p if p.startswith("'") else re.sub(r"\s+", " ", p.lower()) for p in parts).strip()
+
+
+def _trigram_vector(text):
+    padded = f"  {text} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _cosine(a, b):
+    dot = sum(v * b.get(k, 0) for k, v in a.items())
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def table_snapshot_version(table):
+    """Version of the table as seen by the engine that answers queries on it.
+
+    A table served from its local Parquet snapshot is versioned by the snapshot files, so
+    the DuckDB path never starts Spark; the Hive table is versioned by its DDL and files.
+    """
+    return choose_engine(f"SELECT * FROM {table}").table_version(table)
+
+
+class CacheStats:
+    def __init__(self):
+        self.counts = Counter()
+
+    def record(self, level, outcome):
+        self.counts[(level, outcome)] += 1
+
+    def hit_rate(self, level):
+        hits = sum(v for (lvl, outcome), v in self.counts.items() if lvl == level and outcome != "miss")
+        total = sum(v for (lvl, _), v in self.counts.items() if lvl == level)
+        return hits / total if total else 0.0
+
+    def as_dict(self):
+        levels = sorted({lvl for lvl, _ in self.counts})
+        return {
+            lvl: {**{o: v for (l2, o), v in self.counts.items() if l2 == lvl}, "hit_rate": round(self.hit_rate(lvl), 3)}
+            for lvl in levels
+        }
+
+
+class NL2SQLCache:
+    """Two-level NL2SQL cache.
+
+    Level 1 maps a normalized question to its generated SQL, falling back to the most
+    similar cached question (character-trigram cosine over content words) above
+    `similarity`.
+    Level 2 maps normalized SQL plus the snapshot version of every table it reads to the
+    result DataFrame, stored as Parquet. A table whose version changes has its results
+    purged on the next lookup.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, sql_ttl=SQL_TTL, result_ttl=RESULT_TTL,
+                 similarity=SIMILARITY_THRESHOLD, version_fn=table_snapshot_version):
+        self.cache_dir = cache_dir
+        self.sql_ttl = sql_ttl
+        self.result_ttl = result_ttl
+        self.similarity = similarity
+        self.version_fn = version_fn
+        self.stats = CacheStats()
+        self._lock = threading.RLock()
+        self._versions = {}
+        os.makedirs(os.path.join(cache_dir, "results"), exist_ok=True)
+        self._sql_path = os.path.join(cache_dir, "sql_cache.json")
+        self._index_path = os.path.join(cache_dir, "results_index.json")
+        self._sql = self._load(self._sql_path)
+        self._results = self._load(self._index_path)
+        self._vectors = {q: _trigram_vector(self._canonical(q)) for q in self._sql}
+
+    @staticmethod
+    def _load(path):
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    @staticmethod
+    def _save(path, data):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    # ---------------- Level 1: question -> SQL ----------------
+    def _canonical(self, key):
+        # Entries keep the canonical form of the question as asked; the key itself is lower-cased
+        return self._sql[key].get("canonical") or canonical_question(key)
+
+    def lookup_sql(self, question):
+        key = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            entry = self._sql.get(key)
+            if entry and now - entry["created"] <= self.sql_ttl:
+                self.stats.record("sql", "hit")
+                return entry["sql"]
+
+            canonical = canonical_question(question)
+            vector = _trigram_vector(canonical)
+            best, best_score = None, 0.0
+            for other, other_vector in self._vectors.items():
+                if now - self._sql[other]["created"] > self.sql_ttl:
+                    continue
+                score = _cosine(vector, other_vector)
+                if score > best_score:
+                    best, best_score = other, score
+            if best is not None and _is_near_duplicate(canonical, self._canonical(best), best_score, self.similarity):
+                self.stats.record("sql", "near_hit")
+                return self._sql[best]["sql"]
+
+        self.stats.record("sql", "miss")
+        return None
+
+    def store_sql(self, question, sql):
+        key = normalize_question(question)
+        with self._lock:
+            canonical = canonical_question(question)
+            self._sql[key] = {"sql": sql, "created": time.time(), "canonical": canonical}
+            self._vectors[key] = _trigram_vector(canonical)
+            self._save(self._sql_path, self._sql)
+
+    def get_sql(self, question, generate):
+        sql = self.lookup_sql(question)
+        if sql is None:
+            sql = generate(question)
+            if sql:
+                self.store_sql(question, sql)
+        return sql
+
+    # ---------------- Level 2: SQL + snapshot -> result ----------------
+    def table_version(self, table):
+        # Re-checking the catalog is itself a metastore round-trip, so it is rate limited
+        now = time.time()
+        cached = self._versions.get(table)
+        if cached and now - cached[1] < VERSION_CHECK_INTERVAL:
+            return cached[0]
+        version = self.version_fn(table)
+        if cached and cached[0] != version:
+            self.invalidate_table(table)
+        self._versions[table] = (version, now)
+        return version
+
+    def _result_key(self, sql):
+        normalized = normalize_sql(sql)
+        tables = referenced_tables(normalized)
+        versions = {t: self.table_version(t) for t in tables if t in TRACKED_TABLES}
+        raw = normalized + "|" + json.dumps(versions, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest(), tables
+
+    def lookup_result(self, sql):
+        key, _ = self._result_key(sql)
+        with self._lock:
+            entry = self._results.get(key)
+            path = os.path.join(self.cache_dir, "results", f"{key}.parquet")
+            if entry and time.time() - entry["created"] <= self.result_ttl and os.path.exists(path):
+                self.stats.record("result", "hit")
+                return pd.read_parquet(path)
+        self.stats.record("result", "miss")
+        return None
+
+    def store_result(self, sql, df):
+        key, tables = self._result_key(sql)
+        with self._lock:
+            df.to_parquet(os.path.join(self.cache_dir, "results", f"{key}.parquet"), index=False)
+            self._results[key] = {"created": time.time(), "tables": tables}
+            self._save(self._index_path, self._results)
+
+    def get_result(self, sql, run):
+        df = self.lookup_result(sql)
+        if df is None:
+            df = run(sql)
+            # Error frames (see handle_youtube_query) are never cached
+            if list(df.columns) != ["error"]:
+                self.store_result(sql, df)
+        return df
+
+    def invalidate_table(self, table):
+        table = table.lower()
+        with self._lock:
+            for key in [k for k, v in self._results.items() if table in v["tables"]]:
+                self._results.pop(key)
+                path = os.path.join(self.cache_dir, "results", f"{key}.parquet")
+                if os.path.exists(path):
+                    os.remove(path)
+            self._versions.pop(table, None)
+            self._save(self._index_path, self._results)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            self._sql = {k: v for k, v in self._sql.items() if now - v["created"] <= self.sql_ttl}
+            self._vectors = {k: v for k, v in self._vectors.items() if k in self._sql}
+            for key in [k for k, v in self._results.items() if now - v["created"] > self.result_ttl]:
+                self._results.pop(key)
+                path = os.path.join(self.cache_dir, "results", f"{key}.parquet")
+                if os.path.exists(path):
+                    os.remove(path)
+            self._save(self._sql_path, self._sql)
+            self._save(self._index_path, self._results)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = NL2SQLCache()
+        return _default_cache
@@ -0,0 +1,206 @@
+import glob
+import hashlib
+import os
+import re
+import threading
+
+import pandas as pd
+
+MAX_ROWS = 10_000
+PAGE_SIZE = 500
+BATCH_SIZE = 1_000
+LOCAL_PARQUET_DIR = os.environ.get("NL2SQL_PARQUET_DIR", os.path.join(os.path.dirname(__file__), "data", "parquet"))
+SMALL_TABLE_BYTES = 512 * 1024 * 1024
+
+_TABLE_REF = re.compile(r"\b(?:from|join)\s+([\w.]+)", re.IGNORECASE)
+
+
+def referenced_tables(sql):
+    return sorted({t.lower() for t in _TABLE_REF.findall(sql)})
+
+
+def _strip(sql):
+    return sql.strip().rstrip(";").strip()
+
+
+def paged_sql(sql, max_rows=MAX_ROWS, page=None, page_size=PAGE_SIZE):
+    """Wrap `sql` so at most `max_rows` rows come back, or only page `page` (0-based) of them."""
+    if not re.match(r"\s*(select|with)\b", sql, re.IGNORECASE):
+        return _strip(sql)  # DESCRIBE / SHOW etc. cannot be used as a subquery
+    if page is None:
+        return f"SELECT * FROM ({_strip(sql)}) AS q LIMIT {max_rows}"
+    offset = page * page_size
+    limit = max(0, min(page_size, max_rows - offset))
+    return f"SELECT * FROM ({_strip(sql)}) AS q LIMIT {limit} OFFSET {offset}"
+
+
+# ------------------------ Spark --------------------------------------
+class SparkSessionManager:
+    """Builds the Hive-enabled SparkSession once per process and hands out the same one.
+
+    `start_in_background()` lets an app pay the JVM start-up while it is doing other work.
+    """
+
+    def __init__(self, app_name="MultiAgentNL2SQL"):
+        self.app_name = app_name
+        self._session = None
+        self._lock = threading.Lock()
+        self._warmup = None
+
+    def get(self):
+        with self._lock:
+            if self._session is None:
+                from pyspark.sql import SparkSession
+                self._session = (
+                    SparkSession.builder
+                    .appName(self.app_name)
+                    .config("spark.sql.execution.arrow.pyspark.enabled", "true")
+                    .config("spark.sql.execution.arrow.pyspark.fallback.enabled", "true")
+                    .config("spark.sql.execution.arrow.maxRecordsPerBatch", str(BATCH_SIZE))
+                    .enableHiveSupport()
+                    .getOrCreate()
+                )
+            return self._session
+
+    def start_in_background(self):
+        if self._warmup is None:
+            self._warmup = threading.Thread(target=self.get, name="spark-warmup", daemon=True)
+            self._warmup.start()
+        return self._warmup
+
+    def stop(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.stop()
+                self._session = None
+
+
+spark_sessions = SparkSessionManager()
+
+
+class SparkEngine:
+    name = "spark"
+
+    def __init__(self, sessions=spark_sessions):
+        self.sessions = sessions
+
+    def query(self, sql, max_rows=MAX_ROWS, page=None, page_size=PAGE_SIZE):
+        # Arrow-backed toPandas on an already capped result
+        return self.sessions.get().sql(paged_sql(sql, max_rows, page, page_size)).toPandas()
+
+    def iter_batches(self, sql, batch_size=BATCH_SIZE, max_rows=MAX_ROWS):
+        rows = []
+        spark_df = self.sessions.get().sql(paged_sql(sql, max_rows))
+        columns = spark_df.columns
+        for row in spark_df.toLocalIterator(prefetchPartitions=True):
+            rows.append(tuple(row))
+            if len(rows) >= batch_size:
+                yield pd.DataFrame.from_records(rows, columns=columns)
+                rows = []
+        if rows:
+            yield pd.DataFrame.from_records(rows, columns=columns)
+
+    def table_version(self, table):
+        """Changes whenever the table's DDL or data files change."""
+        spark = self.sessions.get()
+        props = {r["key"]: r["value"] for r in spark.sql(f"SHOW TBLPROPERTIES {table}").collect()}
+        files = sorted(spark.table(table).inputFiles())
+        digest = hashlib.sha1("\n".join(files).encode("utf-8")).hexdigest()[:12]
+        return f"{props.get('transient_lastDdlTime', '0')}-{len(files)}-{digest}"
+
+    def export_parquet(self, table, root=LOCAL_PARQUET_DIR):
+        """Snapshot a Hive table into the layout DuckDBEngine reads (<root>/<db>/<table>/)."""
+        db, name = table.split(".")
+        path = os.path.join(root, db, name)
+        spark_df = self.sessions.get().table(table)
+        writer = spark_df.write.mode("overwrite")
+        if "region" in spark_df.columns:
+            writer = writer.partitionBy("region")
+        writer.parquet(path)
+        return path
+
+
+# ------------------------ DuckDB -------------------------------------
+class DuckDBEngine:
+    """In-process engine over local Parquet snapshots laid out as <root>/<db>/<table>/**.parquet.
+
+    Each snapshot is exposed under its Hive name (e.g. youtube_data1.trending_videos), so the
+    SQL generated for Spark runs unchanged for the simple SELECTs the NL2SQL prompt produces.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, root=LOCAL_PARQUET_DIR):
+        import duckdb
+        self.root = root
+        self.conn = duckdb.connect(database=":memory:")
+        self.tables = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Re-scan the Parquet root, e.g. after a new snapshot has been exported."""
+        self.tables = {}
+        for table_dir in glob.glob(os.path.join(self.root, "*", "*")):
+            files = glob.glob(os.path.join(table_dir, "**", "*.parquet"), recursive=True)
+            if not files:
+                continue
+            db, name = table_dir.split(os.sep)[-2:]
+            pattern = os.path.join(table_dir, "**", "*.parquet").replace("'", "''")
+            self.conn.execute(f"CREATE SCHEMA IF NOT EXISTS {db}")
+            self.conn.execute(
+                f"CREATE OR REPLACE VIEW {db}.{name} AS "
+                f"SELECT * FROM read_parquet('{pattern}', hive_partitioning = true)"
+            )
+            self.tables[f"{db}.{name}".lower()] = sum(os.path.getsize(f) for f in files)
+
+    def can_run(self, sql, max_bytes=SMALL_TABLE_BYTES):
+        tables = referenced_tables(sql)
+        return bool(tables) and all(t in self.tables and self.tables[t] <= max_bytes for t in tables)
+
+    def table_version(self, table):
+        """Changes whenever the table's Parquet snapshot is rewritten."""
+        db, name = table.split(".")
+        files = sorted(glob.glob(os.path.join(self.root, db, name, "**", "*.parquet"), recursive=True))
+        stats = "\n".join(f"{f}:{os.stat(f).st_mtime_ns}:{os.path.getsize(f)}" for f in files)
+        return f"parquet-{len(files)}-{hashlib.sha1(stats.encode('utf-8')).hexdigest()[:12]}"
+
+    def _cursor(self):
+        # A DuckDB connection must not be shared across threads; cursors are cheap duplicates
+        with self._lock:
+            return self.conn.cursor()
+
+    def query(self, sql, max_rows=MAX_ROWS, page=None, page_size=PAGE_SIZE):
+        return self._cursor().execute(paged_sql(sql, max_rows, page, page_size)).fetch_df()
+
+    def iter_batches(self, sql, batch_size=BATCH_SIZE, max_rows=MAX_ROWS):
+        reader = self._cursor().execute(paged_sql(sql, max_rows)).fetch_record_batch(batch_size)
+        for batch in reader:
+            yield batch.to_pandas()
+
+
+_duckdb_engine = None
+_duckdb_lock = threading.Lock()
+
+
+def get_duckdb_engine():
+    global _duckdb_engine
+    with _duckdb_lock:
+        if _duckdb_engine is None:
+            _duckdb_engine = DuckDBEngine()
+        return _duckdb_engine
+
+
+def choose_engine(sql, engine="auto"):
+    """'auto' answers from the local Parquet snapshot when every table is small and present there."""
+    if engine == "spark":
+        return SparkEngine()
+    if engine == "duckdb":
+        return get_duckdb_engine()
+    try:
+        local = get_duckdb_engine()
+        if local.can_run(sql):
+            return local
+    except ImportError:
+        pass
+    return SparkEngine()
@@ -1,63 +1,75 @@
-import requests
-import json
+import re
+from modules.common.llm_client import LLMError, get_client
+from .schema_registry import get_registry
 
-SCHEMA = """
-You are an AI assistant that converts natural language questions into valid Apache Spark SQL queries for a Hive table named youtube_data1.trending_videos.
 
-Table: youtube_data1.trending_videos
-Columns:
-- video_id (string)
-- title (string)
-- channel (string)
-- category (string)
-- region (string)          -- Partition column
-- views (bigint)
-- likes (bigint)
-- comments (bigint)
-- tags (string)
-- published_date (date)
-- fetched_on (date)
+# Identical for every question, and placed first, so Ollama can reuse the KV cache of
+# this prefix across requests and only evaluate the schema and question each time.
+PROMPT_PREFIX = """You are an AI assistant that converts natural language questions into valid Apache Spark SQL queries.
 
 Guidelines:
-1. Use table name as youtube_data1.trending_videos.
-2. Use WHERE clause to filter partition column `region`.
+1. Use the fully qualified table names (database.table) listed under Tables, and only the listed columns.
+2. Columns marked PARTITION must be filtered in the WHERE clause whenever the question names a value for them, e.g. region = 'US'.
 3. Use format: published_date >= 'YYYY-MM-DD'.
 4. Only return a valid SQL query, no explanation or markdown.
 """
 
 # Build the LLaMA prompt
-def build_prompt(user_question):
-    return f"""
-{SCHEMA}
+def build_prompt(user_question, registry=None):
+    schema = (registry or get_registry()).render(user_question)
+    return f"""{PROMPT_PREFIX}
+Tables:
+{schema}
 
 User Question: {user_question}
 SQL:
 """
 
+_FENCED_BLOCK = re.compile(r"```[ \t]*(?:sql)?[ \t]*\n(.*?)(?:```|$)", re.IGNORECASE | re.DOTALL)
+_STATEMENT_START = re.compile(r"^[ \t]*(select|with|insert|update|delete)\b", re.IGNORECASE | re.MULTILINE)
+
+def sql_statement_complete(text):
+    # True once a statement has started (at a line-start keyword, inside the code block if
+    # one was opened) and hit a terminating ';' outside quotes or the closing code fence,
+    # so the rest of the generation (usually an explanation) is skipped.
+    fenced = _FENCED_BLOCK.search(text)
+    if fenced:
+        text = text[fenced.start(1):]
+    start = _STATEMENT_START.search(text)
+    if not start:
+        return False
+    # A literal still being streamed counts as quoted up to the end of the text
+    body = re.sub(r"'(?:[^']|'')*(?:'|$)", "", text[start.start(1):])
+    return ";" in body or "```" in body
+
 # Call Ollama (LLaMA 3.1)
-def get_sql_from_ollama(user_question):
-    prompt = build_prompt(user_question)
-    response = requests.post(
-        "http://localhost:11434/api/generate",
-        headers={"Content-Type": "application/json"},
-        data=json.dumps({
-            "model": "llama3.1",
-            "prompt": prompt,
-            "stream": False
-        })
-    )
-    if response.status_code == 200:
-        result = response.json()["response"]
-        return extract_sql(result)
-    else:
-        print("Error:", response.text)
+def get_sql_from_ollama(user_question, registry=None):
+    prompt = build_prompt(user_question, registry)
+    try:
+        stream = get_client().stream_generate(prompt, model="llama3.1", stop_when=sql_statement_complete)
+        for _ in stream:
+            pass
+    except LLMError as e:
+        print("Error:", e)
         return None
+    return extract_sql(stream.text)
 
 def extract_sql(response_text):
-    for line in response_text.splitlines():
-        if line.strip().lower().startswith(("select", "with", "insert", "update", "delete")):
-            return line.strip()
-    return response_text.strip()
+    # The fenced code block if the reply has one, otherwise everything from the first line
+    # that starts with a statement keyword (so "with" or "select" in prose is skipped), up
+    # to the first ';' outside quotes or a closing fence; multi-line SQL survives and
+    # trailing explanations are dropped. DML is still extracted; sql_guard rejects it.
+    fenced = _FENCED_BLOCK.search(response_text)
+    text = fenced.group(1) if fenced else response_text
+    start = _STATEMENT_START.search(text)
+    if not start:
+        return text.strip()
+    sql = []
+    for token in re.findall(r"'(?:[^']|'')*'|```|;|[^';`]+|.", text[start.start(1):], re.DOTALL):
+        if token in (";", "```"):
+            break
+        sql.append(token)
+    return "".join(sql).strip()
 
 if __name__ == "__main__":
     question = "List top 10 most liked videos published after 2023 from the US."
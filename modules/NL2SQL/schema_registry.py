@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from .query_cache import CACHE_DIR
+
+SCHEMA_CACHE_PATH = os.path.join(CACHE_DIR, "schema.json")
+SCHEMA_TTL = 60 * 60
+DATABASES = ("youtube_data1",)
+MAX_TABLES = 2
+MAX_COLUMNS = 12
+
+# Used when neither Spark nor a local snapshot can be introspected
+FALLBACK_TABLES = [
+    {
+        "name": "youtube_data1.trending_videos",
+        "comment": "trending youtube videos per region",
+        "columns": [
+            ["video_id", "string", ""], ["title", "string", ""], ["channel", "string", ""],
+            ["category", "string", ""], ["region", "string", "country code such as US, IN or GB"],
+            ["views", "bigint", ""], ["likes", "bigint", ""], ["comments", "bigint", ""],
+            ["tags", "string", ""], ["published_date", "date", ""], ["fetched_on", "date", ""],
+        ],
+        "partitions": ["region"],
+    }
+]
+
+
+def _terms(text):
+    """Lower-cased, crudely stemmed word set of a question or identifier (snake/camel case split)."""
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    terms = set()
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        for suffix in ("ing", "ed", "es", "s"):
+            if len(word) > len(suffix) + 2 and word.endswith(suffix):
+                word = word[:-len(suffix)]
+                break
+        terms.add(word.rstrip("e") or word)
+    return terms
+
+
+# ------------------------ Introspection -----------------------------
+def spark_catalog_tables(databases=DATABASES):
+    from .query_engine import spark_sessions
+    spark = spark_sessions.get()
+    tables = []
+    for db in databases:
+        for table in spark.catalog.listTables(db):
+            name = f"{db}.{table.name}".lower()
+            columns = spark.catalog.listColumns(table.name, db)
+            tables.append({
+                "name": name,
+                "comment": table.description or "",
+                "columns": [[c.name, c.dataType, c.description or ""] for c in columns],
+                "partitions": [c.name for c in columns if c.isPartition],
+            })
+    return tables
+
+
+def duckdb_catalog_tables(databases=DATABASES, engine=None):
+    from .query_engine import get_duckdb_engine
+    cursor = (engine or get_duckdb_engine()).conn.cursor()
+    tables = {}
+    rows = cursor.execute(
+        "SELECT table_schema, table_name, column_name, data_type FROM information_schema.columns "
+        "ORDER BY table_schema, table_name, ordinal_position"
+    ).fetchall()
+    for db, table, column, dtype in rows:
+        if db not in databases:
+            continue
+        entry = tables.setdefault(f"{db}.{table}".lower(), {
+            "name": f"{db}.{table}".lower(), "comment": "", "columns": [], "partitions": [],
+        })
+        entry["columns"].append([column, dtype.lower(), ""])
+    # Hive-partitioned snapshots are written by SparkEngine.export_parquet, partitioned on region
+    for entry in tables.values():
+        entry["partitions"] = [c for c, _, _ in entry["columns"] if c == "region"]
+    return list(tables.values())
+
+
+def default_introspect():
+    """Spark catalog when available, otherwise the local Parquet snapshot DuckDB serves."""
+    for source in (spark_catalog_tables, duckdb_catalog_tables):
+        try:
+            tables = source()
+            if tables:
+                return tables
+        except Exception as e:
+            logging.warning(f"Schema introspection via {source.__name__} failed: {e}")
+    return FALLBACK_TABLES
+
+
+# ------------------------ Registry ----------------------------------
+class SchemaRegistry:
+    """Catalog of table schemas, introspected once and cached on disk for `ttl` seconds.
+
+    `relevant_tables(question)` ranks tables by keyword overlap between the question and
+    table/column names and comments, and `render(question)` prints them as the compact
+    one-line-per-table schema the prompt uses. Rendering is deterministic so the same tables always
+    produce the same text.
+    """
+
+    def __init__(self, introspect=default_introspect, cache_path=SCHEMA_CACHE_PATH, ttl=SCHEMA_TTL):
+        self.introspect = introspect
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._tables = None
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def tables(self):
+        with self._lock:
+            if self._tables is None:
+                self._load()
+            return self._tables
+
+    def _load(self):
+        if self.cache_path and os.path.exists(self.cache_path):
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if time.time() - cached["created"] <= self.ttl:
+                self._set(cached["tables"])
+                return
+        self._set(self.introspect())
+        if self.cache_path:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp = self.cache_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "tables": self._tables}, f)
+            os.replace(tmp, self.cache_path)
+
+    def _set(self, tables):
+        self._tables = sorted(tables, key=lambda t: t["name"])
+        self._index = {}
+        for table in self._tables:
+            name_terms = _terms(table["name"].split(".")[-1]) | _terms(table["comment"])
+            column_terms = {c[0]: _terms(c[0]) | _terms(c[2]) for c in table["columns"]}
+            self._index[table["name"]] = (name_terms, column_terms)
+
+    def refresh(self):
+        with self._lock:
+            if self.cache_path and os.path.exists(self.cache_path):
+                os.remove(self.cache_path)
+            self._tables = None
+        return self.tables()
+
+    def partition_columns(self):
+        return {t["name"]: t["partitions"][0] for t in self.tables() if t["partitions"]}
+
+    def relevant_tables(self, question, max_tables=MAX_TABLES):
+        """[(table, matched column names)] for the best matching tables, best first."""
+        tables = self.tables()
+        terms = _terms(question)
+        scored = []
+        for table in tables:
+            name_terms, column_terms = self._index[table["name"]]
+            matched = [c for c, t in column_terms.items() if t & terms]
+            score = 3 * len(name_terms & terms) + len(matched)
+            if score:
+                scored.append((score, table["name"], table, matched))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        if not scored:
+            # Nothing matched: a single-table catalog is still the obvious choice
+            return [(t, []) for t in tables[:1]]
+        return [(table, matched) for _, _, table, matched in scored[:max_tables]]
+
+    @staticmethod
+    def render_table(table, matched=(), max_columns=MAX_COLUMNS):
+        columns = table["columns"]
+        if len(columns) > max_columns:
+            keep = set(matched) | set(table["partitions"])
+            keep.update(c[0] for c in columns[:max(0, max_columns - len(keep))])
+            columns = [c for c in columns if c[0] in keep]
+        parts = []
+        for name, dtype, comment in columns:
+            text = f"{name} {dtype}"
+            if name in table["partitions"]:
+                text += " PARTITION"
+            if comment:
+                text += f" ({comment})"
+            parts.append(text)
+        return f"{table['name']}({', '.join(parts)})"
+
+    def render(self, question, max_tables=MAX_TABLES):
+        selected = sorted(self.relevant_tables(question, max_tables), key=lambda s: s[0]["name"])
+        return "\n".join(self.render_table(table, matched) for table, matched in selected)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SchemaRegistry()
+        return _registry
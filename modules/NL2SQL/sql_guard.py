@@ -0,0 +1,190 @@
+import logging
+import re
+import threading
+
+import sqlglot
+from sqlglot import exp
+
+from .query_engine import MAX_ROWS
+
+DIALECT = "spark"
+PARTITION_COLUMNS = {"youtube_data1.trending_videos": "region"}
+MAX_SCAN_BYTES = 5 * 1024 ** 3
+
+_FORBIDDEN = (exp.Insert, exp.Update, exp.Delete, exp.Merge, exp.Drop, exp.Create, exp.Alter, exp.Command)
+
+
+class SQLGuardError(Exception):
+    pass
+
+
+class GuardedSQL:
+    def __init__(self, sql, warnings, estimated_bytes=None):
+        self.sql = sql
+        self.warnings = warnings
+        self.estimated_bytes = estimated_bytes
+
+    def __repr__(self):
+        return f"GuardedSQL({self.sql!r}, warnings={self.warnings}, estimated_bytes={self.estimated_bytes})"
+
+
+def _table_name(table):
+    return ".".join(p for p in (table.db, table.name) if p).lower()
+
+
+def _literal_values(node):
+    if isinstance(node, exp.Literal) and node.is_string:
+        return [node.this]
+    return None
+
+
+def _sources(select):
+    # Tables and subqueries the SELECT reads from directly (the key is "from_" in newer sqlglot)
+    from_ = select.args.get("from_") or select.args.get("from")
+    return ([from_.this] if from_ else []) + [join.this for join in select.args.get("joins") or []]
+
+
+def _partition_values(where, column, qualifiers, unqualified=True):
+    """Literal values the WHERE clause pins `column` to, [] if it is never mentioned,
+    or None if it is filtered in a way we cannot read (ranges, functions, OR, ...).
+
+    Only columns qualified by one of `qualifiers` (the table's alias or name) count, and
+    unqualified ones only when `unqualified` is set, i.e. the table is alone in its scope.
+    """
+    if where is None:
+        return []
+    mentions = [c for c in where.find_all(exp.Column) if c.name.lower() == column
+                and (c.table.lower() in qualifiers if c.table else unqualified)]
+    if not mentions:
+        return []
+    values = []
+    for column_node in mentions:
+        parent = column_node.parent
+        if isinstance(parent, exp.EQ):
+            other = parent.expression if parent.this is column_node else parent.this
+            found = _literal_values(other)
+        elif isinstance(parent, exp.In) and parent.this is column_node:
+            found = []
+            for item in parent.expressions:
+                item_values = _literal_values(item)
+                if item_values is None:
+                    found = None
+                    break
+                found.extend(item_values)
+        else:
+            found = None
+        if found is None or column_node.find_ancestor(exp.Or, exp.Not):
+            return None
+        values.extend(found)
+    return sorted(set(values))
+
+
+# ------------------------ Table statistics -----------------------------
+_stats_cache = {}
+_stats_lock = threading.Lock()
+
+
+def spark_table_stats(table):
+    """Total bytes and per-partition bytes from the metastore (after ANALYZE TABLE), cached per process."""
+    with _stats_lock:
+        if table in _stats_cache:
+            return _stats_cache[table]
+    from .query_engine import spark_sessions
+    spark = spark_sessions.get()
+    stats = {"bytes": None, "partitions": {}}
+    for row in spark.sql(f"DESCRIBE TABLE EXTENDED {table}").collect():
+        if row["col_name"] == "Statistics":
+            match = re.search(r"(\d+) bytes", row["data_type"])
+            if match:
+                stats["bytes"] = int(match.group(1))
+    # Sizes per partition are not in SHOW PARTITIONS; estimate_scan_bytes assumes equal splits
+    try:
+        for row in spark.sql(f"SHOW PARTITIONS {table}").collect():
+            stats["partitions"][row[0].split("/")[0].split("=", 1)[1]] = None
+    except Exception:
+        pass  # not a partitioned table
+    with _stats_lock:
+        _stats_cache[table] = stats
+    return stats
+
+
+def estimate_scan_bytes(table, values, stats):
+    """Bytes read from `table` given the partition values it is restricted to (None = all)."""
+    if not stats or stats.get("bytes") is None:
+        return None
+    partitions = stats.get("partitions") or {}
+    if not values or not partitions:
+        return stats["bytes"]
+    known = [partitions.get(v) for v in values]
+    if all(b is not None for b in known):
+        return sum(known)
+    # No per-partition sizes: assume partitions are roughly equal
+    return int(stats["bytes"] * min(len(values), len(partitions)) / len(partitions))
+
+
+# ------------------------ Guard ----------------------------------------
+def guard_sql(sql, max_rows=MAX_ROWS, partition_policy="warn", max_scan_bytes=MAX_SCAN_BYTES, stats_fn=spark_table_stats,
+              partition_columns=None):
+    """Parse LLM-generated SQL and return a safe, bounded SELECT.
+
+    Rejects anything but a single SELECT (CTEs and set operations allowed), injects or
+    tightens LIMIT, checks partitioned tables are filtered on their partition column
+    (`partition_policy` "enforce" rejects, "warn" records a warning), and rejects queries
+    whose estimated scan exceeds `max_scan_bytes` when table statistics are available.
+    `partition_columns` maps table -> partition column (defaults to PARTITION_COLUMNS).
+    """
+    partition_columns = partition_columns or PARTITION_COLUMNS
+    try:
+        statements = [s for s in sqlglot.parse(sql, read=DIALECT) if s is not None]
+    except sqlglot.errors.ParseError as e:
+        raise SQLGuardError(f"Could not parse generated SQL: {e}") from e
+    if len(statements) != 1:
+        raise SQLGuardError(f"Expected exactly one statement, got {len(statements)}.")
+
+    tree = statements[0]
+    if not isinstance(tree, exp.Query) or tree.find(*_FORBIDDEN):
+        raise SQLGuardError(f"Only SELECT queries are allowed, got {tree.key.upper()}.")
+
+    warnings = []
+    limit = tree.args.get("limit")
+    current = None
+    if limit is not None and isinstance(limit.expression, exp.Literal):
+        current = int(limit.expression.this)
+    if current is None or current > max_rows:
+        tree = tree.limit(max_rows)
+        if current is not None:
+            warnings.append(f"LIMIT {current} lowered to {max_rows}.")
+
+    cte_names = {cte.alias.lower() for cte in tree.find_all(exp.CTE)}
+    total_bytes = 0
+    for table in tree.find_all(exp.Table):
+        name = _table_name(table)
+        if name in cte_names or name not in partition_columns:
+            continue
+        column = partition_columns[name]
+        scope = table.find_ancestor(exp.Select)
+        qualifiers = {table.alias.lower()} if table.alias else {table.name.lower(), name}
+        values = _partition_values(scope.args.get("where") if scope else None, column, qualifiers,
+                                   unqualified=scope is None or len(_sources(scope)) <= 1)
+        if values == []:
+            message = f"Query on {name} has no `{column}` partition filter and will scan every partition."
+            if partition_policy == "enforce":
+                raise SQLGuardError(message)
+            warnings.append(message)
+
+        if stats_fn is not None and total_bytes is not None:
+            try:
+                scanned = estimate_scan_bytes(name, values or None, stats_fn(name))
+            except Exception as e:
+                logging.warning(f"Table statistics unavailable for {name}: {e}")
+                scanned = None
+            total_bytes = None if scanned is None else total_bytes + scanned
+
+    if total_bytes and max_scan_bytes and total_bytes > max_scan_bytes:
+        raise SQLGuardError(
+            f"Estimated scan of {total_bytes / 1024 ** 3:.1f} GiB exceeds the {max_scan_bytes / 1024 ** 3:.1f} GiB limit."
+        )
+
+    for warning in warnings:
+        logging.warning(warning)
+    return GuardedSQL(tree.sql(dialect=DIALECT), warnings, total_bytes or None)
@@ -0,0 +1,85 @@
+import base64
+import io
+import os
+import sys
+
+from PIL import Image, ImageOps
+
+from modules.common.content_cache import file_digest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BG_DIR = os.path.join(ROOT, "backgrounds")
+# Streamlit serves <app dir>/static at app/static/ when server.enableStaticServing is on
+STATIC_DIR = os.path.join(ROOT, "static", "backgrounds")
+STATIC_URL = "app/static/backgrounds"
+EXTENSIONS = (".jpg", ".jpeg", ".png")
+# A full-window background never needs more than a large desktop's width
+MAX_WIDTH = 1920
+FORMATS = {
+    "jpeg": ("jpg", "image/jpeg", {"quality": 80, "optimize": True, "progressive": True}),
+    "webp": ("webp", "image/webp", {"quality": 75, "method": 6}),
+}
+
+
+def list_backgrounds(folder=BG_DIR):
+    if not os.path.isdir(folder):
+        return []
+    return sorted(f for f in os.listdir(folder) if f.lower().endswith(EXTENSIONS))
+
+
+def encode_variant(path, fmt="jpeg", max_width=MAX_WIDTH):
+    """The image upright, in RGB, at most `max_width` wide, encoded as progressive JPEG or WebP."""
+    _, _, options = FORMATS[fmt]
+    with Image.open(path) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        if image.width > max_width:
+            image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, format=fmt.upper(), **options)
+    return out.getvalue()
+
+
+def publish(name, fmt="jpeg", folder=BG_DIR, static_dir=STATIC_DIR, max_width=MAX_WIDTH):
+    """URL of the background's variant under the static folder, encoding it the first time.
+
+    Files are named by the source's content hash, so an edited image gets a new URL and
+    browsers can cache every variant indefinitely.
+    """
+    source = os.path.join(folder, name)
+    ext, _, _ = FORMATS[fmt]
+    filename = f"{file_digest(source)[:16]}-{max_width}.{ext}"
+    path = os.path.join(static_dir, filename)
+    if not os.path.exists(path):
+        os.makedirs(static_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(encode_variant(source, fmt, max_width))
+        os.replace(tmp, path)
+    return f"{STATIC_URL}/{filename}"
+
+
+def publish_all(folder=BG_DIR, static_dir=STATIC_DIR, fmt="jpeg"):
+    return {name: publish(name, fmt, folder, static_dir) for name in list_backgrounds(folder)}
+
+
+def data_uri(path, fmt="webp", max_width=MAX_WIDTH):
+    """Inline fallback when static serving is off: the (much smaller) variant as a data URI."""
+    _, mime, _ = FORMATS[fmt]
+    return f"data:{mime};base64,{base64.b64encode(encode_variant(path, fmt, max_width)).decode()}"
+
+
+def background_css(url):
+    return f"""
+            <style>
+            .stApp {{
+                background-image: url("{url}");
+                background-size: cover;
+            }}
+            </style>
+            """
+
+
+if __name__ == "__main__":
+    # Precompute every variant, e.g. at deploy time: python -m modules.common.backgrounds
+    for name, url in publish_all(*sys.argv[1:2]).items():
+        print(f"{name} -> {url}")
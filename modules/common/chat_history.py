@@ -0,0 +1,60 @@
+import io
+
+import pandas as pd
+
+# Turns (a prompt and its answer) rendered per page of chat history
+HISTORY_WINDOW = 20
+
+
+def window_start(history, turns):
+    """Index of the first entry of the last `turns` turns, so a page never starts mid-turn."""
+    seen = 0
+    for i in range(len(history) - 1, -1, -1):
+        if history[i]["role"] == "user":
+            seen += 1
+            if seen == turns:
+                return i
+    return 0
+
+
+def count_turns(history):
+    return sum(chat["role"] == "user" for chat in history)
+
+
+def compact_frame(df):
+    """The frame with repeated labels as categoricals and scores as float32, for long-lived history."""
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col]) and df[col].nunique() <= max(10, len(df) // 4):
+            df[col] = df[col].astype("category")
+        elif df[col].dtype == "float64":
+            df[col] = df[col].astype("float32")
+    return df
+
+
+def sentiment_pie_png(df, dpi=100):
+    """PNG bytes of the sentiment share pie, or None when the frame has no sentiment column."""
+    sentiment_col = next((c for c in df.columns if c.lower() == "sentiment"), None)
+    if sentiment_col is None or df.empty:
+        return None
+    # The object API, not pyplot: this runs in task threads and pyplot keeps global state
+    from matplotlib.figure import Figure
+
+    counts = df[sentiment_col].value_counts()
+    counts = counts[counts > 0]
+    fig = Figure(figsize=(4, 4))
+    ax = fig.subplots()
+    ax.pie(counts, labels=counts.index, autopct="%1.1f%%", startangle=90)
+    ax.axis("equal")
+    out = io.BytesIO()
+    fig.savefig(out, format="png", dpi=dpi, bbox_inches="tight")
+    return out.getvalue()
+
+
+def finalize_answer(chat):
+    """Derive an answer's display parts once, when it is produced, instead of on every rerun."""
+    df = chat.get("df_stock")
+    if isinstance(df, pd.DataFrame):
+        chat["df_stock"] = compact_frame(df)
+        chat["pie_png"] = sentiment_pie_png(df)
+    return chat
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_DIR = os.environ.get(
+    "CONTENT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".content_cache"),
+)
+MAX_BYTES = int(os.environ.get("CONTENT_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+HASH_CHUNK = 1024 * 1024
+MAX_DIGESTS = 4096
+
+_digests = OrderedDict()   # (path, size, mtime) -> digest, least recently used first
+_digests_lock = threading.Lock()
+
+
+def file_digest(path):
+    """SHA-256 of the file's bytes, remembered per (path, size, mtime) so re-checks are free.
+
+    Every upload gets a new temp path, so only the MAX_DIGESTS most recently used are kept.
+    """
+    stat = os.stat(path)
+    memo = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        if memo in _digests:
+            _digests.move_to_end(memo)
+            return _digests[memo]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(block)
+    with _digests_lock:
+        _digests[memo] = digest.hexdigest()
+        while len(_digests) > MAX_DIGESTS:
+            _digests.popitem(last=False)
+    return digest.hexdigest()
+
+
+def content_key(namespace, version, source):
+    """Cache key for `source` (a path or bytes) as processed by `version` of a model/engine."""
+    digest = hashlib.sha256(source).hexdigest() if isinstance(source, bytes) else file_digest(source)
+    return hashlib.sha256(f"{namespace}|{version}|{digest}".encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    """Content-addressed results cache on disk, shared by every process that opens the same directory.
+
+    Values are JSON documents or raw bytes stored as files under `root`; a SQLite index
+    tracks size, last access and how long the value took to compute, and evicts least
+    recently used entries once the total exceeds `max_bytes`. Hit/miss counts and the
+    compute time saved by hits are kept per namespace in the same index.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._local = threading.local()
+        with self._db() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, namespace TEXT, kind TEXT, "
+                "size INTEGER, created REAL, accessed REAL, compute_seconds REAL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS stats (namespace TEXT PRIMARY KEY, hits INTEGER, misses INTEGER, "
+                "saved_seconds REAL)"
+            )
+
+    def _db(self):
+        # sqlite3 connections are per thread; WAL lets other processes read while one writes
+        if getattr(self._local, "db", None) is None:
+            db = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return self._local.db
+
+    def _path(self, key, kind):
+        return os.path.join(self.root, key[:2], f"{key}.{'json' if kind == 'json' else 'bin'}")
+
+    def _count(self, namespace, hit, saved=0.0):
+        with self._db() as db:
+            db.execute("INSERT OR IGNORE INTO stats VALUES (?, 0, 0, 0)", (namespace,))
+            db.execute(
+                "UPDATE stats SET hits = hits + ?, misses = misses + ?, saved_seconds = saved_seconds + ? "
+                "WHERE namespace = ?",
+                (int(hit), int(not hit), saved, namespace),
+            )
+
+    def _find(self, key, kind):
+        # (path, compute seconds) of an entry whose file exists, marked as used; (None, 0) if absent
+        row = self._db().execute("SELECT compute_seconds FROM entries WHERE key = ?", (key,)).fetchone()
+        path = self._path(key, kind)
+        if row is None or not os.path.exists(path):
+            return None, 0.0
+        with self._db() as db:
+            db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        return path, row[0] or 0.0
+
+    def _lookup(self, namespace, key, kind):
+        path, saved = self._find(key, kind)
+        self._count(namespace, path is not None, saved)
+        return path
+
+    def _get(self, namespace, key, kind):
+        path, saved = self._find(key, kind)
+        data = None
+        if path is not None:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # Evicted, by this or another process, between the lookup and the read
+                with self._db() as db:
+                    db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._count(namespace, data is not None, saved if data is not None else 0.0)
+        return data
+
+    def _put(self, namespace, key, kind, data, compute_seconds):
+        path = self._path(key, kind)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        now = time.time()
+        with self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, namespace, kind, len(data), now, now, compute_seconds),
+            )
+        self.evict()
+        return path
+
+    def get_json(self, namespace, key):
+        data = self._get(namespace, key, "json")
+        return None if data is None else json.loads(data)
+
+    def put_json(self, namespace, key, value, compute_seconds=0.0):
+        self._put(namespace, key, "json", json.dumps(value).encode("utf-8"), compute_seconds)
+
+    def get_blob(self, namespace, key):
+        return self._get(namespace, key, "blob")
+
+    def put_blob(self, namespace, key, data, compute_seconds=0.0):
+        return self._put(namespace, key, "blob", data, compute_seconds)
+
+    def blob_path(self, namespace, key):
+        """Path of a cached blob, to serve the file as is (counted as a hit); None on a miss."""
+        return self._lookup(namespace, key, "blob")
+
+    def cached_json(self, namespace, version, source, compute):
+        """compute() on a miss (timed and stored), the stored value on a hit."""
+        key = content_key(namespace, version, source)
+        value = self.get_json(namespace, key)
+        if value is None:
+            started = time.perf_counter()
+            value = compute()
+            self.put_json(namespace, key, value, time.perf_counter() - started)
+        return value
+
+    def evict(self):
+        db = self._db()
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for key, kind, size in db.execute("SELECT key, kind, size FROM entries ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key, kind))
+            except FileNotFoundError:
+                pass
+            with db:
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        logging.info(f"Content cache evicted {removed} entries")
+        return removed
+
+    def stats(self):
+        db = self._db()
+        sizes = {ns: (n, b) for ns, n, b in db.execute("SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace")}
+        result = {}
+        for namespace, hits, misses, saved in db.execute("SELECT * FROM stats ORDER BY namespace"):
+            entries, size = sizes.get(namespace, (0, 0))
+            result[namespace] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                "saved_seconds": round(saved, 1),
+                "entries": entries,
+                "bytes": size or 0,
+            }
+        return result
+
+    def clear(self, namespace=None):
+        db = self._db()
+        query = "SELECT key, kind FROM entries" + (" WHERE namespace = ?" if namespace else "")
+        for key, kind in db.execute(query, (namespace,) if namespace else ()).fetchall():
+            try:
+                os.remove(self._path(key, kind))
+            except FileNotFoundError:
+                pass
+        with db:
+            if namespace:
+                db.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+                db.execute("DELETE FROM stats WHERE namespace = ?", (namespace,))
+            else:
+                db.execute("DELETE FROM entries")
+                db.execute("DELETE FROM stats")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_content_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ContentCache()
+        return _cache
+
+
+def format_stats(stats):
+    lines = []
+    for namespace, s in stats.items():
+        lines.append(
+            f"{namespace}: {s['hits']} hits / {s['misses']} misses ({s['hit_rate']:.0%}), "
+            f"{s['saved_seconds']:.1f} s saved, {s['entries']} entries, {s['bytes'] / 1024 ** 2:.1f} MiB"
+        )
+    return "\n".join(lines) or "No cached results yet."
@@ -0,0 +1,238 @@
+import re
+import requests
+
+try:
+    from lxml import etree
+except ImportError:  # lxml missing -> fall back to BeautifulSoup
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+from bs4 import BeautifulSoup
+
+CHUNK_SIZE = 16 * 1024
+DEFAULT_BACKEND = "lxml" if etree is not None else "bs4"
+
+_SIMPLE_CSS = re.compile(r"^(?P<tag>[a-zA-Z0-9]+|\*)?(?:\.(?P<cls>[\w-]+))?(?:\[(?P<attr>[\w-]+)\])?$")
+
+
+def _simple_css_to_xpath(css):
+    # Only the selector shapes used by our specs: tag, .class, tag.class, tag[attr]
+    match = _SIMPLE_CSS.match(css.strip())
+    if not match or not any(match.groupdict().values()):
+        raise ValueError(f"Unsupported selector: {css!r}")
+    xpath = f"descendant::{match.group('tag') or '*'}"
+    if match.group("cls"):
+        xpath += f"[contains(concat(' ', normalize-space(@class), ' '), ' {match.group('cls')} ')]"
+    if match.group("attr"):
+        xpath += f"[@{match.group('attr')}]"
+    return xpath
+
+
+class Field:
+    """One value pulled out of every matched item, addressed by a simple CSS selector."""
+
+    def __init__(self, name, css, attr=None, separator="", required=False):
+        self.name = name
+        self.css = css
+        self.attr = attr
+        self.separator = separator
+        self.required = required
+        self.xpath = etree.XPath(f"({_simple_css_to_xpath(css)})[1]") if etree is not None else None
+
+
+class ExtractionSpec:
+    """Describes a repeated block on a page (a news item, a review) and the fields to read from it."""
+
+    def __init__(self, name, item_tag, item_class, fields):
+        self.name = name
+        self.item_tag = item_tag
+        self.item_class = item_class
+        self.fields = fields
+        self.item_css = f"{item_tag}.{item_class}"
+
+    def is_item(self, tag, class_attr):
+        return tag == self.item_tag and self.item_class in (class_attr or "").split()
+
+    def make_record(self, values):
+        for field in self.fields:
+            if field.required and not values.get(field.name):
+                return None
+        return values
+
+
+def _text(strings, separator):
+    return separator.join(s.strip() for s in strings if s.strip())
+
+
+# ------------------------ Page specs -----------------------------------
+MONEYCONTROL_NEWS_SPEC = ExtractionSpec(
+    "moneycontrol_news", "li", "clearfix",
+    [
+        Field("headline", "h2", required=True),
+        Field("link", "a[href]", attr="href", required=True),
+    ],
+)
+
+FLIPKART_REVIEW_SPEC = ExtractionSpec(
+    "flipkart_reviews", "div", "_27M-vq",
+    [
+        Field("rating", "div._3LWZlK"),
+        Field("review", "div.t-ZTKy", separator=" "),
+    ],
+)
+
+
+# ------------------------ Backends -------------------------------------
+class _LxmlExtractor:
+    # Incremental parse: every finished item is read through precompiled XPaths and
+    # freed straight away; once the list holding the first valid item closes, the caller
+    # stops consuming the stream so the rest of the page is never downloaded or parsed.
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.parser = etree.HTMLPullParser(events=("end",), encoding="utf-8")
+        self.records = []
+        self.container = None
+        self.done = False
+
+    def feed(self, chunk):
+        """Parse one more chunk; True once the list holding the records has closed."""
+        self.parser.feed(chunk)
+        for _, elem in self.parser.read_events():
+            if self.container is not None and elem is self.container:
+                self.done = True
+                return True
+            if not self.spec.is_item(elem.tag, elem.get("class")):
+                continue
+
+            values = {}
+            for field in self.spec.fields:
+                found = field.xpath(elem)
+                if not found:
+                    values[field.name] = ""
+                elif field.attr:
+                    values[field.name] = found[0].get(field.attr, "")
+                else:
+                    values[field.name] = _text(found[0].itertext(), field.separator)
+
+            record = self.spec.make_record(values)
+            if record is not None:
+                self.records.append(record)
+                if self.container is None:
+                    self.container = elem.getparent()
+
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        return False
+
+    def close(self):
+        if not self.done:
+            self.parser.close()
+        return self.records
+
+
+def _extract_lxml(chunks, spec):
+    extractor = _LxmlExtractor(spec)
+    for chunk in chunks:
+        if extractor.feed(chunk):
+            break
+    return extractor.close()
+
+
+def _extract_selectolax(chunks, spec):
+    tree = LexborHTMLParser(b"".join(chunks))
+    records = []
+    for node in tree.css(spec.item_css):
+        values = {}
+        for field in spec.fields:
+            found = node.css_first(field.css)
+            if found is None:
+                values[field.name] = ""
+            elif field.attr:
+                values[field.name] = found.attributes.get(field.attr) or ""
+            else:
+                values[field.name] = found.text(deep=True, separator=field.separator, strip=True)
+        record = spec.make_record(values)
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def _extract_bs4(chunks, spec):
+    soup = BeautifulSoup(b"".join(chunks), "html.parser", from_encoding="utf-8")
+    records = []
+    for node in soup.find_all(spec.item_tag, class_=spec.item_class):
+        values = {}
+        for field in spec.fields:
+            found = node.select_one(field.css)
+            if found is None:
+                values[field.name] = ""
+            elif field.attr:
+                values[field.name] = found.get(field.attr, "")
+            else:
+                values[field.name] = found.get_text(strip=True, separator=field.separator)
+        record = spec.make_record(values)
+        if record is not None:
+            records.append(record)
+    return records
+
+
+BACKENDS = {
+    "lxml": _extract_lxml,
+    "selectolax": _extract_selectolax,
+    "bs4": _extract_bs4,
+}
+
+
+def _resolve_backend(backend):
+    if backend == "lxml" and etree is None:
+        backend = "bs4"
+    if backend == "selectolax" and LexborHTMLParser is None:
+        backend = DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown extractor backend: {backend}. Choose from {', '.join(BACKENDS)}.")
+    return backend
+
+
+def extract_records(chunks, spec, backend=DEFAULT_BACKEND):
+    """Extract records for `spec` from an iterable of byte chunks (or a single bytes object)."""
+    if isinstance(chunks, (bytes, str)):
+        chunks = [chunks.encode("utf-8") if isinstance(chunks, str) else chunks]
+    return BACKENDS[_resolve_backend(backend)](chunks, spec)
+
+
+async def extract_records_async(chunks, spec, backend=DEFAULT_BACKEND):
+    """extract_records over an async iterable of byte chunks, e.g. httpx's `response.aiter_bytes()`.
+
+    The lxml backend parses each chunk as it arrives and stops reading once the list has
+    been read; the others need the whole page first.
+    """
+    backend = _resolve_backend(backend)
+    if backend != "lxml":
+        return BACKENDS[backend]([b"".join([chunk async for chunk in chunks])], spec)
+    extractor = _LxmlExtractor(spec)
+    async for chunk in chunks:
+        if extractor.feed(chunk):
+            break
+    return extractor.close()
+
+
+def fetch_records(url, spec, headers=None, backend=DEFAULT_BACKEND, timeout=15, session=None):
+    """Stream `url` and extract records, closing the connection as soon as the list has been read.
+
+    Returns (status_code, records); records is empty for non-200 responses.
+    """
+    http = session or requests
+    response = http.get(url, headers=headers, stream=True, timeout=timeout)
+    try:
+        if response.status_code != 200:
+            return response.status_code, []
+        records = extract_records(response.iter_content(chunk_size=CHUNK_SIZE), spec, backend=backend)
+        return response.status_code, records
+    finally:
+        response.close()
@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+OLLAMA_URL = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+DEFAULT_MODEL = "llama3.1"
+KEEP_ALIVE = "30m"
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    pass
+
+
+class TokenStream:
+    """Iterator over the tokens of one streamed Ollama generation.
+
+    Records time-to-first-token and total time, and can be cancelled from the consumer
+    (`stop_when(text_so_far)` returning True) or from another thread via `cancel()`.
+    Closing the HTTP response is what makes Ollama abort the generation.
+    """
+
+    def __init__(self, response, extract, stop_when=None, label="generate"):
+        self.response = response
+        self.extract = extract
+        self.stop_when = stop_when
+        self.label = label
+        self.text = ""
+        self.tokens = 0
+        self.started = time.perf_counter()
+        self.ttft = None
+        self.elapsed = None
+        self.cancelled = False
+        self.done = False
+
+    def __iter__(self):
+        try:
+            for line in self.response.iter_lines():
+                if self.cancelled:
+                    break
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise LLMError(chunk["error"])
+                token = self.extract(chunk)
+                if token:
+                    if self.ttft is None:
+                        self.ttft = time.perf_counter() - self.started
+                    self.text += token
+                    self.tokens += 1
+                    yield token
+                    if self.stop_when is not None and self.stop_when(self.text):
+                        self.cancel()
+                        break
+                if chunk.get("done"):
+                    self.done = True
+                    break
+        except (requests.RequestException, AttributeError, ValueError):
+            # cancel() from another thread closes the socket under iter_lines()
+            if not self.cancelled:
+                raise
+        finally:
+            self.response.close()
+            self.elapsed = time.perf_counter() - self.started
+            logger.info(
+                "ollama %s: first token %s, %d tokens in %.0f ms%s",
+                self.label,
+                f"{self.ttft * 1000:.0f} ms" if self.ttft is not None else "n/a",
+                self.tokens, self.elapsed * 1000,
+                " (cancelled)" if self.cancelled else "",
+            )
+
+    def cancel(self):
+        self.cancelled = True
+        self.response.close()
+
+
+def _generate_token(chunk):
+    return chunk.get("response", "")
+
+
+def _chat_token(chunk):
+    return chunk.get("message", {}).get("content", "")
+
+
+class OllamaClient:
+    """Shared streaming client for Ollama's NDJSON /api/generate and /api/chat endpoints."""
+
+    def __init__(self, base_url=None, model=DEFAULT_MODEL, timeout=300, keep_alive=KEEP_ALIVE):
+        self.base_url = (base_url or OLLAMA_URL).rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.session = requests.Session()
+
+    def _payload(self, model, options, extra):
+        payload = {"model": model or self.model, "stream": True, "keep_alive": self.keep_alive}
+        if options:
+            payload["options"] = options
+        payload.update(extra)
+        return payload
+
+    def _open(self, path, payload):
+        response = self.session.post(f"{self.base_url}{path}", json=payload, stream=True, timeout=self.timeout)
+        if response.status_code != 200:
+            body = response.text
+            response.close()
+            raise LLMError(f"Ollama returned {response.status_code}: {body}")
+        return response
+
+    # ---------------- sync ----------------
+    def stream_generate(self, prompt, model=None, options=None, stop_when=None, **extra):
+        payload = self._payload(model, options, {"prompt": prompt, **extra})
+        return TokenStream(self._open("/api/generate", payload), _generate_token, stop_when, label="generate")
+
+    def stream_chat(self, messages, model=None, options=None, stop_when=None, **extra):
+        payload = self._payload(model, options, {"messages": messages, **extra})
+        return TokenStream(self._open("/api/chat", payload), _chat_token, stop_when, label="chat")
+
+    def generate(self, prompt, **kwargs):
+        stream = self.stream_generate(prompt, **kwargs)
+        for _ in stream:
+            pass
+        return stream.text
+
+    def chat(self, messages, **kwargs):
+        stream = self.stream_chat(messages, **kwargs)
+        for _ in stream:
+            pass
+        return stream.text
+
+    # ---------------- async ----------------
+    async def astream(self, path, payload, extract, stop_when=None):
+        import httpx
+
+        text = ""
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with client.stream("POST", f"{self.base_url}{path}", json=payload) as response:
+                if response.status_code != 200:
+                    raise LLMError(f"Ollama returned {response.status_code}: {(await response.aread()).decode()}")
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise LLMError(chunk["error"])
+                    token = extract(chunk)
+                    if token:
+                        text += token
+                        yield token
+                        if stop_when is not None and stop_when(text):
+                            return  # leaving the context manager closes the stream
+                    if chunk.get("done"):
+                        return
+
+    def astream_generate(self, prompt, model=None, options=None, stop_when=None, **extra):
+        payload = self._payload(model, options, {"prompt": prompt, **extra})
+        return self.astream("/api/generate", payload, _generate_token, stop_when)
+
+    def astream_chat(self, messages, model=None, options=None, stop_when=None, **extra):
+        payload = self._payload(model, options, {"messages": messages, **extra})
+        return self.astream("/api/chat", payload, _chat_token, stop_when)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OllamaClient()
+        return _client
+
+
+def configure(base_url=None, model=DEFAULT_MODEL, **kwargs):
+    """Point the shared client somewhere else (another host, a local stub server)."""
+    global _client
+    with _client_lock:
+        _client = OllamaClient(base_url=base_url, model=model, **kwargs)
+        return _client
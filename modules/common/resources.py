@@ -0,0 +1,137 @@
+import logging
+import os
+import threading
+import time
+
+# Loaded in the background at start-up; anything else registered loads on first use
+WARM_RESOURCES = [name for name in os.environ.get(
+    "WARM_RESOURCES", "intent-ml,gmail-sub-intent,spacy-ner,finbert,tts"
+).split(",") if name]
+
+
+def rss_bytes():
+    """Resident memory of this process, or None where it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class SharedResource:
+    """One object per process (a model, a pipeline, a worker pool), loaded at most once.
+
+    Calling the resource returns the object, loading it on first use; threads that ask
+    while it is loading wait for that load instead of starting their own. The load time,
+    the memory the process grew by during the load, and any load error are kept for the
+    status panel. A failed load is retried on the next call.
+    """
+
+    def __init__(self, name, load, description=""):
+        self.name = name
+        self.load = load
+        self.description = description
+        self.state = "not loaded"
+        self.load_seconds = None
+        self.memory_bytes = None
+        self.error = None
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                self.state = "loading"
+                before = rss_bytes()
+                started = time.perf_counter()
+                try:
+                    value = self.load()
+                except Exception as e:
+                    self.state = "failed"
+                    self.error = f"{type(e).__name__}: {e}"
+                    logging.exception(f"Loading {self.name} failed")
+                    raise
+                self.load_seconds = time.perf_counter() - started
+                after = rss_bytes()
+                self.memory_bytes = after - before if before is not None and after is not None else None
+                self._value, self._loaded = value, True
+                self.state, self.error = "ready", None
+                logging.info(f"Loaded {self.name} in {self.load_seconds:.1f}s")
+        return self._value
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def status(self):
+        return {
+            "resource": self.name,
+            "description": self.description,
+            "state": self.state,
+            "load_seconds": None if self.load_seconds is None else round(self.load_seconds, 2),
+            "memory_mb": None if self.memory_bytes is None else round(self.memory_bytes / 1024 ** 2, 1),
+            "error": self.error or "",
+        }
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def register(name, load, description=""):
+    """The SharedResource called `name`, creating it around `load` if it is new.
+
+    A module re-executed under the same name (Streamlit reloads edited files) gets the
+    resource it registered before, so an already loaded model is not loaded again.
+    """
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = SharedResource(name, load, description)
+        return _registry[name]
+
+
+def shared_resource(name, description=""):
+    """Decorator form of `register` for zero-argument loader functions."""
+    return lambda load: register(name, load, description)
+
+
+def get_resource(name):
+    return _registry[name]()
+
+
+def resource_status():
+    with _registry_lock:
+        resources = list(_registry.values())
+    return [r.status() for r in resources]
+
+
+def warm_up(names=None):
+    """Load resources one after another in a daemon thread and return the thread.
+
+    Loading in sequence keeps each resource's memory figure its own and leaves CPU for
+    requests that arrive meanwhile; a request needing a model that is still loading waits
+    for that same load.
+    """
+    names = WARM_RESOURCES if names is None else names
+
+    def run():
+        for name in names:
+            if name not in _registry:
+                logging.warning(f"Unknown resource {name!r}; skipped in warm-up")
+                continue
+            try:
+                _registry[name]()
+            except Exception:
+                pass  # recorded on the resource and logged
+
+    thread = threading.Thread(target=run, name="resource-warmup", daemon=True)
+    thread.start()
+    return thread
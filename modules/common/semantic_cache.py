@@ -0,0 +1,382 @@
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from modules.common.resources import register
+
+EMBED_MODEL = os.environ.get("SEMANTIC_CACHE_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+INDEX_BACKEND = os.environ.get("SEMANTIC_CACHE_INDEX", "auto")   # auto | hnsw | numpy
+ENABLED = os.environ.get("SEMANTIC_CACHE", "1") != "0"
+MAX_ENTRIES = 5000
+EMBED_CHARS = 2000     # only the start of long texts is embedded; see _same_document
+# Namespaces whose entries are whole documents: a match must also pass _same_document
+DOCUMENT_NAMESPACES = {"notes", "summary"}
+
+# Cosine similarity a cached prompt needs to be reused. Chat tolerates rephrasing; notes and
+# summaries are inputs of whole documents and must be essentially the same text.
+THRESHOLDS = {"chat": 0.92, "notes": 0.97, "summary": 0.97}
+DEFAULT_THRESHOLD = 0.95
+TTLS = {"chat": 24 * 60 * 60, "notes": 7 * 24 * 60 * 60, "summary": 7 * 24 * 60 * 60}
+DEFAULT_TTL = 24 * 60 * 60
+
+# Prompts whose answer depends on who asks, when, or on earlier turns are never cached
+EXCLUSIONS = {
+    "chat": [
+        ("personal", re.compile(r"\b(i|i'm|i've|i'd|i'll|me|my|mine|myself|we|our|us)\b", re.I)),
+        ("time", re.compile(r"\b(today|tonight|tomorrow|yesterday|now|current(ly)?|latest|recent|"
+                            r"this (morning|week|month|year))\b", re.I)),
+        ("follow-up", re.compile(r"\b(it|that|this|these|those|he|she|they|him|her|them|above|"
+                                 r"previous|again)\b", re.I)),
+        ("contact", re.compile(r"\S+@\S+|\+?\d[\d\s-]{7,}\d")),
+    ],
+}
+
+
+# ------------------------ Embeddings -------------------------------
+class HashingEmbedder:
+    """Dependency-free fallback: hashed word and character-trigram counts, L2-normalized.
+
+    Catches rewordings that share most words; a sentence-embedding model also catches
+    paraphrases.
+    """
+
+    name = "hashing-ngrams"
+
+    def __init__(self, dim=1024):
+        self.dim = dim
+
+    def _features(self, text):
+        text = " ".join(re.findall(r"\w+", text.lower()))
+        words = text.split()
+        return words + [f"#{text[i:i + 3]}" for i in range(len(text) - 2)]
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                vectors[row, zlib.crc32(feature.encode("utf-8")) % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-9)
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name=EMBED_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts):
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def load_embedder():
+    try:
+        return SentenceTransformerEmbedder()
+    except Exception as e:
+        logging.info(f"Semantic cache: {EMBED_MODEL} unavailable ({e}); using hashed n-grams")
+        return HashingEmbedder()
+
+
+# The process-wide embedder, loaded once and listed in the resources panel (when the cache is on)
+if ENABLED:
+    get_embedder = register("semantic-embedder", load_embedder, "Prompt embeddings for the semantic cache")
+else:
+    get_embedder = load_embedder
+
+
+# ------------------------ Indexes -----------------------------------
+class NumpyIndex:
+    """Exact inner-product search over a matrix; fine for a few thousand entries."""
+
+    def __init__(self, dim):
+        self.ids = []
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+
+    def add(self, item_id, vector):
+        self.ids.append(item_id)
+        self.vectors = np.vstack([self.vectors, vector[None, :]])
+
+    def remove(self, item_id):
+        row = self.ids.index(item_id)
+        del self.ids[row]
+        self.vectors = np.delete(self.vectors, row, axis=0)
+
+    def search(self, vector, k):
+        if not self.ids:
+            return []
+        scores = self.vectors @ vector
+        top = np.argsort(-scores)[:k]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+
+class HnswIndex:
+    """Approximate search with hnswlib; deleted slots are reused by later inserts."""
+
+    def __init__(self, dim, max_elements=MAX_ENTRIES):
+        import hnswlib
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        self.index.init_index(max_elements=max_elements + 1, ef_construction=100, M=16, allow_replace_deleted=True)
+        self.index.set_ef(50)
+        self.live = 0
+
+    def add(self, item_id, vector):
+        self.index.add_items(vector[None, :], [item_id], replace_deleted=True)
+        self.live += 1
+
+    def remove(self, item_id):
+        self.index.mark_deleted(item_id)
+        self.live -= 1
+
+    def search(self, vector, k):
+        if not self.live:
+            return []
+        labels, distances = self.index.knn_query(vector[None, :], k=min(k, self.live))
+        return [(int(label), 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+
+def make_index(dim):
+    if INDEX_BACKEND in ("auto", "hnsw"):
+        try:
+            return HnswIndex(dim)
+        except ImportError:
+            if INDEX_BACKEND == "hnsw":
+                raise
+    return NumpyIndex(dim)
+
+
+def _shingles(text, n=5):
+    words = re.findall(r"\w+", text.lower())
+    return {zlib.crc32(" ".join(words[i:i + n]).encode("utf-8")) for i in range(max(1, len(words) - n + 1))}
+
+
+def _same_document(a, b, min_overlap=0.9):
+    """Identical texts, or texts of similar length sharing most of their 5-word shingles.
+
+    Embeddings only see the first EMBED_CHARS and blur small but meaningful differences,
+    so documents are compared on their content as well.
+    """
+    if a == b:
+        return True
+    if min(len(a), len(b)) < 0.9 * max(len(a), len(b)):
+        return False
+    sa, sb = _shingles(a), _shingles(b)
+    return len(sa & sb) / len(sa | sb) >= min_overlap
+
+
+# ------------------------ Cache -------------------------------------
+class SemanticCache:
+    """LLM responses reused for prompts that mean the same thing.
+
+    Each namespace ("chat", "notes", "summary") has its own index, similarity threshold and
+    TTL, and entries only match calls to the same model. The cache holds `max_entries`
+    responses in memory, least recently used evicted first. Chat prompts matching an
+    EXCLUSIONS rule (personal details, time-sensitive or follow-up questions) are neither
+    looked up nor stored.
+
+    When `text` is a prompt wrapped around a document, pass the document as `document`:
+    only the document is embedded and compared, and the rest of the prompt (the
+    instructions) must match exactly.
+    """
+
+    def __init__(self, embedder=None, thresholds=None, ttls=None, max_entries=MAX_ENTRIES, index_factory=make_index):
+        self._embedder = embedder
+        self.thresholds = {**THRESHOLDS, **(thresholds or {})}
+        self.ttls = {**TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.index_factory = index_factory
+        self.indexes = {}
+        self.entries = OrderedDict()   # id -> entry dict, in LRU order
+        self.counters = {}
+        self._next_id = 0
+        self._recent = OrderedDict()   # text -> vector, so a miss is not embedded twice
+        self._lock = threading.RLock()
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    def _count(self, namespace, **deltas):
+        counters = self.counters.setdefault(
+            namespace, {"lookups": 0, "hits": 0, "misses": 0, "excluded": 0, "saved_seconds": 0.0, "lookup_seconds": 0.0}
+        )
+        for name, delta in deltas.items():
+            counters[name] += delta
+
+    def _embed(self, text):
+        with self._lock:
+            vector = self._recent.get(text)
+        if vector is None:
+            vector = self.embedder.encode([text[:EMBED_CHARS]])[0]
+            with self._lock:
+                self._recent[text] = vector
+                while len(self._recent) > 32:
+                    self._recent.popitem(last=False)
+        return vector
+
+    def excluded(self, namespace, text):
+        """Name of the exclusion rule the text matches, or None."""
+        for name, pattern in EXCLUSIONS.get(namespace, []):
+            if pattern.search(text):
+                return name
+        return None
+
+    @staticmethod
+    def _split(text, document):
+        # (what is embedded and compared, what must match exactly)
+        if document is None:
+            return text, None
+        return document, text.replace(document, "\0", 1)
+
+    def _remove(self, item_id):
+        entry = self.entries.pop(item_id)
+        self.indexes[entry["namespace"]].remove(item_id)
+
+    def lookup(self, namespace, text, model=None, document=None):
+        """The cached response for a prompt similar enough to `text`, or None."""
+        with self._lock:
+            if self.excluded(namespace, text):
+                self._count(namespace, excluded=1)
+                return None
+        started = time.perf_counter()
+        text, context = self._split(text, document)
+        vector = self._embed(text)
+        threshold = self.thresholds.get(namespace, DEFAULT_THRESHOLD)
+        with self._lock:
+            index = self.indexes.get(namespace)
+            found = None
+            for item_id, score in index.search(vector, 5) if index else []:
+                entry = self.entries.get(item_id)
+                if entry is None or score < threshold:
+                    continue
+                if entry["expires"] < time.time():
+                    self._remove(item_id)
+                    continue
+                if entry["model"] != model or entry["context"] != context:
+                    continue
+                verify = namespace in DOCUMENT_NAMESPACES or max(len(text), len(entry["text"])) > EMBED_CHARS
+                if not verify or _same_document(text, entry["text"]):
+                    found = entry
+                    break
+            elapsed = time.perf_counter() - started
+            if found is None:
+                self._count(namespace, lookups=1, misses=1, lookup_seconds=elapsed)
+                return None
+            self.entries.move_to_end(found["id"])
+            self._count(namespace, lookups=1, hits=1, lookup_seconds=elapsed, saved_seconds=found["compute_seconds"])
+            return found["response"]
+
+    def store(self, namespace, text, response, compute_seconds=0.0, model=None, document=None):
+        if not response or self.excluded(namespace, text):
+            return
+        text, context = self._split(text, document)
+        vector = self._embed(text)
+        with self._lock:
+            if namespace not in self.indexes:
+                self.indexes[namespace] = self.index_factory(len(vector))
+            item_id, self._next_id = self._next_id, self._next_id + 1
+            self.entries[item_id] = {
+                "id": item_id, "namespace": namespace, "model": model, "text": text, "context": context,
+                "response": response, "compute_seconds": compute_seconds,
+                "expires": time.time() + self.ttls.get(namespace, DEFAULT_TTL),
+            }
+            self.indexes[namespace].add(item_id, vector)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def cached(self, namespace, text, compute, model=None, document=None):
+        """compute() on a miss (timed and stored), the cached response on a hit."""
+        response = self.lookup(namespace, text, model, document)
+        if response is None:
+            started = time.perf_counter()
+            response = compute()
+            self.store(namespace, text, response, time.perf_counter() - started, model, document)
+        return response
+
+    def stream(self, namespace, text, produce, model=None, document=None):
+        """Tokens of `produce()` on a miss (stored once complete); the cached response as one token on a hit."""
+        response = self.lookup(namespace, text, model, document)
+        if response is not None:
+            yield response
+            return
+        started = time.perf_counter()
+        tokens = []
+        for token in produce():
+            tokens.append(token)
+            yield token
+        self.store(namespace, text, "".join(tokens).strip(), time.perf_counter() - started, model, document)
+
+    def stats(self):
+        with self._lock:
+            sizes = {}
+            for entry in self.entries.values():
+                sizes[entry["namespace"]] = sizes.get(entry["namespace"], 0) + 1
+            result = {}
+            for namespace, c in sorted(self.counters.items()):
+                result[namespace] = {
+                    "hits": c["hits"],
+                    "misses": c["misses"],
+                    "excluded": c["excluded"],
+                    "hit_rate": round(c["hits"] / c["lookups"], 3) if c["lookups"] else 0.0,
+                    "saved_seconds": round(c["saved_seconds"], 1),
+                    "lookup_ms": round(1000 * c["lookup_seconds"] / c["lookups"], 2) if c["lookups"] else 0.0,
+                    "entries": sizes.get(namespace, 0),
+                }
+            return result
+
+    def clear(self):
+        with self._lock:
+            self.indexes.clear()
+            self.entries.clear()
+            self.counters.clear()
+            self._recent.clear()
+
+
+class _Disabled:
+    """Stand-in when SEMANTIC_CACHE=0: every call goes to the model."""
+
+    def lookup(self, *args, **kwargs):
+        return None
+
+    def store(self, *args, **kwargs):
+        pass
+
+    def cached(self, namespace, text, compute, model=None, document=None):
+        return compute()
+
+    def stream(self, namespace, text, produce, model=None, document=None):
+        return produce()
+
+    def stats(self):
+        return {}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache() if ENABLED else _Disabled()
+        return _cache
+
+
+
+def format_stats(stats):
+    lines = []
+    for namespace, s in stats.items():
+        lines.append(
+            f"{namespace}: {s['hits']} hits / {s['misses']} misses ({s['hit_rate']:.0%}), {s['excluded']} excluded, "
+            f"{s['saved_seconds']:.1f} s saved, {s['lookup_ms']:.1f} ms per lookup, {s['entries']} entries"
+        )
+    return "\n".join(lines) or "No semantic cache lookups yet."
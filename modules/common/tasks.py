@@ -0,0 +1,177 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Handlers mostly wait on Ollama, Vision or HTTP, so threads are enough
+MAX_WORKERS = int(os.environ.get("APP_TASK_WORKERS", 8))
+MAX_PER_OWNER = 3
+KEEP_FINISHED = 60 * 60
+
+ACTIVE = ("queued", "running")
+
+
+class TaskRejected(Exception):
+    pass
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class Task:
+    """One handler run: its progress steps, streamed text and partial results, read by the UI.
+
+    The handler runs in a worker thread and receives the Task; it reports through `step`,
+    `stream` and `partial`, and `check` (called by both) raises TaskCancelled once the task
+    has been cancelled, so handlers stop at their next step or token.
+    """
+
+    def __init__(self, task_id, label, owner, cleanup=()):
+        self.id = task_id
+        self.label = label
+        self.owner = owner
+        self.cleanup = list(cleanup)   # files deleted once the task is over, run or not
+        self.status = "queued"
+        self.steps = []
+        self.text = ""
+        self.partials = {}
+        self.result = None
+        self.error = None
+        self.ttft = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+
+    def step(self, label):
+        self.check()
+        self.steps.append(label)
+
+    def partial(self, **values):
+        self.check()
+        self.partials.update(values)
+
+    def stream(self, tokens):
+        """Consume a token generator into `text`, closing it (and its request) on cancel."""
+        try:
+            for token in tokens:
+                self.check()
+                if self.ttft is None:
+                    self.ttft = time.time() - self.started
+                self.text += token
+        finally:
+            if hasattr(tokens, "close"):
+                tokens.close()
+        return self.text.strip()
+
+    @property
+    def elapsed(self):
+        return ((self.finished or time.time()) - self.started) if self.started else 0.0
+
+
+class TaskRunner:
+    """Runs app handlers on one shared thread pool so a session's script run never waits on them.
+
+    `submit` returns at once with the task id; the UI polls `get` and renders the task's
+    steps and text until it finishes. One owner (a Streamlit session) may have
+    `max_per_owner` unfinished tasks; `submit` raises TaskRejected beyond that. Files
+    passed as `cleanup` (e.g. an upload) are deleted when the task finishes, fails or is
+    cancelled, including while it is still queued.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_per_owner=MAX_PER_OWNER):
+        self.max_per_owner = max_per_owner
+        self.tasks = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="app-task")
+
+    def _prune(self):
+        cutoff = time.time() - KEEP_FINISHED
+        for task_id in [t.id for t in self.tasks.values() if t.finished and t.finished < cutoff]:
+            self.tasks.pop(task_id)
+
+    def submit(self, handler, *args, label="Working", owner=None, cleanup=(), **kwargs):
+        with self._lock:
+            self._prune()
+            active = [t for t in self.tasks.values() if t.status in ACTIVE]
+            if owner is not None and sum(t.owner == owner for t in active) >= self.max_per_owner:
+                raise TaskRejected(f"You already have {self.max_per_owner} requests in progress.")
+            task = Task(uuid.uuid4().hex[:12], label, owner, cleanup)
+            self.tasks[task.id] = task
+        task.future = self._pool.submit(self._run, task, handler, args, kwargs)
+        return task.id
+
+    @staticmethod
+    def _clean_up(task):
+        for path in task.cleanup:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        task.cleanup = []
+
+    def _run(self, task, handler, args, kwargs):
+        try:
+            if task.cancelled:
+                task.status, task.finished = "cancelled", time.time()
+                return
+            task.status, task.started = "running", time.time()
+            try:
+                task.result = handler(task, *args, **kwargs)
+                task.status = "done"
+            except TaskCancelled:
+                task.status = "cancelled"
+            except Exception as e:
+                logging.exception(f"Task {task.id} ({task.label}) failed")
+                task.status, task.error = "failed", str(e)
+            task.finished = time.time()
+        finally:
+            self._clean_up(task)
+
+    def get(self, task_id):
+        with self._lock:
+            return self.tasks.get(task_id)
+
+    def cancel(self, task_id):
+        with self._lock:
+            task = self.tasks.get(task_id)
+            if task is None or task.status not in ACTIVE:
+                return False
+            task._cancelled.set()
+        if task.future.cancel():
+            # Never started, so _run will not clean up after it
+            task.status, task.finished = "cancelled", time.time()
+            self._clean_up(task)
+        return True
+
+    def shutdown(self, wait=False):
+        for task in list(self.tasks.values()):
+            task._cancelled.set()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        for task in list(self.tasks.values()):
+            if task.future is not None and task.future.cancelled():
+                self._clean_up(task)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_task_runner():
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = TaskRunner()
+        return _runner
@@ -0,0 +1,319 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+from modules.common.html_extractor import CHUNK_SIZE, FLIPKART_REVIEW_SPEC, extract_records_async
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.5735.133 Safari/537.36",
+]
+
+# At the repo root whatever the working directory, so every entry point resumes the same crawls
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                          "flipkart_reviews")
+THROTTLE_STATUSES = (429, 503)
+# A finished crawl is reused this long; after that the product is crawled from scratch
+CHECKPOINT_TTL = 24 * 60 * 60
+
+
+def product_id_from_url(product_url):
+    query = parse_qs(urlparse(product_url).query)
+    if query.get("pid"):
+        return query["pid"][0]
+    return hashlib.sha1(urlparse(product_url).path.encode("utf-8")).hexdigest()[:16]
+
+
+def page_url(product_url, page):
+    sep = "&" if "?" in product_url else "?"
+    return f"{product_url}{sep}page={page}"
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate is tuned AIMD-style.
+
+    Every successful request adds `increase` req/s (up to `max_rate`); every throttled one
+    multiplies the rate by `decrease` and, if the server sent Retry-After, pauses all
+    workers until that deadline has passed.
+    """
+
+    def __init__(self, rate=1.0, min_rate=0.05, max_rate=5.0, increase=0.1, decrease=0.5, burst=1):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=None):
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.tokens = 0.0
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+class CrawlCheckpoint:
+    """Reviews are appended to `<pid>.reviews.jsonl` page by page; `<pid>.checkpoint.json`
+    records which pages are fully written so an interrupted crawl resumes where it stopped.
+
+    A crawl that finished is marked completed and reused for `max_age` seconds, after
+    which (or with `fresh=True`) the product starts over from an empty checkpoint.
+    """
+
+    def __init__(self, out_dir, product_id, fresh=False, max_age=CHECKPOINT_TTL):
+        os.makedirs(out_dir, exist_ok=True)
+        self.reviews_path = os.path.join(out_dir, f"{product_id}.reviews.jsonl")
+        self.path = os.path.join(out_dir, f"{product_id}.checkpoint.json")
+        self.done = set()
+        self.failed = {}
+        self.last_page = None
+        self.completed = None
+
+        if os.path.exists(self.path) and not fresh:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.done = set(state.get("done", []))
+            self.failed = {int(k): v for k, v in state.get("failed", {}).items()}
+            self.last_page = state.get("last_page")
+            self.completed = state.get("completed")
+            if self.completed is not None and time.time() - self.completed > max_age:
+                fresh = True
+        if fresh:
+            self.reset()
+        self._drop_partial_pages()
+
+    def reset(self):
+        self.done, self.failed, self.last_page, self.completed = set(), {}, None, None
+        for path in (self.path, self.reviews_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _drop_partial_pages(self):
+        # A crash between appending a page and checkpointing it leaves rows for a page
+        # that will be fetched again (and possibly a line cut short mid-write); drop them
+        # so resumed output has no duplicates and stays readable.
+        if not os.path.exists(self.reviews_path):
+            return
+        lines = []
+        with open(self.reviews_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if row["page"] in self.done:
+                    lines.append(line if line.endswith("\n") else line + "\n")
+        with open(self.reviews_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    def saved_pages(self):
+        """(page, records) for every page already written, in page order."""
+        pages = {}
+        for row in iter_saved_reviews(self.reviews_path):
+            pages.setdefault(row.pop("page"), []).append(row)
+        return sorted(pages.items())
+
+    def pending(self, max_pages):
+        last = max_pages if self.last_page is None else min(max_pages, self.last_page)
+        return [p for p in range(1, last + 1) if p not in self.done]
+
+    def write_page(self, page, records):
+        with open(self.reviews_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps({"page": page, **record}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.add(page)
+        self.failed.pop(page, None)
+        self.save()
+
+    def mark_end(self, page):
+        # An empty page means the product has no more reviews past page - 1
+        self.last_page = page - 1 if self.last_page is None else min(self.last_page, page - 1)
+        self.save()
+
+    def mark_complete(self):
+        self.completed = time.time()
+        self.save()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"done": sorted(self.done), "failed": self.failed, "last_page": self.last_page,
+                       "completed": self.completed}, f)
+        os.replace(tmp, self.path)
+
+
+def iter_saved_reviews(reviews_path):
+    if not os.path.exists(reviews_path):
+        return
+    with open(reviews_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # blank, or cut short by a crash mid-write
+
+
+async def crawl_reviews_async(product_url, max_pages=10, out_dir=OUTPUT_DIR, workers=4,
+                              max_retries=5, limiter=None, on_page=None, timeout=15, fresh=False, replay=False):
+    """Crawl review pages with a bounded worker pool, retrying throttled or failed pages.
+
+    `on_page(page, records)` is called as soon as each page has been written to disk; with
+    `replay=True` it is first called for every page an earlier run already saved, so the
+    caller sees the whole product even when the crawl resumes. A page that cannot be
+    fetched or parsed ends up in `pages_failed`; an error from `on_page` or from writing
+    the checkpoint stops the crawl and is raised.
+    """
+    product_id = product_id_from_url(product_url)
+    checkpoint = CrawlCheckpoint(out_dir, product_id, fresh=fresh)
+    limiter = limiter or AdaptiveRateLimiter()
+    if replay and on_page is not None:
+        for page, records in checkpoint.saved_pages():
+            on_page(page, records)
+    queue = asyncio.Queue()
+    for page in checkpoint.pending(max_pages):
+        queue.put_nowait((page, 0))
+    failure = asyncio.get_running_loop().create_future()
+
+    async def worker(client):
+        while True:
+            page, attempt = await queue.get()
+            try:
+                if checkpoint.last_page is not None and page > checkpoint.last_page:
+                    continue
+                await limiter.acquire()
+                headers = {"User-Agent": random.choice(USER_AGENTS)}
+                records = None
+                try:
+                    async with client.stream("GET", page_url(product_url, page), headers=headers) as response:
+                        status, error = response.status_code, f"status {response.status_code}"
+                        if status == 200:
+                            limiter.on_success()
+                            try:
+                                # Parsed as it downloads; the rest of the page is skipped once the reviews end
+                                records = await extract_records_async(response.aiter_bytes(CHUNK_SIZE),
+                                                                      FLIPKART_REVIEW_SPEC)
+                            except httpx.HTTPError:
+                                raise
+                            except Exception as e:
+                                # Markup the parser cannot handle will not change on a retry
+                                status, error, attempt = None, f"parse error: {e}", max_retries
+                except httpx.HTTPError as e:
+                    status, error = None, str(e)
+
+                if records is not None:
+                    if not records:
+                        checkpoint.mark_end(page)
+                        continue
+                    checkpoint.write_page(page, records)
+                    print(f"Scraped page {page} with {len(records)} reviews.")
+                    if on_page is not None:
+                        on_page(page, records)
+                    continue
+
+                if status in THROTTLE_STATUSES:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    limiter.on_throttle(retry_after)
+                    print(f"Got {status} on page {page}; slowing to {limiter.rate:.2f} req/s and retrying.")
+                elif status is not None and 400 <= status < 500:
+                    # Client errors other than throttling will not fix themselves
+                    attempt = max_retries
+
+                if attempt + 1 >= max_retries:
+                    checkpoint.failed[page] = error
+                    checkpoint.save()
+                    print(f"Giving up on page {page}: {error}")
+                    continue
+                if status not in THROTTLE_STATUSES:
+                    await asyncio.sleep(min(30, 2 ** attempt) + random.random())
+                queue.put_nowait((page, attempt + 1))
+            except Exception as e:
+                # on_page or the checkpoint failed: stop every worker and hand the error over
+                if not failure.done():
+                    failure.set_exception(e)
+                return
+            finally:
+                queue.task_done()
+
+    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+        tasks = [asyncio.create_task(worker(client)) for _ in range(workers)]
+        joined = asyncio.ensure_future(queue.join())
+        try:
+            await asyncio.wait([joined, failure], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            joined.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(joined, *tasks, return_exceptions=True)
+    if failure.done():
+        failure.result()
+
+    complete = not checkpoint.pending(max_pages) and not checkpoint.failed
+    if complete and checkpoint.completed is None:
+        checkpoint.mark_complete()
+    return {
+        "product_id": product_id,
+        "reviews_path": checkpoint.reviews_path,
+        "pages_done": sorted(checkpoint.done),
+        "pages_failed": checkpoint.failed,
+        "throttled": limiter.throttled,
+        "complete": complete,
+    }
+
+
+def crawl_reviews(product_url, max_pages=10, out_dir=OUTPUT_DIR, workers=4, **kwargs):
+    return asyncio.run(crawl_reviews_async(product_url, max_pages=max_pages, out_dir=out_dir, workers=workers, **kwargs))
+
+
+if __name__ == "__main__":
+    url = input("Enter Flipkart product review URL: ").strip()
+    summary = crawl_reviews(url, max_pages=5)
+    print(json.dumps(summary, indent=2))
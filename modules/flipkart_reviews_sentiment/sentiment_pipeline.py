@@ -0,0 +1,198 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import Counter
+
+from modules.common.resources import shared_resource
+from modules.flipkart_reviews_sentiment.crawler import crawl_reviews, product_id_from_url
+
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+# At the repo root whatever the working directory, so the API, Streamlit and main.py share it
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         "flipkart_reviews", "sentiment_cache")
+CACHE_TTL = 24 * 60 * 60
+BATCH_SIZE = 32
+
+ASPECTS = {
+    "battery": ("battery", "charge", "charging", "backup"),
+    "display": ("display", "screen", "brightness", "amoled"),
+    "build": ("build", "strap", "body", "material"),
+    "accuracy": ("accuracy", "accurate", "tracking", "sensor", "steps"),
+    "price": ("price", "value", "money", "worth", "cost"),
+    "delivery": ("delivery", "delivered", "packaging", "package"),
+    "quality": ("quality", "durable", "premium"),
+    "sound": ("sound", "audio", "speaker", "bass"),
+    "camera": ("camera", "photo", "picture"),
+    "performance": ("performance", "speed", "fast", "lag", "smooth"),
+}
+_ASPECT_WORDS = {word: aspect for aspect, words in ASPECTS.items() for word in words}
+
+@shared_resource("review-sentiment", "Transformers sentiment pipeline for product reviews")
+def get_classifier():
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=SENTIMENT_MODEL, device=-1)
+
+
+def classify_batch(texts, batch_size=BATCH_SIZE):
+    results = get_classifier()(texts, batch_size=batch_size, truncation=True, max_length=256)
+    return [r["label"].capitalize() for r in results]
+
+
+# ------------------------ Cleaning stage -------------------------------
+_READ_MORE = re.compile(r"\s*READ MORE\s*$", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+
+def clean_review(row):
+    text = _SPACES.sub(" ", _READ_MORE.sub("", row.get("review", ""))).strip()
+    if not text:
+        return None
+    try:
+        rating = int(float(row.get("rating") or 0))
+    except ValueError:
+        rating = 0
+    return {"rating": rating, "review": text}
+
+
+# ------------------------ Aggregation stage ----------------------------
+class ReviewAggregates:
+    def __init__(self):
+        self.reviews = 0
+        self.rating_histogram = Counter()
+        self.sentiments = Counter()
+        self.aspect_mentions = Counter()
+        self.aspect_positive = Counter()
+        self.pages_done = 0
+
+    def update(self, rows, labels):
+        for row, label in zip(rows, labels):
+            self.reviews += 1
+            if 1 <= row["rating"] <= 5:
+                self.rating_histogram[row["rating"]] += 1
+            self.sentiments[label] += 1
+            for aspect in {_ASPECT_WORDS[w] for w in re.findall(r"[a-z]+", row["review"].lower()) if w in _ASPECT_WORDS}:
+                self.aspect_mentions[aspect] += 1
+                if label == "Positive":
+                    self.aspect_positive[aspect] += 1
+
+    def snapshot(self, complete=False, top_n=5):
+        rated = sum(self.rating_histogram.values())
+        return {
+            "reviews": self.reviews,
+            "pages_done": self.pages_done,
+            "complete": complete,
+            "average_rating": round(sum(k * v for k, v in self.rating_histogram.items()) / rated, 2) if rated else None,
+            "rating_histogram": {star: self.rating_histogram.get(star, 0) for star in range(1, 6)},
+            "sentiment_share": {k: round(v / self.reviews, 3) for k, v in self.sentiments.items()} if self.reviews else {},
+            "top_aspects": [
+                {"aspect": aspect, "mentions": n, "positive_share": round(self.aspect_positive[aspect] / n, 3)}
+                for aspect, n in self.aspect_mentions.most_common(top_n)
+            ],
+        }
+
+
+def score_review_stream(pages, batch_size=BATCH_SIZE, classify=classify_batch):
+    """Consume (page, rows) pairs and yield aggregate snapshots after every scored batch."""
+    aggregates = ReviewAggregates()
+    pending = []
+
+    def score(batch):
+        aggregates.update(batch, classify([r["review"] for r in batch], batch_size=batch_size))
+
+    for _, rows in pages:
+        aggregates.pages_done += 1
+        pending.extend(r for r in map(clean_review, rows) if r is not None)
+        while len(pending) >= batch_size:
+            batch = pending[:batch_size]
+            del pending[:batch_size]
+            score(batch)
+            yield aggregates.snapshot()
+
+    if pending:
+        score(pending)
+    yield aggregates.snapshot(complete=True)
+
+
+# ------------------------ Per-product cache ----------------------------
+def _cache_path(product_id):
+    return os.path.join(CACHE_DIR, f"{product_id}.json")
+
+
+def load_cached_summary(product_id, ttl=CACHE_TTL):
+    path = _cache_path(product_id)
+    if not os.path.exists(path) or time.time() - os.path.getmtime(path) > ttl:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_summary(product_id, summary):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = _cache_path(product_id) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(summary, f)
+    os.replace(tmp, _cache_path(product_id))
+
+
+def analyze_product_reviews(product_url, max_pages=5, batch_size=BATCH_SIZE, use_cache=True, classify=classify_batch):
+    """Scrape, clean and score a product's reviews, yielding partial summaries as pages arrive.
+
+    The crawler runs in a background thread and hands each page over a queue, so scoring
+    overlaps scraping; pages an earlier, interrupted crawl already saved are replayed first.
+    The final summary is `complete` (and cached per product ID) only if every page was
+    scored; an error in the crawl is raised here.
+    """
+    product_id = product_id_from_url(product_url)
+    if use_cache:
+        cached = load_cached_summary(product_id)
+        if cached is not None:
+            yield cached
+            return
+
+    pages = queue.Queue()
+    done = object()
+    crawl_result, crawl_errors = {}, []
+
+    def crawl():
+        try:
+            crawl_result.update(crawl_reviews(product_url, max_pages=max_pages, replay=True,
+                                              on_page=lambda page, rows: pages.put((page, rows))))
+        except Exception as e:
+            crawl_errors.append(e)
+        finally:
+            pages.put(done)
+
+    threading.Thread(target=crawl, daemon=True).start()
+
+    for summary in score_review_stream(iter(pages.get, done), batch_size=batch_size, classify=classify):
+        if summary["complete"]:
+            if crawl_errors:
+                raise crawl_errors[0]
+            summary["pages_failed"] = sorted(crawl_result["pages_failed"])
+            summary["complete"] = crawl_result["complete"]
+            if summary["complete"] and summary["reviews"]:
+                save_summary(product_id, summary)
+        yield summary
+
+
+def format_summary(summary):
+    lines = [f"Reviews analysed: {summary['reviews']} (pages: {summary['pages_done']})"]
+    if summary["average_rating"] is not None:
+        lines.append(f"Average rating: {summary['average_rating']} / 5")
+    lines.append("Rating histogram: " + ", ".join(f"{k}★ {v}" for k, v in summary["rating_histogram"].items()))
+    lines.append("Sentiment share: " + ", ".join(f"{k} {v:.0%}" for k, v in summary["sentiment_share"].items()))
+    if summary["top_aspects"]:
+        lines.append("Top aspects: " + ", ".join(
+            f"{a['aspect']} ({a['mentions']} mentions, {a['positive_share']:.0%} positive)" for a in summary["top_aspects"]))
+    if summary.get("pages_failed"):
+        lines.append(f"Pages that could not be fetched: {', '.join(map(str, summary['pages_failed']))}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    url = input("Enter Flipkart product review URL: ").strip()
+    for partial in analyze_product_reviews(url, max_pages=3):
+        print(format_summary(partial), "\n")
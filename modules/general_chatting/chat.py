@@ -1,30 +1,133 @@
-from langchain_ollama import ChatOllama
-from langchain.schema import HumanMessage, AIMessage
+import logging
+import math
+import threading
+
+from modules.common.llm_client import get_client
+from modules.common.semantic_cache import get_semantic_cache
+
+# The system prompt never changes, so Ollama can keep it (and everything after it that
+# did not change) in its KV cache from one turn to the next
+SYSTEM_PROMPT = (
+    "You are a helpful, friendly assistant in a multi-purpose AI app. "
+    "Answer clearly and concisely, and use the conversation so far when it is relevant."
+)
+HISTORY_TOKENS = 3000     # verbatim turns kept in the prompt
+LOW_WATER = 0.5           # after compaction the window is cut to this share of the budget
+SUMMARY_WORDS = 150
+
+def approx_tokens(text):
+    # ~4 characters per token for English
+    return math.ceil(len(text) / 4)
+
+def build_summary_prompt(summary, turns):
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in turns)
+    previous = f"Summary so far:\n{summary}\n\n" if summary else ""
+    return (
+        f"{previous}Newer part of the conversation:\n{transcript}\n\n"
+        f"Write an updated summary of the whole conversation in at most {SUMMARY_WORDS} words. "
+        "Keep names, facts, user preferences, decisions and open questions; drop small talk."
+    )
 
 class ChatBot:
-    def __init__(self, model_name="llama3.1"):
-        self.model = ChatOllama(model=model_name)
-        self.chat_history = []  # Store HumanMessage and AIMessage objects
+    """One conversation: a token-budgeted window of recent turns plus a rolling summary.
 
-    def chat(self, prompt):
-        # Append the user's message
-        self.chat_history.append(HumanMessage(content=prompt))
+    When the verbatim turns exceed `history_tokens`, the oldest ones are folded into the
+    summary in a background thread, cutting the window to `low_water` of the budget. Between
+    those compactions the prompt only grows at the end, so the model reuses its KV cache;
+    the next turn waits for a compaction that is still running. Turns are taken one at a
+    time: a second `stream` on the same bot waits until the first reply is complete.
+    """
+
+    def __init__(self, model_name="llama3.1", history_tokens=HISTORY_TOKENS, low_water=LOW_WATER):
+        self.model_name = model_name
+        self.client = get_client()
+        self.history_tokens = history_tokens
+        self.low_water = low_water
+        self.summary = ""
+        self.chat_history = []  # Store {"role", "content"} messages not yet summarized
+        self._compaction = None
+        self._lock = threading.Lock()
+        self._turn = threading.Lock()  # held for a whole exchange
+
+    def history_size(self):
+        return sum(approx_tokens(m["content"]) for m in self.chat_history)
+
+    def messages(self, prompt):
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+        return messages + self.chat_history + [{"role": "user", "content": prompt}]
 
-        # Get response from the model
-        response = self.model.invoke(self.chat_history)
+    def stream(self, prompt):
+        """Yield the reply token by token; it is added to the history once complete."""
+        with self._turn:
+            yield from self._exchange(prompt)
 
-        # Append AI's response to chat history
-        self.chat_history.append(response)
+    def _exchange(self, prompt):
+        self.wait()
+        tokens = []
+        produce = lambda: self.client.stream_chat(self.messages(prompt), model=self.model_name)
+        # Only the opening question of a conversation means the same thing in every session, so
+        # only it is looked up in (and added to) the semantic cache; later turns depend on the history
+        with self._lock:
+            opening = not self.chat_history and not self.summary
+        source = get_semantic_cache().stream("chat", prompt, produce, model=self.model_name) if opening else produce()
+        for token in source:
+            tokens.append(token)
+            yield token
 
+        # Append the exchange to chat history, then fold old turns away if over budget
+        with self._lock:
+            self.chat_history.append({"role": "user", "content": prompt})
+            self.chat_history.append({"role": "assistant", "content": "".join(tokens)})
+        self._maybe_compact()
+
+    def chat(self, prompt):
         # Return the latest response
-        return response.content.strip()
-
-def return_chat(prompt):
-    # Initialize the model
-    c = ChatBot()
-    # Get the response
-    response = c.chat(prompt)
-    return response
+        return "".join(self.stream(prompt)).strip()
+
+    # ------------------------ Memory -------------------------------
+    def wait(self):
+        """Block until a running compaction has finished."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def _maybe_compact(self):
+        with self._lock:
+            if self.history_size() <= self.history_tokens or self._compaction is not None:
+                return
+            # Evict whole user/assistant pairs, oldest first, down to the low-water mark
+            target = self.history_tokens * self.low_water
+            size, count = self.history_size(), 0
+            while count < len(self.chat_history) - 2 and size > target:
+                size -= sum(approx_tokens(m["content"]) for m in self.chat_history[count:count + 2])
+                count += 2
+            evicted = self.chat_history[:count]
+            self._compaction = threading.Thread(target=self._compact, args=(evicted,), name="chat-summary", daemon=True)
+            self._compaction.start()
+
+    def _compact(self, evicted):
+        try:
+            summary = self.client.chat([{"role": "user", "content": build_summary_prompt(self.summary, evicted)}],
+                                       model=self.model_name).strip()
+        except Exception as e:
+            logging.warning(f"Chat summary failed, keeping the turns for now: {e}")
+            summary = None
+        with self._lock:
+            if summary is not None:
+                self.summary = summary
+                del self.chat_history[:len(evicted)]
+            elif self.history_size() > 2 * self.history_tokens:
+                del self.chat_history[:len(evicted)]  # hard cap when the model keeps failing
+            self._compaction = None
+
+def return_chat(prompt, bot=None):
+    # A caller that keeps `bot` (e.g. per Streamlit session) gets a conversation with memory
+    return (bot or ChatBot()).chat(prompt)
+
+def stream_chat(prompt, bot=None):
+    return (bot or ChatBot()).stream(prompt)
 
 # # Example usage
 # bot = ChatBot()
@@ -1,9 +1,19 @@
+import os
+
 import joblib
 
-vectorizer = joblib.load("modules/gmail/sub_intent_classifier/model/tfidf_vectorizer.pkl")
-model = joblib.load("modules/gmail/sub_intent_classifier/model/sub_intent_model.pkl")
+from modules.common.resources import shared_resource
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model")
+
+@shared_resource("gmail-sub-intent", "TF-IDF + classifier for Gmail sub-intents")
+def get_sub_intent_model():
+    vectorizer = joblib.load(os.path.join(MODEL_DIR, "tfidf_vectorizer.pkl"))
+    model = joblib.load(os.path.join(MODEL_DIR, "sub_intent_model.pkl"))
+    return vectorizer, model
 
 def predict_sub_intent(user_input):
+    vectorizer, model = get_sub_intent_model()
     X = vectorizer.transform([user_input])
     predicted_intent = model.predict(X)[0]
     return predicted_intent
@@ -1,16 +1,132 @@
-import ollama
+import math
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-def format_text_with_gpt(raw_text, model="llama3.1"):
-    prompt = f"Please convert the following raw extracted text into clean, readable notes with bullet points if needed:\n\n{raw_text}"
+from modules.common.llm_client import get_client
+from modules.common.semantic_cache import get_semantic_cache
 
+CHUNK_TOKENS = 1500     # OCR text per formatting call; leaves room in num_ctx for the reply
+# Concurrent calls to Ollama; match OLLAMA_NUM_PARALLEL, extra requests only queue there
+FORMAT_WORKERS = int(os.environ.get("OLLAMA_NUM_PARALLEL", 2))
+SEPARATORS = ["\n\n", "\n", " "]
+
+def approx_tokens(text):
+    # ~4 characters per token for English
+    return math.ceil(len(text) / 4)
+
+def build_notes_prompt(raw_text):
+    return f"Please convert the following raw extracted text into clean, readable notes with bullet points if needed:\n\n{raw_text}"
+
+def build_part_prompt(raw_text, part, parts):
+    return (
+        f"This is part {part} of {parts} of the raw text extracted from one document. "
+        "Please convert it into clean, readable notes with bullet points if needed. "
+        "Only write the notes for this part, without an introduction or closing remarks, "
+        f"because the parts are joined in order afterwards:\n\n{raw_text}"
+    )
+
+# ------------------------ Chunking -----------------------------------
+def _pack(units, budget, sep):
+    chunks, current, tokens = [], [], 0
+    for unit in units:
+        if not unit.strip():
+            continue
+        size = approx_tokens(unit)
+        if current and tokens + size > budget:
+            chunks.append(sep.join(current))
+            current, tokens = [], 0
+        current.append(unit)
+        tokens += size
+    if current:
+        chunks.append(sep.join(current))
+    return chunks
+
+def split_text(text, budget=CHUNK_TOKENS, separators=SEPARATORS):
+    """Pieces of about `budget` tokens, cut between paragraphs, then lines, then words."""
+    if approx_tokens(text) <= budget or not separators:
+        return [text] if text.strip() else []
+    sep, finer = separators[0], separators[1:]
+    units = []
+    for part in text.split(sep):
+        units.extend(split_text(part, budget, finer))
+    return _pack(units, budget, sep)
+
+def split_document(document, budget=CHUNK_TOKENS):
+    """Chunks of an ocr_engine document, cut between its layout blocks.
+
+    A block is only split when it is larger than the budget on its own; pages without
+    block layout are treated as one block.
+    """
+    units = []
+    for page in document.get("pages", []):
+        blocks = [b["text"] for b in page.get("blocks", [])] or [page.get("text", "")]
+        for block in blocks:
+            units.extend(split_text(block, budget))
+    if not units:
+        return split_text(document.get("text", ""), budget)
+    return _pack(units, budget, "\n\n")
+
+# ------------------------ Formatting ---------------------------------
+_DONE = object()
+
+def stream_format_text_with_gpt(raw_text, model="llama3.1"):
+    """Yield the formatted notes token by token as the model produces them (one call)."""
+    return get_client().stream_chat([{"role": "user", "content": build_notes_prompt(raw_text)}], model=model)
+
+def _format_part(prompt, model, out, stop):
     try:
-        response = ollama.chat(
-            model=model,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response['message']['content'].strip()
+        if stop.is_set():
+            return
+        stream = get_client().stream_chat([{"role": "user", "content": prompt}], model=model,
+                                          stop_when=lambda _: stop.is_set())
+        for token in stream:
+            out.put(token)
     except Exception as e:
-        return f"Error generating notes: {e}"
+        out.put(e)
+    finally:
+        out.put(_DONE)
+
+def stream_notes(raw, model="llama3.1", budget=CHUNK_TOKENS, workers=FORMAT_WORKERS):
+    """Yield formatted notes for OCR text or an ocr_engine document, token by token.
+
+    Long input is split into chunks of about `budget` tokens (at layout blocks when given a
+    document) and up to `workers` chunks are formatted at once. Tokens still come out in
+    document order: the first chunk streams live while later ones are buffered, so the
+    caller sees one continuous stream. A failed chunk raises when the output reaches it,
+    and closing the generator cancels the remaining work.
+    """
+    # Notes for the same (or an essentially identical) text are served from the semantic cache
+    text = raw["text"] if isinstance(raw, dict) else raw
+    yield from get_semantic_cache().stream("notes", text, lambda: _stream_chunks(raw, model, budget, workers), model=model)
+
+def _stream_chunks(raw, model, budget, workers):
+    chunks = split_document(raw, budget) if isinstance(raw, dict) else split_text(raw, budget)
+    if len(chunks) <= 1:
+        yield from stream_format_text_with_gpt(chunks[0] if chunks else "", model)
+        return
+
+    stop = threading.Event()
+    outputs = [queue.Queue() for _ in chunks]
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="notes-format")
+    try:
+        for part, (chunk, out) in enumerate(zip(chunks, outputs), start=1):
+            pool.submit(_format_part, build_part_prompt(chunk, part, len(chunks)), model, out, stop)
+        for part, out in enumerate(outputs):
+            if part:
+                yield "\n\n"
+            while True:
+                token = out.get()
+                if token is _DONE:
+                    break
+                if isinstance(token, Exception):
+                    raise token
+                yield token
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
 
+def format_text_with_gpt(raw, model="llama3.1", **kwargs):
+    """Formatted notes as one string; raises LLMError (or a connection error) on failure."""
+    return "".join(stream_notes(raw, model, **kwargs)).strip()
@@ -0,0 +1,93 @@
+import io
+import threading
+from importlib import metadata
+
+import numpy as np
+from PIL import Image
+
+# Offline OCR engines for the notes maker. Both run on CPU and are CPU-bound, so
+# ocr_engine runs them in worker processes (parallel = "processes").
+
+
+class TesseractOCR:
+    """Tesseract via pytesseract (needs the `tesseract` binary on PATH)."""
+
+    name = "tesseract"
+    parallel = "processes"
+    config = "--oem 1 --psm 3"
+
+    def __init__(self):
+        import pytesseract
+        self.pytesseract = pytesseract
+        self.version = self.engine_version()
+
+    @classmethod
+    def engine_version(cls):
+        import pytesseract
+        return f"tesseract/{pytesseract.get_tesseract_version()}/{cls.config}"
+
+    def ocr(self, image_bytes):
+        image = Image.open(io.BytesIO(image_bytes))
+        # One call gives words with block/line numbers, confidences and boxes
+        data = self.pytesseract.image_to_data(image, config=self.config, output_type=self.pytesseract.Output.DICT)
+        blocks = {}
+        for i, word in enumerate(data["text"]):
+            if not word.strip():
+                continue
+            block = blocks.setdefault(data["block_num"][i], {"lines": {}, "conf": [], "box": None})
+            block["lines"].setdefault((data["par_num"][i], data["line_num"][i]), []).append(word)
+            block["conf"].append(float(data["conf"][i]))
+            x0, y0 = data["left"][i], data["top"][i]
+            x1, y1 = x0 + data["width"][i], y0 + data["height"][i]
+            b = block["box"] or [x0, y0, x1, y1]
+            block["box"] = [min(b[0], x0), min(b[1], y0), max(b[2], x1), max(b[3], y1)]
+
+        layout = []
+        for _, block in sorted(blocks.items()):
+            x0, y0, x1, y1 = block["box"]
+            layout.append({
+                "text": "\n".join(" ".join(words) for _, words in sorted(block["lines"].items())),
+                "confidence": round(sum(block["conf"]) / len(block["conf"]) / 100, 3),
+                "box": [[x0, y0], [x1, y0], [x1, y1], [x0, y1]],
+            })
+        return {
+            "text": "\n\n".join(b["text"] for b in layout),
+            "width": image.width,
+            "height": image.height,
+            "blocks": layout,
+        }
+
+
+class EasyOCR:
+    """EasyOCR (PyTorch) on CPU; the reader is loaded once per process."""
+
+    name = "easyocr"
+    parallel = "processes"
+    languages = ["en"]
+
+    def __init__(self):
+        import easyocr
+        self.version = self.engine_version()
+        self._reader = easyocr.Reader(self.languages, gpu=False, verbose=False)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def engine_version(cls):
+        # From the package metadata: importing easyocr would pull in PyTorch
+        return f"easyocr/{metadata.version('easyocr')}/{'+'.join(cls.languages)}"
+
+    def ocr(self, image_bytes):
+        image = Image.open(io.BytesIO(image_bytes))
+        with self._lock:
+            # paragraph=True merges detections into text blocks in reading order
+            results = self._reader.readtext(np.array(image), paragraph=True)
+        blocks = [
+            {"text": text, "confidence": None, "box": [[int(x), int(y)] for x, y in box]}
+            for box, text in results
+        ]
+        return {
+            "text": "\n\n".join(b["text"] for b in blocks),
+            "width": image.width,
+            "height": image.height,
+            "blocks": blocks,
+        }
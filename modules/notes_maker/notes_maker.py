@@ -1,12 +1,21 @@
-from .vision_ocr import extract_text_from_image
-from .gpt_formatter import format_text_with_gpt
+from .ocr_engine import ocr_document
+from .gpt_formatter import format_text_with_gpt, stream_notes
 
 
-def make_notes_from_image(image_path):
-    raw_text = extract_text_from_image(image_path)
-    formatted_text = format_text_with_gpt(raw_text)
+def extract_text(image_paths, backend=None):
+    """OCR text of an image, a PDF, or a list of them (pages processed in parallel)."""
+    return ocr_document(image_paths, backend=backend)["text"]
+
+def make_notes_from_image(image_path, backend=None):
+    document = ocr_document(image_path, backend=backend)
+    formatted_text = format_text_with_gpt(document)
     return formatted_text 
 
+def stream_notes_from_image(image_path, backend=None):
+    """Run OCR, then yield the formatted notes as the model writes them."""
+    document = ocr_document(image_path, backend=backend)
+    yield from stream_notes(document)
+
 if __name__ == "__main__":
     # Example usage
     image_path = "F:\\ocrtest.jpg"
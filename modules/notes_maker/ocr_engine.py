@@ -0,0 +1,152 @@
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from importlib import import_module
+from multiprocessing import get_context
+
+from PIL import Image, ImageOps, ImageSequence
+
+from modules.common.content_cache import content_key, get_content_cache
+
+DEFAULT_BACKEND = os.environ.get("OCR_BACKEND", "google")
+# Longest side sent to the engine; enough for printed and handwritten notes at page scale
+MAX_SIDE = 2048
+JPEG_QUALITY = 85
+PDF_DPI = 200
+WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+# name -> "module:Class"; imported on first use so optional engines stay optional
+BACKENDS = {
+    "google": "modules.notes_maker.vision_ocr:GoogleVisionOCR",
+    "tesseract": "modules.notes_maker.local_ocr:TesseractOCR",
+    "easyocr": "modules.notes_maker.local_ocr:EasyOCR",
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def backend_class(name=None):
+    """The backend's class: its name, parallel mode and engine_version(), without creating an engine."""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown OCR backend {name!r}; choose from {', '.join(BACKENDS)}")
+    module, cls = BACKENDS[name].split(":")
+    return getattr(import_module(module), cls)
+
+
+def get_backend(name=None):
+    """One instance per backend per process, so clients and models are created once."""
+    name = name or DEFAULT_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = backend_class(name)()
+        return _backends[name]
+
+
+# ------------------------ Pages --------------------------------------
+def prepare_image(image, max_side=MAX_SIDE, quality=JPEG_QUALITY):
+    """Upright, grayscale, downscaled JPEG bytes: what every backend receives."""
+    if not isinstance(image, Image.Image):
+        image = Image.open(image)
+    image = ImageOps.exif_transpose(image).convert("L")
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def load_pages(path, max_side=MAX_SIDE):
+    """Prepared page images of a PDF, a multi-frame TIFF/GIF, or a single image."""
+    if path.lower().endswith(".pdf"):
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return [prepare_image(page.render(scale=PDF_DPI / 72).to_pil(), max_side) for page in pdf]
+        finally:
+            pdf.close()
+    with Image.open(path) as image:
+        return [prepare_image(frame.copy(), max_side) for frame in ImageSequence.Iterator(image)]
+
+
+# ------------------------ Parallel OCR --------------------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _init_worker(backend_name):
+    get_backend(backend_name)  # load the engine once per worker process
+
+
+def _ocr_page(backend_name, page):
+    return get_backend(backend_name).ocr(page)
+
+
+def _pool(backend, workers):
+    # Network-bound backends share one client across threads; CPU-bound local engines get
+    # their own processes, each loading the engine once and kept for later documents.
+    key = (backend.name, backend.parallel, workers)
+    with _pools_lock:
+        if key not in _pools:
+            if backend.parallel == "processes":
+                _pools[key] = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"),
+                                                  initializer=_init_worker, initargs=(backend.name,))
+            else:
+                _pools[key] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"ocr-{backend.name}")
+        return _pools[key]
+
+
+def ocr_pages(pages, backend=None, workers=WORKERS):
+    """OCR prepared page images in parallel; results come back in page order.
+
+    The engine is only created in this process when the pages are OCR'd here (one page,
+    one worker, or a thread pool); a process pool loads it in its workers alone.
+    """
+    cls = backend_class(backend)
+    if len(pages) == 1 or workers == 1:
+        engine = get_backend(cls.name)
+        return [engine.ocr(page) for page in pages]
+    return list(_pool(cls, workers).map(_ocr_page, [cls.name] * len(pages), pages))
+
+
+def _document(pages):
+    return {"text": "\n\n".join(p["text"] for p in pages).strip(), "pages": pages}
+
+
+def ocr_document(paths, backend=None, workers=WORKERS, use_cache=True, max_side=MAX_SIDE):
+    """Text and layout of one or more files (images or PDFs), pages OCR'd in parallel.
+
+    Each file is cached by content hash plus backend version, so only unseen files are
+    rendered and sent to the engine.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    backend = backend_class(backend)
+    cache = get_content_cache()
+    version = f"{backend.engine_version()}|max_side={max_side}|q={JPEG_QUALITY}"
+
+    results, missing = {}, []
+    for path in paths:
+        cached = cache.get_json("ocr", content_key("ocr", version, path)) if use_cache else None
+        if cached is not None:
+            results[path] = cached
+        else:
+            missing.append(path)
+    # Decoding, resizing and JPEG encoding release the GIL, so threads are enough here
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        todo = list(zip(missing, pool.map(lambda p: load_pages(p, max_side), missing)))
+
+    flat = [page for _, pages in todo for page in pages]
+    if flat:
+        started = time.perf_counter()
+        done = iter(ocr_pages(flat, backend.name, workers))
+        elapsed = time.perf_counter() - started
+        for path, pages in todo:
+            results[path] = _document([next(done) for _ in pages])
+            if use_cache:
+                cache.put_json("ocr", content_key("ocr", version, path), results[path],
+                               elapsed * len(pages) / len(flat))
+
+    return _document([page for path in paths for page in results[path]["pages"]])
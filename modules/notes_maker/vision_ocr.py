@@ -1,25 +1,84 @@
 import os
-import io
+import threading
 from google.cloud import vision
 
+from .ocr_engine import ocr_document
+
 
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "modules/notes_maker/diesel-ability-458914-q4-c7d4e19a47bb.json"
 
 
-def extract_text_from_image(image_path):
-    client = vision.ImageAnnotatorClient()
+# Bump when the request or the layout format below changes, so old cache entries are not reused
+OCR_VERSION = "google-vision/document_text_detection/2"
 
-    with io.open(image_path, 'rb') as image_file:
-        content = image_file.read()
 
-    image = vision.Image(content=content)
+def _block_text(block):
+    words = []
+    for paragraph in block.paragraphs:
+        for word in paragraph.words:
+            words.append("".join(symbol.text for symbol in word.symbols))
+    return " ".join(words)
 
-    response = client.document_text_detection(image=image)
 
-    if response.error.message:
-        raise Exception(f"API Error: {response.error.message}")
-    
-    return response.full_text_annotation.text
+def _layout(page):
+    return {
+        "width": page.width,
+        "height": page.height,
+        "blocks": [
+            {
+                "text": _block_text(block),
+                "confidence": round(block.confidence, 3),
+                "box": [[v.x, v.y] for v in block.bounding_box.vertices],
+            }
+            for block in page.blocks
+        ],
+    }
+
+
+class GoogleVisionOCR:
+    """Google Cloud Vision document OCR through one client shared by every call and thread."""
+
+    name = "google"
+    version = OCR_VERSION
+    parallel = "threads"
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def engine_version(cls):
+        return cls.version
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = vision.ImageAnnotatorClient()
+            return self._client
+
+    def ocr(self, image_bytes):
+        """OCR one prepared page (see ocr_engine.prepare_image)."""
+        image = vision.Image(content=image_bytes)
+
+        response = self.client.document_text_detection(image=image)
+
+        if response.error.message:
+            raise Exception(f"API Error: {response.error.message}")
+
+        annotation = response.full_text_annotation
+        pages = [_layout(page) for page in annotation.pages] or [{"width": 0, "height": 0, "blocks": []}]
+        return {"text": annotation.text, **pages[0]}
+
+
+def extract_layout_from_image(image_path, use_cache=True):
+    """OCR text plus per-page blocks (text, confidence, bounding box); identical images are
+    answered from the content cache instead of a new billable Vision call."""
+    return ocr_document(image_path, backend="google", use_cache=use_cache)
+
+
+def extract_text_from_image(image_path):
+    return extract_layout_from_image(image_path)["text"]
 
 if __name__ == "__main__":
     image_path =  "modules/notes_maker/sample_image.jpg"
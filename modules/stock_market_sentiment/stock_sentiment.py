@@ -1,16 +1,23 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 import torch.nn.functional as F
 from datetime import datetime
+from modules.common.html_extractor import fetch_records, MONEYCONTROL_NEWS_SPEC
+from modules.common.resources import shared_resource
 
-finbert_tokenizer = AutoTokenizer.from_pretrained("yiyanghkust/finbert-tone")
-finbert_model = AutoModelForSequenceClassification.from_pretrained("yiyanghkust/finbert-tone")
+FINBERT_MODEL = "yiyanghkust/finbert-tone"
 finbert_labels = ["Positive", "Neutral", "Negative"]
 
+@shared_resource("finbert", "FinBERT tone model for stock headlines")
+def get_finbert():
+    tokenizer = AutoTokenizer.from_pretrained(FINBERT_MODEL)
+    model = AutoModelForSequenceClassification.from_pretrained(FINBERT_MODEL)
+    model.eval()
+    return tokenizer, model
+
 def get_sentiment(text):
+    finbert_tokenizer, finbert_model = get_finbert()
     inputs = finbert_tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
     with torch.no_grad():
         outputs = finbert_model(**inputs)
@@ -19,33 +26,29 @@ def get_sentiment(text):
     confidence = probs[0][pred].item()
     return finbert_labels[pred], round(confidence, 3)
 
-def analyze_stock_sentiment(url):
-    
-
+def fetch_headlines(url):
     headers = {'User-Agent': 'Mozilla/5.0'}
-    response = requests.get(url, headers=headers)
-    response.encoding = 'utf-8'
-    soup = BeautifulSoup(response.text, 'html.parser')
+    # Streams the tag page and stops reading once the news list has been parsed
+    _, articles = fetch_records(url, MONEYCONTROL_NEWS_SPEC, headers=headers)
+    return articles
 
-    articles = soup.find_all('li', class_='clearfix')
+def score_headlines(articles):
     news_data = []
 
     for article in articles:
-        title_tag = article.find('h2')
-        link_tag = article.find('a', href=True)
-
-        if title_tag and link_tag:
-            title = title_tag.get_text(strip=True)
-            link = link_tag['href']
-            sentiment, confidence = get_sentiment(title)
-            news_data.append({
-                'headline': title,
-                'link': link,
-                'sentiment': sentiment,
-                'confidence': confidence
-            })
+        title = article['headline']
+        sentiment, confidence = get_sentiment(title)
+        news_data.append({
+            'headline': title,
+            'link': article['link'],
+            'sentiment': sentiment,
+            'confidence': confidence
+        })
 
     return pd.DataFrame(news_data)
+
+def analyze_stock_sentiment(url):
+    return score_headlines(fetch_headlines(url))
 if __name__ == "__main__":
     
     sentiment_df = analyze_stock_sentiment("https://www.moneycontrol.com/news/tags/tata-motors.html")
@@ -1,10 +1,9 @@
-import pyttsx3
+from modules.text_to_audio.tts_service import get_tts_service
 
 
-def convert_text_to_audio(text, filename="notes_audio.mp3"):
-    engine = pyttsx3.init()
-    engine.setProperty('rate', 150)  # Speed
-    engine.setProperty('volume', 1.0)  # Volume
-    engine.save_to_file(text, filename)
-    engine.runAndWait()
-    print(f"🔊 Audio saved as {filename}")
+def convert_text_to_audio(text, filename=None, **options):
+    """Speak `text` into a WAV file and return its path (a new unique file unless `filename` is given)."""
+    path = get_tts_service().synthesize(text, filename, **options)
+    if path:
+        print(f"🔊 Audio saved as {path}")
+    return path
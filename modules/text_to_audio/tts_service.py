@@ -0,0 +1,299 @@
+import os
+import re
+import shutil
+import time
+import unicodedata
+import uuid
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from modules.common.content_cache import content_key, get_content_cache
+from modules.common.resources import shared_resource
+
+AUDIO_DIR = os.environ.get("TTS_AUDIO_DIR", ".tts_audio")
+TTS_WORKERS = int(os.environ.get("TTS_WORKERS", max(1, min(2, os.cpu_count() or 1))))
+KEEP_AUDIO = 24 * 60 * 60
+# The first chunk is kept short so playback can start quickly; later ones are larger
+FIRST_CHUNK_CHARS = 200
+CHUNK_CHARS = 800
+DEFAULT_VOICE = {"rate": 150, "volume": 1.0, "voice": None}
+
+
+# ------------------------ Sentence splitting -------------------------
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+|\n+")
+_CLAUSE_END = re.compile(r"(?<=[,)])\s+")
+
+
+def normalize_text(text):
+    """Text as it is spoken and cached: NFKC, single spaces, no surrounding whitespace."""
+    return re.sub(r"[ \t\r\f\v]+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def split_sentences(text):
+    return [" ".join(s.split()) for s in _SENTENCE_END.split(normalize_text(text)) if s and s.strip()]
+
+
+def _split_long(sentence, limit):
+    if len(sentence) <= limit:
+        return [sentence]
+    pieces, current = [], ""
+    for part in _CLAUSE_END.split(sentence) if _CLAUSE_END.search(sentence) else sentence.split(" "):
+        if current and len(current) + len(part) + 1 > limit:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {part}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_for_speech(text, first_chars=FIRST_CHUNK_CHARS, chunk_chars=CHUNK_CHARS):
+    """Sentences grouped into chunks: a short first one, then up to `chunk_chars` each.
+
+    Sentences are the unit of synthesis and caching (long ones are cut at clauses or
+    words); a chunk is what one worker call speaks and what `stream` yields.
+    """
+    chunks, current, size = [], [], 0
+    for sentence in split_sentences(text):
+        for piece in _split_long(sentence, first_chars if not chunks else chunk_chars):
+            limit = first_chars if not chunks else chunk_chars
+            if current and size + len(piece) + 1 > limit:
+                chunks.append(current)
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# ------------------------ Worker process side ----------------------
+_engine = None
+
+
+def _init_engine():
+    global _engine
+    import pyttsx3
+    _engine = pyttsx3.init()
+
+
+def pyttsx3_synthesize(items, rate=150, volume=1.0, voice=None):
+    """Default synthesizer: the worker's warm pyttsx3 engine speaks each (text, path) to a WAV file."""
+    if _engine is None:
+        _init_engine()
+    _engine.setProperty("rate", rate)
+    _engine.setProperty("volume", volume)
+    if voice:
+        _engine.setProperty("voice", voice)
+    for text, path in items:
+        _engine.save_to_file(text, path)
+    _engine.runAndWait()  # one run for the whole batch
+
+
+def _run_chunk(synthesize, items, options):
+    started = time.perf_counter()
+    synthesize(items, **options)
+    return time.perf_counter() - started
+
+
+def _warm():
+    return os.getpid()  # the initializer has already loaded the engine
+
+
+# ------------------------ App side ----------------------------------
+def new_audio_path(suffix=".wav", audio_dir=AUDIO_DIR):
+    """A fresh file name, so concurrent sessions never overwrite each other's audio."""
+    os.makedirs(audio_dir, exist_ok=True)
+    return os.path.join(audio_dir, f"{uuid.uuid4().hex}{suffix}")
+
+
+def pin_file(path, dest):
+    """Hard-link (or copy) `path` to `dest`, so the cache can evict the original while it is in
+    use; None if it is already gone."""
+    try:
+        os.link(path, dest)
+    except FileNotFoundError:
+        return None
+    except OSError:  # another file system, or no hard links
+        try:
+            shutil.copyfile(path, dest)
+        except FileNotFoundError:
+            return None
+    return dest
+
+
+def concat_wav(paths, output):
+    with wave.open(paths[0], "rb") as first:
+        params = first.getparams()
+    with wave.open(output, "wb") as out:
+        out.setparams(params)
+        for path in paths:
+            with wave.open(path, "rb") as part:
+                out.writeframes(part.readframes(part.getnframes()))
+    return output
+
+
+class TTSService:
+    """Text to speech in warm worker processes, streamed chunk by chunk and cached by sentence.
+
+    pyttsx3 engines are slow to create and not thread-safe, so each of `workers` spawned
+    processes initializes one engine and keeps it. Text is split into sentence chunks that
+    are synthesized in parallel; `stream` yields the chunk files in order as soon as each is
+    ready, and `synthesize` joins them into one WAV file.
+
+    Audio is cached in the content cache, keyed on the normalized text plus rate, volume,
+    voice and synthesizer: whole texts ("tts_text") are served as the cached file itself,
+    and sentences ("tts_sentence") are reused when only part of a text changed.
+    """
+
+    def __init__(self, workers=TTS_WORKERS, audio_dir=AUDIO_DIR, synthesize=pyttsx3_synthesize, cache=None):
+        self.workers = workers
+        self.audio_dir = audio_dir
+        self.synthesize_chunk = synthesize
+        self._cache = cache
+        initializer = _init_engine if synthesize is pyttsx3_synthesize else None
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"),
+                                         initializer=initializer)
+        self.prune()
+
+    @property
+    def cache(self):
+        return self._cache or get_content_cache()
+
+    def warm_up(self):
+        """Start every worker process and load its engine ahead of the first request."""
+        futures = [self._pool.submit(_warm) for _ in range(self.workers)]
+        return {f.result() for f in futures}
+
+    def _options(self, rate, volume, voice):
+        options = {**DEFAULT_VOICE, **{k: v for k, v in
+                                       (("rate", rate), ("volume", volume), ("voice", voice)) if v is not None}}
+        fn = self.synthesize_chunk
+        version = f"{fn.__module__}.{fn.__name__}|rate={options['rate']}|volume={options['volume']}|voice={options['voice']}"
+        return options, version
+
+    def stream(self, text, rate=None, volume=None, voice=None, use_cache=True):
+        """Yield (index, total, path) for each chunk, in order, as soon as it is synthesized.
+
+        Cached sentences are not sent to the engine again; a chunk whose sentences are all
+        cached is ready immediately. They are pinned into the stream's work directory first,
+        so a concurrent eviction cannot remove them before they are read.
+        """
+        options, version = self._options(rate, volume, voice)
+        chunks = split_for_speech(text)
+        if not chunks:
+            return
+        workdir = new_audio_path(suffix="", audio_dir=self.audio_dir)
+        os.makedirs(workdir)
+        cache = self.cache if use_cache else None
+        planned = {}  # sentence key -> path, so repeated sentences are spoken once
+        plan = []
+        try:
+            for i, sentences in enumerate(chunks):
+                parts, missing = [], []
+                for j, sentence in enumerate(sentences):
+                    key = content_key("tts_sentence", version, sentence.encode("utf-8"))
+                    if key in planned:
+                        path = planned[key]
+                    else:
+                        path = os.path.join(workdir, f"{i:04d}_{j:03d}.wav")
+                        cached = cache.blob_path("tts_sentence", key) if cache else None
+                        if cached is None or pin_file(cached, path) is None:
+                            missing.append((sentence, path, key))  # not cached, or evicted since the lookup
+                    planned[key] = path
+                    parts.append(path)
+                future = None
+                if missing:
+                    items = [(sentence, path) for sentence, path, _ in missing]
+                    future = self._pool.submit(_run_chunk, self.synthesize_chunk, items, options)
+                plan.append((parts, missing, future))
+
+            for i, (parts, missing, future) in enumerate(plan):
+                if future is not None:
+                    elapsed = future.result()
+                    chars = sum(len(sentence) for sentence, _, _ in missing)
+                    for sentence, path, key in missing:
+                        if cache is not None:
+                            with open(path, "rb") as f:
+                                cache.put_blob("tts_sentence", key, f.read(), elapsed * len(sentence) / chars)
+                chunk_path = parts[0] if len(parts) == 1 else concat_wav(parts, os.path.join(workdir, f"{i:04d}.wav"))
+                yield i, len(plan), chunk_path
+        finally:
+            for _, _, future in plan:
+                if future is not None:
+                    future.cancel()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def synthesize(self, text, filename=None, on_chunk=None, use_cache=True, rate=None, volume=None, voice=None):
+        """Synthesize `text` to one WAV file and return its path.
+
+        Without `filename` the result is served straight from the cache directory (or a new
+        unique file when caching is off), so concurrent sessions never share an output name.
+        `on_chunk(index, total, path)` is called as each chunk becomes playable (the file is
+        only valid during the call). Returns None when there is nothing to speak.
+        """
+        _, version = self._options(rate, volume, voice)
+        normalized = normalize_text(text)
+        if not normalized:
+            return None
+        key = content_key("tts_text", version, normalized.encode("utf-8"))
+        cached = self.cache.blob_path("tts_text", key) if use_cache else None
+        if cached is not None:
+            if on_chunk is not None:
+                on_chunk(0, 1, cached)
+            if filename:
+                shutil.copyfile(cached, filename)
+                return filename
+            return cached
+
+        started = time.perf_counter()
+        output = filename or new_audio_path(audio_dir=self.audio_dir)
+        out = None
+        complete = False
+        try:
+            # Chunk files only live until the stream moves on, so append each one as it arrives
+            for index, total, path in self.stream(normalized, rate, volume, voice, use_cache):
+                with wave.open(path, "rb") as part:
+                    if out is None:
+                        out = wave.open(output, "wb")
+                        out.setparams(part.getparams())
+                    out.writeframes(part.readframes(part.getnframes()))
+                if on_chunk is not None:
+                    on_chunk(index, total, path)
+            complete = True
+        finally:
+            if out is not None:
+                out.close()
+            if not complete and os.path.exists(output):
+                os.remove(output)  # a failed chunk leaves no partial file behind
+        if use_cache:
+            with open(output, "rb") as f:
+                path = self.cache.put_blob("tts_text", key, f.read(), time.perf_counter() - started)
+            if not filename:
+                os.remove(output)
+                output = path
+        return output
+
+    def prune(self, max_age=KEEP_AUDIO):
+        """Delete generated audio older than `max_age` seconds."""
+        if not os.path.isdir(self.audio_dir):
+            return
+        cutoff = time.time() - max_age
+        for name in os.listdir(self.audio_dir):
+            path = os.path.join(self.audio_dir, name)
+            if os.path.getmtime(path) < cutoff:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+
+    def shutdown(self, wait=False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+@shared_resource("tts", "pyttsx3 worker processes (engines load in the workers)")
+def get_tts_service():
+    service = TTSService()
+    service.warm_up()
+    return service
@@ -0,0 +1,248 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+MAX_WORKERS = int(os.environ.get("AUDIO_JOB_WORKERS", max(1, (os.cpu_count() or 1) // 4)))
+MAX_QUEUED = int(os.environ.get("AUDIO_JOB_QUEUE", 8))
+MAX_PER_OWNER = 2
+KEEP_FINISHED = 60 * 60
+
+ACTIVE = ("queued", "running")
+
+
+class JobRejected(Exception):
+    pass
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# ------------------------ Worker process side ----------------------
+_events = None
+_cancelled = None
+
+
+def _init_worker(events, cancelled):
+    global _events, _cancelled
+    _events, _cancelled = events, cancelled
+
+
+def summarize_job(file_path, emit, model_size="base", gpt_model="llama3.1", cpu_threads=0):
+    """Default job: the streaming transcription + map-reduce summary, every event forwarded."""
+    from .summary_pipeline import audio_summary_events
+    # A job already runs in its own process, so transcription must not fan out further
+    transcribe_kwargs = {"workers": 1, "cpu_threads": cpu_threads}
+    for event in audio_summary_events(file_path, model_size, gpt_model, transcribe_kwargs=transcribe_kwargs):
+        emit(event)
+
+
+def _run_job(job_id, run, file_path, options, cleanup):
+    def emit(event):
+        if job_id in _cancelled:
+            raise JobCancelled()
+        _events.put((job_id, event))
+
+    try:
+        emit({"event": "started", "pid": os.getpid()})
+        run(file_path, emit, **options)
+    except JobCancelled:
+        _events.put((job_id, {"event": "cancelled"}))
+    except Exception as e:
+        _events.put((job_id, {"event": "failed", "error": str(e)}))
+    finally:
+        if cleanup and os.path.exists(file_path):
+            os.remove(file_path)
+
+
+# ------------------------ App side ----------------------------------
+class Job:
+    def __init__(self, job_id, file_path, owner, cleanup=False):
+        self.id = job_id
+        self.file_path = file_path
+        self.owner = owner
+        self.cleanup = cleanup
+        self.status = "queued"
+        self.position = 0.0
+        self.duration = None
+        self.chunks = 0
+        self.partials = []
+        self.text = ""
+        self.summary = None
+        self.error = None
+        self.events = []
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+
+    def apply(self, event):
+        kind = event["event"]
+        if kind == "started":
+            self.status, self.started = "running", time.time()
+        elif kind == "transcribing":
+            self.position, self.duration = event["position"], event["duration"]
+        elif kind == "chunk":
+            self.chunks += 1
+        elif kind == "partial":
+            self.partials.append(event)
+        elif kind == "token":
+            self.text += event["text"]
+        elif kind == "done":
+            self.status, self.summary, self.finished = "done", event["text"], time.time()
+        elif kind in ("failed", "cancelled"):
+            self.status, self.error, self.finished = kind, event.get("error"), time.time()
+        self.events.append(event)
+
+    @property
+    def progress(self):
+        if self.status == "done":
+            return 1.0
+        if not self.duration:
+            return 0.0
+        # Transcription is most of the work; the final merge gets the last 10%
+        return min(0.9, 0.9 * self.position / self.duration)
+
+    def snapshot(self):
+        return {
+            "id": self.id, "status": self.status, "progress": self.progress, "chunks": self.chunks,
+            "partials": len(self.partials), "text": self.summary or self.text, "error": self.error,
+            "queued_seconds": (self.started or time.time()) - self.created,
+        }
+
+
+class AudioJobManager:
+    """Runs audio summaries in a pool of worker processes and tracks their progress.
+
+    At most `max_workers` jobs run at once (each gets an equal share of the CPU threads for
+    Whisper), at most `max_queued` more wait, and one owner (e.g. a Streamlit session) may
+    have `max_per_owner` unfinished jobs; `submit` raises JobRejected beyond that. Workers
+    send progress events back over a queue, which a listener thread applies to the Job
+    objects that `get` / `iter_events` read.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_queued=MAX_QUEUED, max_per_owner=MAX_PER_OWNER,
+                 run=summarize_job):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_per_owner = max_per_owner
+        self.run = run
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # spawn: CTranslate2 / torch thread pools do not survive fork
+        ctx = get_context("spawn")
+        self._sync = ctx.Manager()
+        self._cancelled = self._sync.dict()
+        self._events = ctx.Queue()
+        self._pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx, initializer=_init_worker,
+                                         initargs=(self._events, self._cancelled))
+        self._listener = threading.Thread(target=self._listen, name="audio-job-events", daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                job_id, event = self._events.get()
+            except (EOFError, OSError):
+                return
+            with self._changed:
+                job = self.jobs.get(job_id)
+                if job is not None:
+                    job.apply(event)
+                self._changed.notify_all()
+
+    def _prune(self):
+        cutoff = time.time() - KEEP_FINISHED
+        for job_id in [j.id for j in self.jobs.values() if j.finished and j.finished < cutoff]:
+            self.jobs.pop(job_id)
+            self._cancelled.pop(job_id, None)
+
+    def submit(self, file_path, owner=None, cleanup=False, **options):
+        with self._lock:
+            self._prune()
+            active = [j for j in self.jobs.values() if j.status in ACTIVE]
+            if len(active) >= self.max_workers + self.max_queued:
+                raise JobRejected(f"{len(active)} audio jobs are already running or queued; try again later.")
+            if owner is not None and sum(j.owner == owner for j in active) >= self.max_per_owner:
+                raise JobRejected(f"You already have {self.max_per_owner} audio jobs in progress.")
+            job = Job(uuid.uuid4().hex[:12], file_path, owner, cleanup)
+            self.jobs[job.id] = job
+        if self.run is summarize_job:
+            options.setdefault("cpu_threads", max(1, (os.cpu_count() or 1) // self.max_workers))
+        job.future = self._pool.submit(_run_job, job.id, self.run, file_path, options, cleanup)
+        job.future.add_done_callback(lambda f, job=job: self._on_done(job, f))
+        logging.info(f"Audio job {job.id} queued ({file_path})")
+        return job.id
+
+    def _on_done(self, job, future):
+        # Only reached without a final event when the worker process itself died
+        if future.cancelled():
+            event = {"event": "cancelled"}
+            if job.cleanup and os.path.exists(job.file_path):
+                os.remove(job.file_path)
+        elif future.exception() is not None:
+            event = {"event": "failed", "error": f"worker crashed: {future.exception()}"}
+        else:
+            return
+        with self._changed:
+            if job.status in ACTIVE:
+                job.apply(event)
+            self._changed.notify_all()
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def active_jobs(self):
+        with self._lock:
+            return [j for j in self.jobs.values() if j.status in ACTIVE]
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status not in ACTIVE:
+                return False
+            self._cancelled[job_id] = True
+        job.future.cancel()
+        return True
+
+    def iter_events(self, job_id, timeout=None):
+        """Yield the job's events as they arrive, from the first one, until it finishes."""
+        seen = 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._changed:
+                job = self.jobs[job_id]
+                while seen == len(job.events) and job.status in ACTIVE:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return
+                    self._changed.wait(remaining if remaining is not None else 1.0)
+                new = job.events[seen:]
+                seen = len(job.events)
+                finished = job.status not in ACTIVE
+            yield from new
+            if finished and seen == len(job.events):
+                return
+
+    def shutdown(self, wait=False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        self._events.close()
+        self._sync.shutdown()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = AudioJobManager()
+        return _manager
@@ -1,16 +1,25 @@
-from .summarize_transcribe import summarize_transcribe
-from .voice_transcribe import transcribe_audio_file
+from .summary_pipeline import audio_summary_events
 
 
-def summarize_audio(file_path, model_size="base", gpt_model="llama3.1"):
+def print_progress(event):
+    if event["event"] == "transcribing" and event["duration"]:
+        print(f"\rTranscribed {event['position'] / event['duration']:.0%}", end="", flush=True)
+    elif event["event"] == "partial":
+        print(f"\nPart {event['index'] + 1} summarized.")
+    elif event["event"] == "reducing":
+        print(f"\nCombining {event['partials']} partial summaries...")
+
+
+def summarize_audio(file_path, model_size="base", gpt_model="llama3.1", on_progress=None):
 
     try:
-        # Transcribe the audio file
-        transcribed_text = transcribe_audio_file(file_path, model_size)
-        print("Transcription successful. Summarizing...")
-        
-        # Summarize the transcribed text
-        summary = summarize_transcribe(transcribed_text, model=gpt_model)
+        # Transcription and partial summaries run together; see summary_pipeline.summary_events
+        summary = ""
+        for event in audio_summary_events(file_path, model_size=model_size, gpt_model=gpt_model):
+            if on_progress is not None:
+                on_progress(event)
+            if event["event"] == "done":
+                summary = event["text"]
         return summary
     
     except Exception as e:
@@ -18,5 +27,5 @@ def summarize_audio(file_path, model_size="base", gpt_model="llama3.1"):
     
 if __name__ == "__main__":
     file_path = ""
-    summary = summarize_audio(file_path)
+    summary = summarize_audio(file_path, on_progress=print_progress)
     print("Audio Summary:\n", summary)
\ No newline at end of file
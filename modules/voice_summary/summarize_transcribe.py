@@ -1,17 +1,21 @@
-from .voice_transcribe import transcribe_audio_file
-# gpt_formatter.py
+from modules.common.llm_client import get_client
+from modules.common.semantic_cache import get_semantic_cache
 
-import ollama
+def build_summary_prompt(transcribed_text):
+    return f"please summarize this audio transcript provided below:\n\n{transcribed_text}\n\nPlease provide a concise summary of the main points and key details."
+
+def stream_summarize_transcribe(transcribed_text, model="llama3.1"):
+    """Yield the summary token by token as the model produces it."""
+    return get_client().stream_chat([{"role": "user", "content": build_summary_prompt(transcribed_text)}], model=model)
 
 def summarize_transcribe(transcribed_text, model="llama3.1"):
-    prompt = f"please summarize this audio transcript provided below:\n\n{transcribed_text}\n\nPlease provide a concise summary of the main points and key details."
     try:
-        response = ollama.chat(
-            model=model,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response['message']['content'].strip()
+        def compute():
+            stream = stream_summarize_transcribe(transcribed_text, model=model)
+            for _ in stream:
+                pass
+            return stream.text.strip()
+        return get_semantic_cache().cached("summary", build_summary_prompt(transcribed_text), compute, model=model,
+                                           document=transcribed_text)
     except Exception as e:
         return f"⚠️ Error generating notes: {e}"
@@ -0,0 +1,189 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from modules.common.llm_client import get_client
+from modules.common.semantic_cache import get_semantic_cache
+from .summarize_transcribe import build_summary_prompt
+
+CHUNK_TOKENS = 1500      # transcript tokens per partial summary
+REDUCE_TOKENS = 3000     # partial summaries merged per reduce call
+MAP_WORKERS = 2
+
+
+def approx_tokens(text):
+    # ~4 characters per token for English; close enough to budget a context window
+    return math.ceil(len(text) / 4)
+
+
+def _clock(seconds):
+    return f"{int(seconds // 60):02d}:{int(seconds % 60):02d}"
+
+
+def build_chunk_prompt(text, start, end):
+    return (
+        f"Below is the part of an audio transcript from {_clock(start)} to {_clock(end)}.\n\n{text}\n\n"
+        "Summarize the main points and key details of this part in a few bullet points."
+    )
+
+
+def join_partials(partials):
+    return "\n\n".join(f"[{_clock(start)}-{_clock(end)}]\n{text}" for start, end, text in partials)
+
+
+def build_reduce_prompt(partials):
+    joined = join_partials(partials)
+    return (
+        "These are summaries of consecutive parts of one audio recording:\n\n"
+        f"{joined}\n\n"
+        "Combine them into one concise summary of the main points and key details of the whole recording."
+    )
+
+
+class TranscriptChunker:
+    """Groups transcript segments into (start, end, text) chunks of about `budget` tokens."""
+
+    def __init__(self, budget=CHUNK_TOKENS):
+        self.budget = budget
+        self.texts, self.start, self.end, self.tokens = [], None, None, 0
+
+    def add(self, segment):
+        """Add one segment; returns the chunk it completed, if any."""
+        text = segment.text.strip()
+        if not text:
+            return None
+        completed = None
+        if self.texts and self.tokens + approx_tokens(text) > self.budget:
+            completed = self.flush()
+        if not self.texts:
+            self.start = segment.start
+        self.texts.append(text)
+        self.end = segment.end
+        self.tokens += approx_tokens(text)
+        return completed
+
+    def flush(self):
+        chunk = (self.start, self.end, " ".join(self.texts)) if self.texts else None
+        self.texts, self.tokens = [], 0
+        return chunk
+
+
+def _summarize(prompt, model, document):
+    compute = lambda: get_client().chat([{"role": "user", "content": prompt}], model=model).strip()
+    return get_semantic_cache().cached("summary", prompt, compute, model=model, document=document)
+
+
+def _reduce_groups(partials, budget):
+    groups, current, tokens = [], [], 0
+    for partial in partials:
+        size = approx_tokens(partial[2])
+        if current and tokens + size > budget:
+            groups.append(current)
+            current, tokens = [], 0
+        current.append(partial)
+        tokens += size
+    groups.append(current)
+    return groups
+
+
+def summary_events(segments, duration=None, model="llama3.1", chunk_tokens=CHUNK_TOKENS,
+                   reduce_tokens=REDUCE_TOKENS, workers=MAP_WORKERS):
+    """Map-reduce summary of a live segment stream, as a sequence of progress events.
+
+    Each chunk of about `chunk_tokens` is summarized in a worker thread as soon as it is
+    complete, while transcription carries on. The partial summaries are then merged (in
+    several rounds if they exceed `reduce_tokens`) and the final merge is streamed.
+
+    Events are dicts with an "event" key:
+      transcribing  position, duration (None if unknown)
+      chunk         index, start, end, tokens
+      partial       index, start, end, text
+      reducing      partials, round
+      token         text (the final summary, token by token)
+      done          text, elapsed, chunks
+    A recording that fits in one chunk skips the map step and is summarized directly.
+    """
+    started = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary-map")
+    chunker = TranscriptChunker(chunk_tokens)
+    futures = {}
+    chunks = []
+    reported = set()
+
+    def submit(chunk):
+        index = len(chunks)
+        chunks.append(chunk)
+        futures[index] = pool.submit(_summarize, build_chunk_prompt(chunk[2], chunk[0], chunk[1]), model, chunk[2])
+        return {"event": "chunk", "index": index, "start": chunk[0], "end": chunk[1], "tokens": approx_tokens(chunk[2])}
+
+    def finished_partials():
+        for index, future in sorted(futures.items()):
+            if index not in reported and future.done():
+                reported.add(index)
+                start, end, _ = chunks[index]
+                yield {"event": "partial", "index": index, "start": start, "end": end, "text": future.result()}
+
+    # The first chunk is held back until a second one exists, so a recording that fits in
+    # one chunk is summarized directly instead of mapped and then reduced
+    pending = None
+
+    def take(chunk):
+        nonlocal pending
+        if not chunks and pending is None:
+            pending = chunk
+            return
+        if pending is not None:
+            yield submit(pending)
+            pending = None
+        yield submit(chunk)
+
+    try:
+        for segment in segments:
+            yield {"event": "transcribing", "position": segment.end, "duration": duration}
+            chunk = chunker.add(segment)
+            if chunk is not None:
+                yield from take(chunk)
+            yield from finished_partials()
+        chunk = chunker.flush()
+        if chunk is not None:
+            yield from take(chunk)
+
+        if not chunks and pending is None:
+            yield {"event": "done", "text": "", "elapsed": time.perf_counter() - started, "chunks": 0}
+            return
+        if not chunks:
+            prompt, document = build_summary_prompt(pending[2]), pending[2]
+        else:
+            while len(reported) < len(futures):
+                wait([f for i, f in futures.items() if i not in reported], return_when="FIRST_COMPLETED")
+                yield from finished_partials()
+
+            partials = [(start, end, futures[i].result()) for i, (start, end, _) in enumerate(chunks)]
+            rounds = 0
+            while len(partials) > 1 and approx_tokens(" ".join(p[2] for p in partials)) > reduce_tokens:
+                groups = _reduce_groups(partials, reduce_tokens)
+                if len(groups) == len(partials):
+                    break  # every partial is over budget on its own; merge them in one call
+                rounds += 1
+                yield {"event": "reducing", "partials": len(partials), "round": rounds}
+                merged = pool.map(lambda g: _summarize(build_reduce_prompt(g), model, join_partials(g)), groups)
+                partials = [(g[0][0], g[-1][1], text) for g, text in zip(groups, merged)]
+            yield {"event": "reducing", "partials": len(partials), "round": rounds + 1}
+            prompt, document = build_reduce_prompt(partials), join_partials(partials)
+
+        text = ""
+        produce = lambda: get_client().stream_chat([{"role": "user", "content": prompt}], model=model)
+        for token in get_semantic_cache().stream("summary", prompt, produce, model=model, document=document):
+            text += token
+            yield {"event": "token", "text": token}
+        yield {"event": "done", "text": text.strip(), "elapsed": time.perf_counter() - started,
+               "chunks": len(chunks)}
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def audio_summary_events(file_path, model_size="base", gpt_model="llama3.1", transcribe_kwargs=None, **kwargs):
+    """summary_events over the transcription of `file_path` (replayed from the cache if it was seen before)."""
+    from .voice_transcribe import cached_transcript
+    duration, segments = cached_transcript(file_path, model_size, **(transcribe_kwargs or {}))
+    return summary_events(segments, duration=duration, model=gpt_model, **kwargs)
@@ -1,11 +1,228 @@
-from faster_whisper import WhisperModel
+import math
+import os
+import threading
+import time
 import warnings
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import faster_whisper
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
+
+from modules.common.content_cache import content_key, get_content_cache
+
 warnings.filterwarnings("ignore")
 
-def transcribe_audio_file(file_path, model_size="base"):
-    model = WhisperModel(model_size)
-    segments, info = model.transcribe(file_path)
-    full_text = " ".join([segment.text for segment in segments])
+SAMPLE_RATE = 16000
+DEVICE = os.environ.get("WHISPER_DEVICE", "cpu")
+BATCH_SIZE = 8
+VAD_PARAMETERS = {"min_silence_duration_ms": 500}
+# Files longer than this are split at quiet points and transcribed by several processes
+PARALLEL_MIN_SECONDS = 10 * 60
+PARALLEL_WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2))
+# Parallel chunks are at most this long, so the first segments arrive early
+PARALLEL_CHUNK_SECONDS = 3 * 60
+LANGUAGE_SAMPLE_SECONDS = 60
+
+TranscriptSegment = namedtuple("TranscriptSegment", ["start", "end", "text"])
+
+# ------------------------ Model cache -----------------------------
+_models = {}
+_pipelines = {}
+_models_lock = threading.Lock()
+
+
+def default_compute_type(device=DEVICE):
+    return "int8" if device == "cpu" else "float16"
+
+
+def get_model(model_size="base", device=DEVICE, compute_type=None, cpu_threads=0):
+    """One loaded WhisperModel per (size, device, compute type, threads), kept for the process lifetime."""
+    compute_type = compute_type or default_compute_type(device)
+    key = (model_size, device, compute_type, cpu_threads)
+    with _models_lock:
+        if key not in _models:
+            _models[key] = WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+        return _models[key]
+
+
+def get_batched_pipeline(model_size="base", device=DEVICE, compute_type=None, cpu_threads=0):
+    """BatchedInferencePipeline around the cached model, or None on faster-whisper < 1.1."""
+    try:
+        from faster_whisper import BatchedInferencePipeline
+    except ImportError:
+        return None
+    model = get_model(model_size, device, compute_type, cpu_threads)
+    with _models_lock:
+        if model not in _pipelines:
+            _pipelines[model] = BatchedInferencePipeline(model=model)
+        return _pipelines[model]
+
+
+# ------------------------ Transcription ---------------------------
+def iter_segments(audio, model_size="base", batch_size=BATCH_SIZE, vad_filter=True, language=None, offset=0.0,
+                  cpu_threads=0):
+    """Lazily yield TranscriptSegments for a file path or a 16 kHz float32 array.
+
+    With `batch_size` > 1 the VAD speech chunks are decoded in batches by the batched
+    pipeline; otherwise the plain model runs sequentially, still skipping silence via VAD.
+    """
+    pipeline = get_batched_pipeline(model_size, cpu_threads=cpu_threads) if batch_size > 1 else None
+    if pipeline is not None:
+        segments, _ = pipeline.transcribe(audio, batch_size=batch_size, vad_filter=vad_filter,
+                                          vad_parameters=VAD_PARAMETERS, language=language)
+    else:
+        segments, _ = get_model(model_size, cpu_threads=cpu_threads).transcribe(
+            audio, vad_filter=vad_filter, vad_parameters=VAD_PARAMETERS, language=language)
+    for segment in segments:
+        yield TranscriptSegment(segment.start + offset, segment.end + offset, segment.text)
+
+
+def split_on_silence(audio, parts, search_seconds=5.0, frame_seconds=0.03):
+    """Cut `audio` into `parts` chunks, moving each cut to the quietest frame near the even split point."""
+    frame = int(frame_seconds * SAMPLE_RATE)
+    search = int(search_seconds * SAMPLE_RATE)
+    bounds = [0]
+    for i in range(1, parts):
+        target = len(audio) * i // parts
+        lo, hi = max(bounds[-1] + frame, target - search), min(len(audio) - frame, target + search)
+        if hi - lo < frame:
+            bounds.append(target)
+            continue
+        window = audio[lo:hi][: (hi - lo) // frame * frame].reshape(-1, frame)
+        bounds.append(lo + int(np.argmin((window ** 2).mean(axis=1))) * frame)
+    bounds.append(len(audio))
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _init_worker(model_size, cpu_threads):
+    # Load once per worker process; every chunk that process receives reuses it
+    get_model(model_size, cpu_threads=cpu_threads)
+
+
+def _pool(model_size, workers, cpu_threads):
+    # Kept for later recordings, so the worker processes start and load the model only once.
+    # spawn: CTranslate2 and forked OpenMP thread pools do not mix
+    key = (model_size, workers, cpu_threads)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"),
+                                              initializer=_init_worker, initargs=(model_size, cpu_threads))
+        return _pools[key]
+
+
+def _detect_language(args):
+    sample, model_size, vad_filter, cpu_threads = args
+    _, info = get_model(model_size, cpu_threads=cpu_threads).transcribe(
+        sample, vad_filter=vad_filter, vad_parameters=VAD_PARAMETERS)
+    return info.language
+
+
+def _transcribe_chunk(args):
+    chunk, offset, model_size, batch_size, vad_filter, language, cpu_threads = args
+    return list(iter_segments(chunk, model_size, batch_size, vad_filter, language, offset, cpu_threads))
+
+
+def iter_segments_parallel(audio, model_size="base", workers=PARALLEL_WORKERS, batch_size=BATCH_SIZE,
+                           vad_filter=True, language=None):
+    """Transcribe a long recording in `workers` processes; segments come back in order.
+
+    Each process gets an equal share of the CPU threads, and chunks of at most
+    PARALLEL_CHUNK_SECONDS are cut at quiet points so no word is split between two workers.
+    Each chunk's segments are yielded as soon as it and every chunk before it are done.
+    Without a `language` it is detected once, from the start of the recording, and used
+    for every chunk.
+    """
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+    pool = _pool(model_size, workers, cpu_threads)
+    if language is None:
+        sample = audio[:LANGUAGE_SAMPLE_SECONDS * SAMPLE_RATE]
+        language = pool.submit(_detect_language, (sample, model_size, vad_filter, cpu_threads)).result()
+    parts = max(workers, math.ceil(len(audio) / SAMPLE_RATE / PARALLEL_CHUNK_SECONDS))
+    futures = [
+        pool.submit(_transcribe_chunk, (audio[start:end], start / SAMPLE_RATE, model_size, batch_size, vad_filter,
+                                        language, cpu_threads))
+        for start, end in split_on_silence(audio, parts)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        # A consumer that stops early leaves nothing queued for the shared pool
+        for future in futures:
+            future.cancel()
+
+
+def load_audio(file_path):
+    return decode_audio(file_path, sampling_rate=SAMPLE_RATE)
+
+
+def transcribe_segments(file_path, model_size="base", batch_size=BATCH_SIZE, vad_filter=True, language=None,
+                        workers=PARALLEL_WORKERS, cpu_threads=0):
+    """Segment iterator for a file (or audio from load_audio), parallel across processes
+    for recordings longer than PARALLEL_MIN_SECONDS. `cpu_threads` caps the sequential path
+    (0 = CTranslate2's default)."""
+    audio = load_audio(file_path) if isinstance(file_path, str) else file_path
+    if workers > 1 and len(audio) / SAMPLE_RATE >= PARALLEL_MIN_SECONDS:
+        return iter_segments_parallel(audio, model_size, workers, batch_size, vad_filter, language)
+    return iter_segments(audio, model_size, batch_size, vad_filter, language, cpu_threads=cpu_threads)
+
+
+# ------------------------ Transcript cache ------------------------
+def transcript_version(model_size, vad_filter=True, language=None):
+    return f"faster-whisper {faster_whisper.__version__}|{model_size}|{default_compute_type()}|vad={vad_filter}|{language}"
+
+
+def cached_transcript(file_path, model_size="base", vad_filter=True, language=None, use_cache=True, **kwargs):
+    """(duration, segment iterator) for `file_path`.
+
+    A file transcribed before with the same model and settings is replayed from the content
+    cache; otherwise segments stream from the model as usual and the transcript (with segment
+    timestamps) is stored once the iterator is exhausted.
+    """
+    cache = get_content_cache()
+    key = content_key("transcript", transcript_version(model_size, vad_filter, language), file_path)
+    cached = cache.get_json("transcript", key) if use_cache else None
+    if cached is not None:
+        return cached["duration"], (TranscriptSegment(*s) for s in cached["segments"])
+
+    started = time.perf_counter()
+    audio = load_audio(file_path)
+    duration = len(audio) / SAMPLE_RATE
+    elapsed = time.perf_counter() - started
+
+    def record():
+        nonlocal elapsed
+        segments = []
+        iterator = iter(transcribe_segments(audio, model_size, vad_filter=vad_filter, language=language, **kwargs))
+        while True:
+            # Only time spent transcribing counts, not the consumer's work between segments
+            started = time.perf_counter()
+            segment = next(iterator, None)
+            elapsed += time.perf_counter() - started
+            if segment is None:
+                break
+            segments.append(segment)
+            yield segment
+        value = {
+            "duration": duration,
+            "text": " ".join(s.text.strip() for s in segments),
+            "segments": [list(s) for s in segments],
+        }
+        cache.put_json("transcript", key, value, elapsed)
+
+    return duration, record()
+
+
+def transcribe_audio_file(file_path, model_size="base", **kwargs):
+    _, segments = cached_transcript(file_path, model_size, **kwargs)
+    full_text = " ".join([segment.text.strip() for segment in segments])
     return full_text
 
 if __name__ == "__main__":
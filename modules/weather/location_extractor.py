@@ -0,0 +1,106 @@
+import re
+from functools import lru_cache
+
+from modules.common.resources import shared_resource
+
+SPACY_MODEL = "en_core_web_sm"
+# Everything in en_core_web_sm except the entity recognizer (which has its own tok2vec)
+NER_EXCLUDE = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer"]
+DEFAULT_CITY = "Pune"
+PIPE_BATCH = 64
+
+# Known cities checked before any model call, comma separated. Names that are also common
+# English words or given names ("Nice", "Reading", "Erode", "Salem", "Gaya", "Kota", "Lima",
+# "Muscat", ...) are left to the model, which sees the context.
+KNOWN_CITIES = """
+mumbai, bombay, delhi, new delhi, bengaluru, bangalore, hyderabad, secunderabad, ahmedabad, chennai,
+madras, kolkata, calcutta, pune, poona, surat, jaipur, lucknow, kanpur, nagpur, indore, thane, bhopal,
+visakhapatnam, vizag, pimpri chinchwad, patna, vadodara, baroda, ghaziabad, ludhiana, agra, nashik,
+nasik, faridabad, meerut, rajkot, varanasi, srinagar, aurangabad, dhanbad, amritsar, navi mumbai,
+allahabad, prayagraj, ranchi, howrah, coimbatore, jabalpur, gwalior, vijayawada, jodhpur, madurai,
+raipur, guwahati, chandigarh, solapur, hubli, dharwad, mysore, mysuru, tiruchirappalli, trichy,
+bareilly, aligarh, tiruppur, moradabad, jalandhar, bhubaneswar, warangal, guntur, bhiwandi,
+saharanpur, gorakhpur, bikaner, amravati, noida, gurgaon, gurugram, jamshedpur, bhilai, cuttack,
+firozabad, kochi, cochin, nellore, bhavnagar, dehradun, durgapur, asansol, rourkela, nanded, kolhapur,
+ajmer, akola, gulbarga, kalaburagi, jamnagar, ujjain, siliguri, jhansi, ulhasnagar, jammu, mangalore,
+mangaluru, belgaum, belagavi, tirunelveli, udaipur, kozhikode, calicut,
+thiruvananthapuram, trivandrum, thrissur, shimla, manali, darjeeling, ooty, panaji, goa, pondicherry,
+puducherry, shillong, gangtok, imphal, aizawl, kohima, itanagar, agartala, port blair, leh, haridwar,
+rishikesh, mathura, vellore, davangere, ballari, bellary, satara, sangli, latur, ahmednagar,
+london, paris, berlin, madrid, rome, milan, barcelona, lisbon, amsterdam, brussels, vienna, zurich,
+geneva, munich, frankfurt, prague, warsaw, budapest, athens, istanbul, moscow, dublin, edinburgh,
+manchester, stockholm, oslo, copenhagen, helsinki, new york, los angeles, chicago, houston,
+san francisco, seattle, boston, miami, las vegas, toronto, vancouver, montreal, mexico city,
+sao paulo, rio de janeiro, buenos aires, bogota, cairo, lagos, nairobi, johannesburg,
+cape town, dubai, abu dhabi, doha, riyadh, karachi, lahore, islamabad, dhaka, kathmandu,
+colombo, tokyo, osaka, kyoto, seoul, beijing, shanghai, hong kong, taipei, singapore, kuala lumpur,
+jakarta, bangkok, manila, hanoi, sydney, melbourne, brisbane, perth, auckland
+"""
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def _build_trie(names):
+    """Word-level trie: each node maps the next word to a child; "$" marks a complete name."""
+    root = {}
+    for name in names:
+        node = root
+        for word in name.split():
+            node = node.setdefault(word, {})
+        node["$"] = name
+    return root
+
+
+_trie = _build_trie(" ".join(name.split()) for name in KNOWN_CITIES.split(",") if name.strip())
+
+
+def match_known_city(prompt, trie=None):
+    """Leftmost, longest known city in the prompt (title-cased), or None. No model involved."""
+    trie = trie or _trie
+    words = _WORD.findall(prompt.lower())
+    for start in range(len(words)):
+        node, found = trie, None
+        for word in words[start:]:
+            node = node.get(word)
+            if node is None:
+                break
+            found = node.get("$", found)
+        if found:
+            return found.title()
+    return None
+
+
+# ------------------------ spaCy fallback ----------------------------
+@shared_resource("spacy-ner", "spaCy NER pipeline for city names")
+def get_nlp():
+    """The NER-only spaCy pipeline, loaded on first use and shared by every caller."""
+    import spacy
+    return spacy.load(SPACY_MODEL, exclude=NER_EXCLUDE)
+
+
+def _first_gpe(doc):
+    for ent in doc.ents:
+        if ent.label_ == "GPE":
+            return ent.text
+    return None
+
+
+@lru_cache(maxsize=1024)
+def extract_city(prompt, default=DEFAULT_CITY):
+    """City named in the prompt: the gazetteer first, then spaCy GPE entities, else `default`."""
+    city = match_known_city(prompt)
+    if city is None:
+        # The small model finds lower-case place names far more reliably when title-cased
+        city = _first_gpe(get_nlp()(prompt.title()))
+    return city or default
+
+
+def extract_cities(prompts, default=DEFAULT_CITY, batch_size=PIPE_BATCH):
+    """extract_city for many prompts; the ones the gazetteer misses go through nlp.pipe in batches."""
+    cities = [match_known_city(p) for p in prompts]
+    missing = [i for i, city in enumerate(cities) if city is None]
+    if missing:
+        docs = get_nlp().pipe((prompts[i].title() for i in missing), batch_size=batch_size)
+        for i, doc in zip(missing, docs):
+            cities[i] = _first_gpe(doc)
+    return [city or default for city in cities]
@@ -1,32 +1,14 @@
 import requests
-import spacy
 
-API_KEY = "671ec5dca70e76a538e9b9d3fc36182d"  
-BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
-
-nlp = spacy.load("en_core_web_sm")
-
-def extract_city(prompt):
-    prompt = prompt.title()  # Capitalize first letter of each word
-    doc = nlp(prompt)
-    for ent in doc.ents:
-        if ent.label_ == "GPE":
-            return ent.text
-    return "Pune"
+from modules.weather.location_extractor import extract_city
+from modules.weather.weather_service import WeatherError, get_weather_service
 
 def get_weather(prompt):
     city_name = extract_city(prompt)
-    params = {
-        "q": city_name,
-        "appid": API_KEY,
-        "units": "metric"  
-    }
     
     try:
-        response = requests.get(BASE_URL, params=params)
-        response.raise_for_status()  
-        
-        data = response.json()
+        # Cached for 10 minutes per city; concurrent asks for one city share a single call
+        data = get_weather_service().current(city_name)
         
         weather_description = data['weather'][0]['description'].capitalize()
         temp = data['main']['temp']
@@ -45,7 +27,7 @@ def get_weather(prompt):
 
         return weather_report
     
-    except requests.exceptions.RequestException as e:
+    except (WeatherError, requests.exceptions.RequestException) as e:
         return f"Failed to get weather data: {e}"
 
 if __name__ == "__main__":
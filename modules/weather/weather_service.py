@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+
+API_KEY = os.environ.get("OPENWEATHER_API_KEY", "671ec5dca70e76a538e9b9d3fc36182d")
+BASE_URL = os.environ.get("OPENWEATHER_URL", "https://api.openweathermap.org")
+# OpenWeatherMap refreshes current conditions about every 10 minutes
+WEATHER_TTL = 10 * 60
+NOT_FOUND_TTL = 60
+MAX_ENTRIES = 1024
+BATCH_WORKERS = 8
+
+
+class WeatherError(Exception):
+    pass
+
+
+def _normalize(city):
+    return " ".join(city.lower().split())
+
+
+class WeatherService:
+    """Current weather per city with a TTL cache, memoized coordinates and coalesced requests.
+
+    The first lookup of a city name asks OpenWeatherMap by name and remembers the
+    coordinates it resolves to; after that the city is fetched and cached by coordinates,
+    which every spelling of the place shares. Results live for `ttl` seconds (unknown
+    cities for NOT_FOUND_TTL). Concurrent requests for the same place wait for a single
+    upstream call instead of each making one.
+    """
+
+    def __init__(self, api_key=API_KEY, base_url=BASE_URL, ttl=WEATHER_TTL, timeout=10, max_entries=MAX_ENTRIES):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.session = requests.Session()
+        self._coords = {}                 # normalized name -> (lat, lon)
+        self._cache = OrderedDict()       # place key -> (expires, data or WeatherError)
+        self._inflight = {}               # place key -> Future of the running upstream call
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "upstream": 0}
+
+    def _key(self, city):
+        name = _normalize(city)
+        coords = self._coords.get(name)
+        return ("coord",) + coords if coords else ("name", name)
+
+    def _fetch(self, city, key):
+        params = {"appid": self.api_key, "units": "metric"}
+        if key[0] == "coord":
+            params.update(lat=key[1], lon=key[2])
+        else:
+            params["q"] = city
+        response = self.session.get(f"{self.base_url}/data/2.5/weather", params=params, timeout=self.timeout)
+        if response.status_code == 404:
+            return WeatherError(f"City '{city}' not found"), NOT_FOUND_TTL
+        response.raise_for_status()
+        return response.json(), self.ttl
+
+    def _store(self, key, value, ttl):
+        self._cache[key] = (time.monotonic() + ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def current(self, city):
+        """OpenWeatherMap's current-weather JSON for `city`; raises WeatherError or requests errors."""
+        with self._lock:
+            key = self._key(city)
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.stats["hits"] += 1
+                self._cache.move_to_end(key)
+                value = entry[1]
+            else:
+                value = None
+                future = self._inflight.get(key)
+                if future is None:
+                    future = self._inflight[key] = Future()
+                    owner = True
+                    self.stats["misses"] += 1
+                    self.stats["upstream"] += 1
+                else:
+                    owner = False
+                    self.stats["coalesced"] += 1
+
+        if value is None and owner:
+            # Whatever happens, waiters get an answer and the next caller starts a new fetch
+            try:
+                value, ttl = self._fetch(city, key)
+                with self._lock:
+                    if isinstance(value, WeatherError):
+                        self._store(key, value, ttl)
+                    else:
+                        # Later lookups of this name go by coordinates, shared with its aliases
+                        coords = (round(value["coord"]["lat"], 2), round(value["coord"]["lon"], 2))
+                        self._coords[_normalize(city)] = coords
+                        self._store(("coord",) + coords, value, ttl)
+            except BaseException as e:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                future.set_exception(e)
+                raise
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_result(value)
+        elif value is None:
+            value = future.result()
+
+        if isinstance(value, WeatherError):
+            raise WeatherError(str(value))  # a fresh exception, not the cached instance
+        return value
+
+    def current_many(self, cities, workers=BATCH_WORKERS):
+        """{city: data or the exception it raised} for several cities, fetched concurrently."""
+        unique = list(dict.fromkeys(cities))
+
+        def fetch(city):
+            try:
+                return self.current(city)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(unique)))) as pool:
+            return dict(zip(unique, pool.map(fetch, unique)))
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._coords.clear()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_weather_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = WeatherService()
+        return _service
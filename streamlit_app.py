@@ -3,26 +3,28 @@ import streamlit as st
 import logging
 import tempfile
 import os
-import base64
-import requests
-import spacy
-import matplotlib.pyplot as plt
 import pandas as pd
+import shutil
+import uuid
 
 # ------------------------ Internal Modules -----------------------------
-from modules.notes_maker.notes_maker import make_notes_from_image
+from modules.notes_maker.notes_maker import stream_notes_from_image
 from modules.text_to_audio.text_to_audio import convert_text_to_audio
-from modules.general_chatting.chat import return_chat
+from modules.text_to_audio.tts_service import get_tts_service, new_audio_path
+from modules.general_chatting.chat import ChatBot, stream_chat
 from modules.stock_market_sentiment.stock_sentiment import analyze_stock_sentiment
 from modules.stock_market_sentiment.name_extractor import extract_company_name
 from modules.gmail.gmail_main import gmail_operation
 from intent_classifier.main import classify_intent
 from modules.gmail.sub_intent_classifier.gmail_sub_intent_classifier import predict_sub_intent
-
-# ------------------------ Weather Config --------------------------------
-API_KEY = "671ec5dca70e76a538e9b9d3fc36182d"
-BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
-nlp = spacy.load("en_core_web_sm")
+from modules.common import backgrounds, resources
+from modules.common.chat_history import HISTORY_WINDOW, count_turns, finalize_answer, window_start
+from modules.common.content_cache import get_content_cache
+from modules.common.semantic_cache import get_semantic_cache
+from modules.common.tasks import ACTIVE, TaskRejected, get_task_runner
+from modules.voice_summary.jobs import JobRejected, get_job_manager
+from modules.weather.location_extractor import extract_city
+from modules.weather.weather_service import get_weather_service
 
 # ------------------------ Logging ---------------------------------------
 logging.basicConfig(level=logging.INFO)
@@ -129,26 +131,29 @@ button:hover {
 """, unsafe_allow_html=True)
 
 # ==================== BACKGROUND IMAGE ==============================
-def set_bg_from_local(img_path):
-    with open(img_path, "rb") as image_file:
-        encoded = base64.b64encode(image_file.read()).decode()
-        st.markdown(
-            f"""
-            <style>
-            .stApp {{
-                background-image: url("data:image/jpeg;base64,{encoded}");
-                background-size: cover;
-            }}
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
-
-bg_folder = "backgrounds"
-bg_files = []
-if os.path.exists(bg_folder):
-    bg_files = [f for f in os.listdir(bg_folder) if f.endswith((".jpg", ".jpeg", ".png"))]
+@st.cache_data(show_spinner=False)
+def background_url(name, mtime):
+    # With static serving the browser gets a short URL it can cache; otherwise an inline WebP
+    # variant, still encoded only once per image (mtime refreshes it when the file changes)
+    if st.get_option("server.enableStaticServing"):
+        return backgrounds.publish(name)
+    return backgrounds.data_uri(os.path.join(backgrounds.BG_DIR, name))
+
+
+def set_bg_from_local(name):
+    url = background_url(name, os.path.getmtime(os.path.join(backgrounds.BG_DIR, name)))
+    st.markdown(backgrounds.background_css(url), unsafe_allow_html=True)
+
+bg_files = backgrounds.list_backgrounds()
+
+# ==================== MODELS ========================================
+@st.cache_resource(show_spinner=False)
+def start_warm_up(names=None):
+    # Once per server process for each list: models load in the background and every
+    # session shares them, so the first request of a session doesn't pay for loading
+    return resources.warm_up(names)
 
+start_warm_up()
 bg_files.insert(0, "None")
 with st.sidebar:
     st.markdown("### ⚙️ Settings")
@@ -158,24 +163,34 @@ with st.sidebar:
         ["ml", "rule_based", "transformer"],
         index=0
     )
+    ocr_backend = st.selectbox("OCR Engine", ["google", "tesseract", "easyocr"], index=0)
+    if classifier_type == "transformer":
+        start_warm_up(("intent-bert",))
     if selected_bg != "None":
-        set_bg_from_local(os.path.join(bg_folder, selected_bg))
+        set_bg_from_local(selected_bg)
+    with st.expander("🗃️ Transcript & OCR cache"):
+        cache_stats = get_content_cache().stats()
+        if cache_stats:
+            st.dataframe(pd.DataFrame(cache_stats).T, use_container_width=True)
+        else:
+            st.caption("No cached results yet.")
+    with st.expander("🧠 Semantic response cache"):
+        semantic_stats = get_semantic_cache().stats()
+        if semantic_stats:
+            st.dataframe(pd.DataFrame(semantic_stats).T, use_container_width=True)
+        else:
+            st.caption("No semantic cache lookups yet.")
+    with st.expander("🩺 Models & resources"):
+        st.dataframe(pd.DataFrame(resources.resource_status()).set_index("resource"), use_container_width=True)
+        rss = resources.rss_bytes()
+        if rss is not None:
+            st.caption(f"Process memory: {rss / 1024 ** 2:.0f} MB")
 
 # ========================= Weather Functions ==========================
-def extract_city(prompt: str) -> str:
-    doc = nlp(prompt.title())
-    for ent in doc.ents:
-        if ent.label_ == "GPE":
-            return ent.text
-    return "Pune"
-
 def get_weather(prompt: str) -> str:
     city = extract_city(prompt)
-    params = {"q": city, "appid": API_KEY, "units": "metric"}
     try:
-        response = requests.get(BASE_URL, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_weather_service().current(city)
         weather_str = f"""🌤️ Weather in **{city}** \n
         • Condition: {data['weather'][0]['description'].capitalize()} \n
         • Temperature: {data['main']['temp']} °C \n
@@ -186,16 +201,111 @@ def get_weather(prompt: str) -> str:
     except Exception as e:
         return f"❌ Weather fetch failed: {e}"
 
-# ========================= Stock Sentiment Pie ========================
-def plot_sentiment_pie(df):
-    sentiment_col = next((c for c in df.columns if c.lower() == "sentiment"), None)
-    if sentiment_col is None:
-        return
-    counts = df[sentiment_col].value_counts()
-    fig, ax = plt.subplots()
-    ax.pie(counts, labels=counts.index, autopct="%1.1f%%", startangle=90)
-    ax.axis("equal")
-    st.pyplot(fig)
+# ========================= Intent Handlers ===========================
+# Run on the shared task runner, outside the script run: they report through the task and
+# never call st.* themselves. Each returns the fields of the AI message it produced.
+def run_notes(task, path, backend):
+    # The runner deletes the upload (see cleanup= below), also if the task never starts
+    task.step("📝 Reading the pages and writing notes")
+    notes = task.stream(stream_notes_from_image(path, backend))
+    task.step("🔊 Generating audio for the notes")
+    return {"message": notes, "audio_file": convert_text_to_audio(notes)}
+
+def run_speech(task, text):
+    task.step("🔊 Generating audio")
+
+    def on_chunk(index, total, path):
+        if index == 0 and total > 1:
+            # Chunk files only live during the callback; keep a copy so playback can start now
+            first = new_audio_path()
+            shutil.copyfile(path, first)
+            task.partial(first_audio=first)
+        task.partial(audio_progress=(index + 1, total))
+
+    path = get_tts_service().synthesize(text, on_chunk=on_chunk)
+    return {"message": "🔊 Converted your text to audio!", "audio_file": path}
+
+def run_weather(task, prompt):
+    task.step("🌤️ Fetching the weather")
+    return {"message": get_weather(prompt)}
+
+def run_stock_sentiment(task, prompt):
+    company, url = extract_company_name(prompt)
+    if not (company and url):
+        return {"message": "Company not detected"}
+    task.step(f"📰 Reading and scoring headlines for {company}")
+    df_stock = analyze_stock_sentiment(url)
+    task.step("🥧 Charting the sentiment split")
+    # Compact frame and pie PNG are made once here, not re-plotted on every rerun
+    return finalize_answer({"message": f"📊 Stock sentiment for {company}", "df_stock": df_stock})
+
+def run_gmail(task, prompt):
+    task.step("📧 Fetching emails")
+    results = gmail_operation(prompt)
+    return {"message": "".join(f"**{mail['Subject']}**\n{mail['Body']}\n\n" for mail in results)}
+
+def run_chat(task, prompt, bot):
+    return {"message": task.stream(stream_chat(prompt, bot))}
+
+# ========================= Background Tasks ===========================
+def finish_task(chat, task):
+    if task.status == "done":
+        chat.update(task.result)
+    elif task.status == "cancelled":
+        chat["message"] = f"{task.text.strip()}\n\n⏹️ Cancelled".strip()
+    else:
+        chat["message"] = f"⚠️ {task.label} failed: {task.error}"
+    chat["ttft"] = task.ttft
+    chat["task"] = None
+
+@st.fragment(run_every=0.5)
+def render_task(chat):
+    """Streams the task's steps and text every 0.5 s without re-running the whole script."""
+    runner = get_task_runner()
+    task = runner.get(chat["task"])
+    if task is None:
+        chat["task"] = None
+        st.rerun()
+    if task.status not in ACTIVE:
+        finish_task(chat, task)
+        st.rerun()
+    label = f"{task.label}... ({task.elapsed:.0f}s)" if task.status == "running" else "Waiting for a free worker..."
+    with st.status(label, state="running", expanded=bool(task.steps)):
+        for step in task.steps:
+            st.write(step)
+        progress = task.partials.get("audio_progress")
+        if progress:
+            st.progress(progress[0] / progress[1], text=f"Audio part {progress[0]}/{progress[1]}")
+    if task.partials.get("first_audio"):
+        st.audio(task.partials["first_audio"], autoplay=True)
+    if task.text:
+        st.markdown(f"<div class='ai-msg-full'>{task.text}▌</div>", unsafe_allow_html=True)
+    if st.button("⏹️ Cancel", key=f"cancel-{task.id}"):
+        runner.cancel(task.id)
+
+# ========================= Background Audio Jobs ======================
+@st.fragment(run_every=2)
+def render_audio_job(chat):
+    """Polls the job every 2 s without re-running the whole script; reruns once it finishes."""
+    job = get_job_manager().get(chat["audio_job"])
+    if job is None:
+        # Evicted or lost with a server restart: drop the "Summarizing..." placeholder
+        chat["message"] = "⚠️ The audio summary is no longer available. Please upload the recording again."
+        chat["audio_job"] = None
+        st.rerun()
+    if job.status == "queued":
+        st.info("🎧 Waiting for a free audio worker...")
+    elif job.status == "running":
+        label = f"🎧 Transcribing and summarizing... {job.chunks} part(s) so far"
+        st.progress(job.progress, text=label)
+        for partial in job.partials:
+            st.caption(partial["text"])
+        if job.text:
+            st.markdown(f"<div class='ai-msg-full'>{job.text}▌</div>", unsafe_allow_html=True)
+    else:
+        chat["message"] = job.summary if job.status == "done" else f"⚠️ Audio summary {job.status}: {job.error}"
+        chat["audio_job"] = None
+        st.rerun()
 
 # ========================= UI HEADER ================================
 st.title("🤖 Multi-Purpose AI Agent")
@@ -208,12 +318,19 @@ chat_container = st.container()
 with st.container():
     with st.form("chat_form", clear_on_submit=True):
         prompt = st.text_input("Enter your message", key="input_text")
-        uploaded_file = st.file_uploader("Optional Attachment", type=["jpg","jpeg","png","mp3","wav","m4a"])
+        uploaded_file = st.file_uploader("Optional Attachment", type=["jpg","jpeg","png","pdf","mp3","wav","m4a"])
         submit = st.form_submit_button("Send")
 
 # ========================= MAIN LOGIC ================================
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if "history_turns" not in st.session_state:
+    st.session_state.history_turns = HISTORY_WINDOW
+if "chatbot" not in st.session_state:
+    # Lives as long as the browser session, so general chat remembers earlier turns
+    st.session_state.chatbot = ChatBot()
 
 if submit and prompt:
     try:
@@ -228,71 +345,96 @@ if submit and prompt:
         "intent": intent
     })
 
-    # Generate AI response
-    ai_message = ""
-    audio_file = None
-    notes_file = None
-    df_stock = None
+    # The AI message is filled in by a background task (or audio job) as it runs
+    ai_chat = {
+        "role": "ai",
+        "message": "",
+        "intent": intent,
+        "audio_file": None,
+        "df_stock": None,
+        "ttft": None,
+        "audio_job": None,
+        "task": None
+    }
+    handler = None
+    cleanup = ()
 
     if intent == "make_notes" and uploaded_file:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
+        suffix = os.path.splitext(uploaded_file.name)[1] or ".jpg"
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
             tmp.write(uploaded_file.read())
-            notes = make_notes_from_image(tmp.name)
+        cleanup = (tmp.name,)
+        handler, args, label = run_notes, (tmp.name, ocr_backend), "📝 Making notes"
+
+    elif intent in ("summarize_audio", "voice_summary") and uploaded_file:
+        suffix = os.path.splitext(uploaded_file.name)[1] or ".wav"
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            tmp.write(uploaded_file.read())
+        try:
+            # The worker process deletes the upload once it is done with it
+            ai_chat["audio_job"] = get_job_manager().submit(tmp.name, owner=st.session_state.session_id, cleanup=True)
+            ai_chat["message"] = "🎧 Summarizing your recording in the background..."
+        except JobRejected as e:
             os.remove(tmp.name)
-        ai_message = notes
-        notes_file = "notes.mp3"
-        convert_text_to_audio(notes, notes_file)
+            ai_chat["message"] = f"⚠️ {e}"
 
     elif intent == "convert_to_audio":
-        ai_message = "🔊 Converted your text to audio!"
-        audio_file = "speech.mp3"
-        convert_text_to_audio(prompt, audio_file)
+        handler, args, label = run_speech, (prompt,), "🔊 Converting to audio"
 
     elif intent == "get_weather":
-        ai_message = get_weather(prompt)
+        handler, args, label = run_weather, (prompt,), "🌤️ Checking the weather"
 
     elif intent == "stock_sentiment":
-        company, url = extract_company_name(prompt)
-        if company and url:
-            df_stock = analyze_stock_sentiment(url)
-            ai_message = f"📊 Stock sentiment for {company}"
-        else:
-            ai_message = "Company not detected"
+        handler, args, label = run_stock_sentiment, (prompt,), "📊 Analyzing stock sentiment"
 
     elif intent == "gmail_operations":
-        results = gmail_operation(prompt)
-        ai_message = ""
-        for mail in results:
-            ai_message += f"**{mail['Subject']}**\n{mail['Body']}\n\n"
+        handler, args, label = run_gmail, (prompt,), "📧 Reading Gmail"
 
     else:
-        ai_message = return_chat(prompt)
+        # Turns on the session's chatbot run one at a time (ChatBot.stream holds it for the exchange)
+        handler, args, label = run_chat, (prompt, st.session_state.chatbot), "💬 Thinking"
 
-    # Append AI response
-    st.session_state.chat_history.append({
-        "role": "ai",
-        "message": ai_message,
-        "intent": intent,
-        "audio_file": audio_file,
-        "df_stock": df_stock
-    })
+    if handler is not None:
+        try:
+            ai_chat["task"] = get_task_runner().submit(handler, *args, label=label, owner=st.session_state.session_id,
+                                                       cleanup=cleanup)
+        except TaskRejected as e:
+            for path in cleanup:
+                os.remove(path)
+            ai_chat["message"] = f"⚠️ {e}"
+
+    st.session_state.chat_history.append(ai_chat)
 
 # ========================= DISPLAY CHAT HISTORY ======================
 with chat_container:
     st.markdown("<div class='chat-container'>", unsafe_allow_html=True)
-    for chat in st.session_state.chat_history:
+    # Only the latest turns are rendered; older ones stay in session state until asked for
+    history = st.session_state.chat_history
+    hidden = count_turns(history) - st.session_state.history_turns
+    if hidden > 0 and st.button(f"⬆️ Load older messages ({hidden} more)"):
+        st.session_state.history_turns += HISTORY_WINDOW
+        st.rerun()
+    for chat in history[window_start(history, st.session_state.history_turns):]:
         # User
         if chat["role"] == "user":
             st.markdown(f"<div class='user-prompt-full'><b>Your prompt :</b> {chat['message']}</div>", unsafe_allow_html=True)
             st.markdown(f"<span class='intent-badge-full'>Intent: {chat['intent']}</span>", unsafe_allow_html=True)
         # AI
-        if chat["role"] == "ai":
+        if chat["role"] == "ai" and chat.get("task"):
+            render_task(chat)
+        elif chat["role"] == "ai" and chat.get("audio_job"):
+            render_audio_job(chat)
+        elif chat["role"] == "ai":
             st.markdown(f"<div class='ai-msg-full'>{chat['message']}</div>", unsafe_allow_html=True)
-            if chat.get("audio_file"):
+            if chat.get("ttft") is not None:
+                st.caption(f"⏱️ first token in {chat['ttft'] * 1000:.0f} ms")
+            # Audio is served from the cache directory; an evicted file is simply not shown
+            if chat.get("audio_file") and os.path.exists(chat["audio_file"]):
                 st.audio(chat["audio_file"])
             if chat.get("df_stock") is not None:
                 st.dataframe(chat["df_stock"])
-                plot_sentiment_pie(chat["df_stock"])
+                if chat.get("pie_png"):
+                    st.image(chat["pie_png"], width=320)
     st.markdown("</div>", unsafe_allow_html=True)
 
 